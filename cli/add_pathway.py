@@ -44,51 +44,332 @@ Example (Full):
         --source-type official_government \\
         --credibility 5 \\
         --artifact-path "data/raw/italy/2025-10-25_consulate_nomad.md"
+
+Example (Manifest - many pathways in grouped transactions):
+    python cli/add_pathway.py --job-id 2 --manifest data/raw/italy/pathways.yaml
+
+    # pathways.yaml (JSON with the same structure also works)
+    pathways:
+      - country: Italy
+        pathway_type: digital_nomad
+        name: Digital Nomad Visa
+        min_income: 24789
+        source_url: https://consnewyork.esteri.it/...
+        source_title: Italian Consulate NY - Digital Nomad Visa
+        source_type: official_government
+        credibility: 5
+        artifact_path: data/raw/italy/2025-10-25_consulate_nomad.md
+      - country: Italy
+        pathway_type: elective_residence
+        name: Elective Residence Visa
+        ...
+
+    Each pathway is still atomic (all 6 tables or nothing), but artifacts are
+    hashed in parallel up front and commits are grouped (--commit-every).
+    Pathway IDs are printed one per line, in manifest order.
+
+Artifacts are stored like artifact_register.py does: text and HTML are
+compressed (consulate_nomad.md -> consulate_nomad.md.gz, or .zst), the
+uncompressed file is removed once registered, and audit trail rows point at
+the compressed file. The original path still works as --artifact-path.
 """
 
 import sqlite3
 import sys
-import hashlib
+import json
 from pathlib import Path
 from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
+try:
+    import yaml
+except ImportError:
+    yaml = None
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from blob_store import (COMPRESSION_SUFFIXES, find_compressed_copies, project_relative, record_alias,
+                        remove_uncompressed, repoint_trail, store_artifact, unstore_artifact)
+from db_common import LOCK_STATS, PROJECT_ROOT, WriteLockTimeout, begin_write, get_db_connection
+from file_hash import cached_sha256, cached_sha256_files
+from job_counters import add_job_counts
 
 
 def get_country_id(conn: sqlite3.Connection, country_name: str) -> int:
-    """Get country ID by name"""
+    """
+    Get country ID by name
+
+    Raises:
+        ValueError: If the country does not exist
+    """
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM countries WHERE name = ?", (country_name,))
     row = cursor.fetchone()
     if not row:
-        print(f"❌ Country '{country_name}' not found", file=sys.stderr)
-        sys.exit(1)
+        raise ValueError(f"Country '{country_name}' not found")
     return row['id']
 
 
-def compute_file_hash(file_path: Path) -> str:
-    """Compute SHA256 hash of a file"""
+def compute_file_hash(file_path: Path, verify: bool = False, decompress: bool = False) -> str:
+    """Compute SHA256 hash of a file, using the hash cache unless verify (see file_hash)"""
     if not file_path.exists():
         return None
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    return cached_sha256(file_path, verify, decompress=decompress)
+
+
+# add_pathway_transaction() keyword arguments describing one pathway bundle
+PATHWAY_FIELDS = (
+    'official_name', 'description', 'legal_basis', 'min_income', 'min_investment',
+    'education_req', 'language_req', 'age_restrictions', 'documents', 'process',
+    'processing_time', 'fee', 'duration', 'renewable', 'max_renewals', 'max_duration',
+    'path_pr', 'path_citizenship', 'years_to_citizenship', 'work_rights', 'family',
+    'travel_rights', 'restrictions', 'tax', 'policy_changes'
+)
+REQUIRED_FIELDS = (
+    'country', 'pathway_type', 'name', 'source_url', 'source_title', 'source_type', 'credibility'
+)
+OPTIONAL_FIELDS = PATHWAY_FIELDS + (
+    'artifact_path', 'source_description', 'source_excerpt', 'source_relevance'
+)
+SOURCE_TYPES = [
+    'official_government', 'embassy', 'legal_database',
+    'licensed_lawyer', 'news', 'community', 'other'
+]
+
+DEFAULT_COMMIT_EVERY = 50
+
+# Artifact type by file extension (anything else is extracted text)
+ARTIFACT_TYPES = {
+    '.pdf': 'pdf', '.html': 'html', '.htm': 'html', '.png': 'screenshot', '.jpg': 'screenshot',
+    '.jpeg': 'screenshot', '.zip': 'zip', '.doc': 'doc', '.docx': 'docx'
+}
+
+
+def resolve_artifact_path(artifact_path: str) -> Path:
+    """
+    Absolute artifact path (relative paths are relative to the project
+    root); the compressed file if an earlier run replaced it.
+    """
+    full_path = Path(artifact_path)
+    if not full_path.is_absolute():
+        full_path = PROJECT_ROOT / artifact_path
+    if not full_path.exists():
+        for suffix in COMPRESSION_SUFFIXES.values():
+            compressed = full_path.with_name(full_path.name + suffix)
+            if compressed.exists():
+                return compressed
+    return full_path
+
+
+def prepare_artifact(artifact_path: str, verify: bool = False, hashes: dict = None,
+                     compressed: dict = None) -> dict:
+    """
+    Stat, hash and store an artifact file before any transaction is opened.
+
+    Args:
+        verify: Re-hash even if the hash cache has the file
+        hashes: Digests already computed, by resolved path
+        compressed: Compressed copies among the resolved paths (see
+            blob_store.find_compressed_copies; looked up if not given)
+
+    Returns:
+        dict with full_path, relative_path (where the artifact is now),
+        artifact_type, size, sha256 and stored (see
+        blob_store.store_artifact), or None if the file is missing
+    """
+    full_path = resolve_artifact_path(artifact_path)
+
+    if not full_path.exists():
+        return None
+
+    if compressed is None:
+        compressed = find_compressed_copies(get_db_connection(), [full_path])
+    compression = compressed.get(full_path)
+
+    artifact_type = ARTIFACT_TYPES.get(full_path.suffix.lower(), 'extracted_text')
+    size = full_path.stat().st_size
+    sha256 = (hashes or {}).get(full_path) or compute_file_hash(full_path, verify, compression is not None)
+    stored = store_artifact(full_path, sha256, artifact_type, compression)
+    return {
+        'full_path': full_path,
+        'relative_path': project_relative(stored['path']),
+        'artifact_type': artifact_type,
+        'size': size,
+        'sha256': sha256,
+        'stored': stored
+    }
+
+
+def replaced_paths(artifacts: list) -> list:
+    """Original paths of artifacts stored compressed (see blob_store.repoint_trail)"""
+    return sorted({artifact['full_path'] for artifact in artifacts
+                   if artifact['stored']['path'] != artifact['full_path']})
+
+
+def write_pathway_bundle(
+    cursor: sqlite3.Cursor,
+    job_id: int,
+    country_id: int,
+    entry: dict,
+    artifact: dict = None,
+    source_ids: dict = None,
+    artifact_ids: dict = None,
+    verbose: bool = True
+) -> tuple:
+    """
+    Write one pathway bundle (source, trail, artifact, pathway, link).
+
+    Runs inside the caller's transaction and does not commit.
+
+    Args:
+        entry: add_pathway_transaction() keyword arguments
+        artifact: Result of prepare_artifact() (None if no/missing artifact)
+        source_ids: Known source URL -> ID (memoized lookups, not modified)
+        artifact_ids: Known artifact SHA256 -> ID (memoized lookups, not modified)
+
+    Returns:
+        (result dict with pathway_id, source_id, artifact_id, trail_id,
+         dict of job_run counter increments)
+    """
+    def say(message):
+        if verbose:
+            print(message, file=sys.stderr)
+
+    source_ids = source_ids or {}
+    artifact_ids = artifact_ids or {}
+    stats = {'sources_found': 0, 'pages_visited': 0, 'artifacts_downloaded': 0}
+
+    country = entry['country']
+    pathway_type = entry['pathway_type']
+    name = entry['name']
+    source_url = entry['source_url']
+    source_title = entry['source_title']
+    artifact_path = entry.get('artifact_path')
+
+    # 2. Create or find source
+    say(f"📚 Creating/finding source...")
+
+    source_id = source_ids.get(source_url)
+    if source_id is None:
+        cursor.execute("SELECT id FROM sources WHERE url = ?", (source_url,))
+        existing_source = cursor.fetchone()
+        if existing_source:
+            source_id = existing_source['id']
+
+    if source_id is not None:
+        say(f"   ✓ Found existing source (ID: {source_id})")
+    else:
+        cursor.execute("""
+            INSERT INTO sources (
+                url, title, source_type, credibility, description,
+                country_id, pathway_type, is_active,
+                last_accessed_date, last_verified_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, 1, date('now'), date('now'))
+        """, (source_url, source_title, entry['source_type'], entry['credibility'],
+              entry.get('source_description'), country_id, pathway_type))
+
+        source_id = cursor.lastrowid
+        say(f"   ✓ Created new source (ID: {source_id})")
+        stats['sources_found'] += 1
+
+    # 3. Log to audit trail (with the path the artifact is stored under)
+    say(f"📝 Logging to audit trail...")
+
+    if artifact:
+        artifact_path = str(artifact['relative_path'])
+
+    cursor.execute("""
+        INSERT INTO scraper_audit_trail (
+            job_run_id, action_type, tool_name, url, page_title,
+            is_source, source_id, artifact_path, status, timestamp
+        ) VALUES (?, 'fetch', 'add_pathway_bundled', ?, ?, 1, ?, ?, 'success', ?)
+    """, (job_id, source_url, source_title, source_id,
+          artifact_path, datetime.now().isoformat()))
+
+    trail_id = cursor.lastrowid
+    say(f"   ✓ Logged to audit trail (ID: {trail_id})")
+    stats['pages_visited'] += 1
+
+    # 4. Register artifact (if provided)
+    artifact_id = None
+    if artifact_path:
+        say(f"📦 Registering artifact...")
+
+        if artifact:
+            # Check for duplicate
+            artifact_id = artifact_ids.get(artifact['sha256'])
+            if artifact_id is None:
+                cursor.execute("SELECT id FROM artifacts WHERE sha256 = ?", (artifact['sha256'],))
+                existing_artifact = cursor.fetchone()
+                if existing_artifact:
+                    artifact_id = existing_artifact['id']
+
+            if artifact_id is not None:
+                say(f"   ✓ Found existing artifact (ID: {artifact_id})")
+                record_alias(cursor, artifact_path, artifact_id, artifact['stored']['link_type'])
+            else:
+                cursor.execute("""
+                    INSERT INTO artifacts (
+                        trail_id, source_id, artifact_type, file_path,
+                        file_name, file_size_bytes, sha256, title,
+                        source_url, country, pathway_type, downloaded_at,
+                        compression, compressed_size_bytes
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (trail_id, source_id, artifact['artifact_type'], artifact_path,
+                      artifact['full_path'].name, artifact['size'], artifact['sha256'], name,
+                      source_url, country, pathway_type, datetime.now().isoformat(),
+                      artifact['stored']['compression'], artifact['stored']['compressed_size']))
+
+                artifact_id = cursor.lastrowid
+                record_alias(cursor, artifact_path, artifact_id, artifact['stored']['link_type'])
+                say(f"   ✓ Registered artifact (ID: {artifact_id})")
+                stats['artifacts_downloaded'] += 1
+        else:
+            say(f"   ⚠️  Artifact file not found: {artifact_path}")
+
+    # 5. Insert pathway
+    say(f"🛂 Inserting pathway...")
+
+    cursor.execute("""
+        INSERT INTO residency_pathways (
+            country_id, pathway_type, name, official_name, description,
+            legal_basis, min_income_eur, min_investment_eur,
+            education_requirement, language_requirement, age_restrictions,
+            required_documents, application_process, processing_time_days,
+            application_fee_eur, initial_duration_months, renewable,
+            max_renewals, total_max_duration_months,
+            path_to_permanent_residency, path_to_citizenship,
+            min_years_to_citizenship, work_rights, family_inclusion,
+            travel_rights, restrictions, tax_implications,
+            is_active, last_verified_date, policy_changes_2025
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, date('now'), ?)
+    """, (country_id, pathway_type, name, entry.get('official_name'), entry.get('description'),
+          entry.get('legal_basis'), entry.get('min_income'), entry.get('min_investment'),
+          entry.get('education_req'), entry.get('language_req'), entry.get('age_restrictions'),
+          entry.get('documents'), entry.get('process'), entry.get('processing_time'),
+          entry.get('fee'), entry.get('duration'), 1 if entry.get('renewable') else 0,
+          entry.get('max_renewals'), entry.get('max_duration'), entry.get('path_pr'),
+          entry.get('path_citizenship'), entry.get('years_to_citizenship'),
+          entry.get('work_rights'), entry.get('family'), entry.get('travel_rights'),
+          entry.get('restrictions'), entry.get('tax'), entry.get('policy_changes')))
+
+    pathway_id = cursor.lastrowid
+    say(f"   ✓ Inserted pathway (ID: {pathway_id})")
+
+    # 6. Link pathway to source
+    say(f"🔗 Linking pathway to source...")
+
+    cursor.execute("""
+        INSERT INTO pathway_sources (
+            pathway_id, source_id, relevance_score, excerpt
+        ) VALUES (?, ?, ?, ?)
+    """, (pathway_id, source_id, entry.get('source_relevance') or 5, entry.get('source_excerpt')))
+
+    say(f"   ✓ Linked pathway to source")
+
+    return {
+        'pathway_id': pathway_id,
+        'source_id': source_id,
+        'artifact_id': artifact_id,
+        'trail_id': trail_id
+    }, stats
 
 
 def add_pathway_transaction(
@@ -131,7 +412,8 @@ def add_pathway_transaction(
     # Optional source fields
     source_description: str = None,
     source_excerpt: str = None,
-    source_relevance: int = 5
+    source_relevance: int = 5,
+    verify: bool = False
 ) -> dict:
     """
     Add pathway with full transaction (6 tables updated).
@@ -139,12 +421,21 @@ def add_pathway_transaction(
     Returns:
         dict with pathway_id, source_id, artifact_id, trail_id
     """
+    entry = dict(locals())
+    del entry['job_id']
+    del entry['verify']
+
     conn = get_db_connection()
     cursor = conn.cursor()
+    artifact = None
+    committed = False
 
     try:
-        # Begin transaction
-        cursor.execute("BEGIN TRANSACTION")
+        # Hash the artifact before taking any locks
+        artifact = prepare_artifact(artifact_path, verify) if artifact_path else None
+
+        # Begin transaction (takes the write lock up front)
+        lock_wait = begin_write(conn)
 
         print(f"🔄 Starting transaction...", file=sys.stderr)
 
@@ -156,139 +447,32 @@ def add_pathway_transaction(
         # Get country ID
         country_id = get_country_id(conn, country)
 
-        # 2. Create or find source
-        print(f"📚 Creating/finding source...", file=sys.stderr)
-
-        cursor.execute("SELECT id FROM sources WHERE url = ?", (source_url,))
-        existing_source = cursor.fetchone()
-
-        if existing_source:
-            source_id = existing_source['id']
-            print(f"   ✓ Found existing source (ID: {source_id})", file=sys.stderr)
-        else:
-            cursor.execute("""
-                INSERT INTO sources (
-                    url, title, source_type, credibility, description,
-                    country_id, pathway_type, is_active,
-                    last_accessed_date, last_verified_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, 1, date('now'), date('now'))
-            """, (source_url, source_title, source_type, credibility,
-                  source_description, country_id, pathway_type))
-
-            source_id = cursor.lastrowid
-            print(f"   ✓ Created new source (ID: {source_id})", file=sys.stderr)
-
-            # Update job stats
-            cursor.execute("UPDATE job_run SET sources_found = sources_found + 1 WHERE id = ?", (job_id,))
-
-        # 3. Log to audit trail
-        print(f"📝 Logging to audit trail...", file=sys.stderr)
-
-        cursor.execute("""
-            INSERT INTO scraper_audit_trail (
-                job_run_id, action_type, tool_name, url, page_title,
-                is_source, source_id, artifact_path, status, timestamp
-            ) VALUES (?, 'fetch', 'add_pathway_bundled', ?, ?, 1, ?, ?, 'success', ?)
-        """, (job_id, source_url, source_title, source_id,
-              artifact_path, datetime.now().isoformat()))
+        # 2-6. Source, audit trail, artifact, pathway, link
+        result, stats = write_pathway_bundle(cursor, job_id, country_id, entry, artifact)
 
-        trail_id = cursor.lastrowid
-        print(f"   ✓ Logged to audit trail (ID: {trail_id})", file=sys.stderr)
+        # Earlier audit trail rows follow the artifact to its compressed file
+        if artifact:
+            repoint_trail(cursor, replaced_paths([artifact]))
 
         # Update job stats
-        cursor.execute("UPDATE job_run SET pages_visited = pages_visited + 1 WHERE id = ?", (job_id,))
-
-        # 4. Register artifact (if provided)
-        artifact_id = None
-        if artifact_path:
-            print(f"📦 Registering artifact...", file=sys.stderr)
-
-            full_path = Path(artifact_path)
-            if not full_path.is_absolute():
-                full_path = PROJECT_ROOT / artifact_path
-
-            if full_path.exists():
-                file_size = full_path.stat().st_size
-                file_hash = compute_file_hash(full_path)
-
-                # Check for duplicate
-                cursor.execute("SELECT id FROM artifacts WHERE sha256 = ?", (file_hash,))
-                existing_artifact = cursor.fetchone()
-
-                if existing_artifact:
-                    artifact_id = existing_artifact['id']
-                    print(f"   ✓ Found existing artifact (ID: {artifact_id})", file=sys.stderr)
-                else:
-                    try:
-                        relative_path = full_path.relative_to(PROJECT_ROOT)
-                    except ValueError:
-                        relative_path = full_path
-
-                    cursor.execute("""
-                        INSERT INTO artifacts (
-                            trail_id, source_id, artifact_type, file_path,
-                            file_name, file_size_bytes, sha256, title,
-                            source_url, country, pathway_type, downloaded_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (trail_id, source_id, 'extracted_text', str(relative_path),
-                          full_path.name, file_size, file_hash, name,
-                          source_url, country, pathway_type, datetime.now().isoformat()))
-
-                    artifact_id = cursor.lastrowid
-                    print(f"   ✓ Registered artifact (ID: {artifact_id})", file=sys.stderr)
-
-                    # Update job stats
-                    cursor.execute("UPDATE job_run SET artifacts_downloaded = artifacts_downloaded + 1 WHERE id = ?", (job_id,))
-            else:
-                print(f"   ⚠️  Artifact file not found: {artifact_path}", file=sys.stderr)
-
-        # 5. Insert pathway
-        print(f"🛂 Inserting pathway...", file=sys.stderr)
-
-        cursor.execute("""
-            INSERT INTO residency_pathways (
-                country_id, pathway_type, name, official_name, description,
-                legal_basis, min_income_eur, min_investment_eur,
-                education_requirement, language_requirement, age_restrictions,
-                required_documents, application_process, processing_time_days,
-                application_fee_eur, initial_duration_months, renewable,
-                max_renewals, total_max_duration_months,
-                path_to_permanent_residency, path_to_citizenship,
-                min_years_to_citizenship, work_rights, family_inclusion,
-                travel_rights, restrictions, tax_implications,
-                is_active, last_verified_date, policy_changes_2025
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, date('now'), ?)
-        """, (country_id, pathway_type, name, official_name, description,
-              legal_basis, min_income, min_investment, education_req,
-              language_req, age_restrictions, documents, process,
-              processing_time, fee, duration, 1 if renewable else 0,
-              max_renewals, max_duration, path_pr, path_citizenship,
-              years_to_citizenship, work_rights, family, travel_rights,
-              restrictions, tax, policy_changes))
-
-        pathway_id = cursor.lastrowid
-        print(f"   ✓ Inserted pathway (ID: {pathway_id})", file=sys.stderr)
-
-        # 6. Link pathway to source
-        print(f"🔗 Linking pathway to source...", file=sys.stderr)
-
-        cursor.execute("""
-            INSERT INTO pathway_sources (
-                pathway_id, source_id, relevance_score, excerpt
-            ) VALUES (?, ?, ?, ?)
-        """, (pathway_id, source_id, source_relevance, source_excerpt))
-
-        print(f"   ✓ Linked pathway to source", file=sys.stderr)
+        add_job_counts(cursor, job_id, **stats)
 
         # Commit transaction
         conn.commit()
+        committed = True
+        if artifact:
+            remove_uncompressed(artifact['full_path'], artifact['stored'])
+
+        pathway_id = result['pathway_id']
+        artifact_id = result['artifact_id']
 
         print(f"\n✅ TRANSACTION COMPLETE", file=sys.stderr)
         print(f"   Pathway ID: {pathway_id}", file=sys.stderr)
-        print(f"   Source ID: {source_id}", file=sys.stderr)
+        print(f"   Source ID: {result['source_id']}", file=sys.stderr)
         if artifact_id:
             print(f"   Artifact ID: {artifact_id}", file=sys.stderr)
-        print(f"   Trail ID: {trail_id}", file=sys.stderr)
+        print(f"   Trail ID: {result['trail_id']}", file=sys.stderr)
+        print(f"   Lock wait: {lock_wait * 1000:.0f} ms", file=sys.stderr)
         print(file=sys.stderr)
         print(f"   Tables updated: 6", file=sys.stderr)
         print(f"   - residency_pathways ✓", file=sys.stderr)
@@ -302,20 +486,222 @@ def add_pathway_transaction(
         # Output pathway ID for scripting
         print(pathway_id)
 
-        return {
-            'pathway_id': pathway_id,
-            'source_id': source_id,
-            'artifact_id': artifact_id,
-            'trail_id': trail_id
-        }
+        return result
 
     except Exception as e:
         print(f"\n❌ TRANSACTION FAILED - Rolling back", file=sys.stderr)
         print(f"   Error: {e}", file=sys.stderr)
         conn.rollback()
+        if artifact and not committed:
+            unstore_artifact(artifact['full_path'], artifact['stored'])
         sys.exit(1)
-    finally:
-        conn.close()
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """
+    Load a YAML or JSON manifest.
+
+    Format:
+        job_id: 2                # optional if --job-id is given
+        pathways:
+          - country: Italy
+            pathway_type: digital_nomad
+            name: Digital Nomad Visa
+            source_url: https://...
+            source_title: Italian Consulate
+            source_type: official_government
+            credibility: 5
+            artifact_path: data/raw/italy/consulate_nomad.md
+            min_income: 24789
+
+    Entry keys are add_pathway_transaction() keyword arguments.
+    A bare list is accepted as the pathways list.
+    """
+    text = manifest_path.read_text()
+    if manifest_path.suffix.lower() in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ValueError("YAML manifests need pyyaml (pip install pyyaml), or use JSON")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, list):
+        data = {'pathways': data}
+    if not isinstance(data, dict) or not isinstance(data.get('pathways'), list):
+        raise ValueError("Manifest must contain a 'pathways' list")
+    return data
+
+
+def validate_manifest_entry(entry: dict, countries: dict) -> None:
+    """
+    Validate one manifest entry.
+
+    Raises:
+        ValueError: If the entry is not a valid pathway bundle
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("Entry must be a mapping")
+    missing = [field for field in REQUIRED_FIELDS if entry.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    unknown = set(entry) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if entry['country'] not in countries:
+        raise ValueError(f"Country '{entry['country']}' not found")
+    if entry['source_type'] not in SOURCE_TYPES:
+        raise ValueError(f"source_type must be one of: {', '.join(SOURCE_TYPES)}")
+    if entry['credibility'] not in (1, 2, 3, 4, 5):
+        raise ValueError("credibility must be 1-5")
+
+
+def add_pathways_from_manifest(
+    manifest_path: str,
+    job_id: int = None,
+    commit_every: int = DEFAULT_COMMIT_EVERY,
+    hash_workers: int = None,
+    verify: bool = False
+) -> list:
+    """
+    Add many pathway bundles from a manifest.
+
+    Artifacts not in the hash cache (all, with verify) are hashed
+    concurrently and stored before any write transaction opens; those
+    no committed entry registers are taken out of the blob store again.
+    Each pathway is atomic (its own savepoint); commits are grouped every
+    commit_every pathways. Source URL and artifact SHA256 lookups are
+    memoized across entries.
+
+    Returns:
+        list of result dicts (one per successfully added pathway, manifest order)
+    """
+    try:
+        manifest = load_manifest(Path(manifest_path))
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid manifest: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    job_id = job_id or manifest.get('job_id')
+    if not job_id:
+        print(f"❌ No job ID: pass --job-id or set job_id in the manifest", file=sys.stderr)
+        sys.exit(1)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT id FROM job_run WHERE id = ?", (job_id,))
+    if not cursor.fetchone():
+        print(f"❌ Job {job_id} not found", file=sys.stderr)
+        sys.exit(1)
+
+    countries = {row['name']: row['id'] for row in cursor.execute("SELECT id, name FROM countries")}
+
+    # Validate everything up front
+    entries = []
+    errors = []
+    for index, entry in enumerate(manifest['pathways'], 1):
+        try:
+            validate_manifest_entry(entry, countries)
+            entries.append((index, entry))
+        except ValueError as e:
+            errors.append((index, str(e)))
+
+    # Hash all artifacts concurrently, outside any transaction
+    artifact_paths = sorted({entry['artifact_path'] for _, entry in entries if entry.get('artifact_path')})
+    print(f"🔍 Hashing {len(artifact_paths)} artifact(s)...", file=sys.stderr)
+    full_paths = [path for path in map(resolve_artifact_path, artifact_paths) if path.exists()]
+    compressed = find_compressed_copies(conn, full_paths)
+    hashes = cached_sha256_files(full_paths, hash_workers, verify, decompress=set(compressed))
+    artifacts = {path: prepare_artifact(path, hashes=hashes, compressed=compressed) for path in artifact_paths}
+
+    # Write in grouped transactions
+    print(f"🔄 Adding {len(entries)} pathway(s) for job {job_id}...", file=sys.stderr)
+    source_ids = {}
+    artifact_ids = {}
+    registered = {}
+    results = []
+    commits = 0
+
+    for start in range(0, len(entries), commit_every):
+        group = entries[start:start + commit_every]
+        group_results = []
+        group_stats = {'sources_found': 0, 'pages_visited': 0, 'artifacts_downloaded': 0}
+        group_sources = {}
+        group_artifacts = {}
+        group_registered = {}
+
+        try:
+            begin_write(conn)
+            for index, entry in group:
+                artifact = artifacts.get(entry.get('artifact_path'))
+                cursor.execute("SAVEPOINT pathway_bundle")
+                try:
+                    result, stats = write_pathway_bundle(
+                        cursor, job_id, countries[entry['country']], entry, artifact,
+                        {**source_ids, **group_sources}, {**artifact_ids, **group_artifacts},
+                        verbose=False
+                    )
+                except sqlite3.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT pathway_bundle")
+                    cursor.execute("RELEASE SAVEPOINT pathway_bundle")
+                    errors.append((index, str(e)))
+                    continue
+                cursor.execute("RELEASE SAVEPOINT pathway_bundle")
+
+                group_sources[entry['source_url']] = result['source_id']
+                if artifact and result['artifact_id']:
+                    group_artifacts[artifact['sha256']] = result['artifact_id']
+                    group_registered[entry['artifact_path']] = artifact
+                for key, value in stats.items():
+                    group_stats[key] += value
+                group_results.append(result)
+
+            # Earlier audit trail rows follow the artifacts to their compressed files
+            repoint_trail(cursor, replaced_paths(list(group_registered.values())))
+            add_job_counts(cursor, job_id, **group_stats)
+            conn.commit()
+            commits += 1
+
+        except WriteLockTimeout as e:
+            # Later groups would only wait out the same deadline again
+            conn.rollback()
+            errors.extend((index, f"Not added: {e}") for index, _ in entries[start:])
+            break
+
+        except sqlite3.Error as e:
+            conn.rollback()
+            errors.extend((index, f"Group rolled back: {e}") for index, _ in group)
+            continue
+
+        source_ids.update(group_sources)
+        artifact_ids.update(group_artifacts)
+        registered.update(group_registered)
+        results.extend(group_results)
+
+    for artifact in registered.values():
+        remove_uncompressed(artifact['full_path'], artifact['stored'])
+
+    # Artifacts of entries that failed or rolled back leave the blob store again
+    for path in reversed(artifact_paths):
+        if artifacts[path] and path not in registered:
+            unstore_artifact(artifacts[path]['full_path'], artifacts[path]['stored'])
+
+    print(f"\n✅ Added {len(results)} pathway(s) from {manifest_path}", file=sys.stderr)
+    print(f"   Job ID: {job_id}", file=sys.stderr)
+    print(f"   Commits: {commits}", file=sys.stderr)
+    print(f"   Lock wait: {LOCK_STATS['wait_ms']} ms ({LOCK_STATS['retries']} retries)", file=sys.stderr)
+
+    # Output pathway IDs for scripting (manifest order)
+    for result in results:
+        print(result['pathway_id'])
+
+    if errors:
+        print(f"\n❌ {len(errors)} entr{'y' if len(errors) == 1 else 'ies'} failed:", file=sys.stderr)
+        for index, message in sorted(errors):
+            print(f"   #{index}: {message}", file=sys.stderr)
+        sys.exit(1)
+
+    return results
 
 
 def main():
@@ -328,22 +714,26 @@ def main():
         epilog=__doc__
     )
 
-    # Required arguments
-    parser.add_argument('--job-id', required=True, type=int, help='Job ID from audit_start_job.py')
-    parser.add_argument('--country', required=True, help='Country name')
-    parser.add_argument('--type', required=True, help='Pathway type')
-    parser.add_argument('--name', required=True, help='Pathway name')
-
-    # Source arguments (REQUIRED)
-    parser.add_argument('--source-url', required=True, help='Source URL')
-    parser.add_argument('--source-title', required=True, help='Source title')
-    parser.add_argument('--source-type', required=True,
-                       choices=['official_government', 'embassy', 'legal_database',
-                               'licensed_lawyer', 'news', 'community', 'other'],
-                       help='Source type')
-    parser.add_argument('--credibility', required=True, type=int, choices=[1, 2, 3, 4, 5],
+    # Required arguments (unless --manifest)
+    parser.add_argument('--job-id', type=int, help='Job ID from audit_start_job.py')
+    parser.add_argument('--country', help='Country name')
+    parser.add_argument('--type', help='Pathway type')
+    parser.add_argument('--name', help='Pathway name')
+
+    # Source arguments (REQUIRED unless --manifest)
+    parser.add_argument('--source-url', help='Source URL')
+    parser.add_argument('--source-title', help='Source title')
+    parser.add_argument('--source-type', choices=SOURCE_TYPES, help='Source type')
+    parser.add_argument('--credibility', type=int, choices=[1, 2, 3, 4, 5],
                        help='Source credibility (1-5)')
 
+    # Batch mode
+    parser.add_argument('--manifest', help='YAML/JSON manifest of pathways to add')
+    parser.add_argument('--commit-every', type=int, default=DEFAULT_COMMIT_EVERY,
+                       help=f'Pathways per commit in manifest mode (default: {DEFAULT_COMMIT_EVERY})')
+    parser.add_argument('--hash-workers', type=int,
+                       help='Threads for hashing manifest artifacts (default: CPU-based)')
+
     # Optional source fields
     parser.add_argument('--source-description', help='Source description')
     parser.add_argument('--source-excerpt', help='Key excerpt from source')
@@ -352,6 +742,8 @@ def main():
 
     # Optional artifact
     parser.add_argument('--artifact-path', help='Path to artifact file (PDF, HTML, markdown)')
+    parser.add_argument('--verify', action='store_true',
+                       help='Re-hash artifacts even if the hash cache has them')
 
     # Optional pathway fields
     parser.add_argument('--official-name', help='Official name in local language')
@@ -382,6 +774,22 @@ def main():
 
     args = parser.parse_args()
 
+    if args.manifest:
+        if args.commit_every < 1:
+            parser.error("--commit-every must be at least 1")
+        add_pathways_from_manifest(args.manifest, args.job_id, args.commit_every, args.hash_workers,
+                                   args.verify)
+        return
+
+    missing = [flag for flag, value in (
+        ('--job-id', args.job_id), ('--country', args.country), ('--type', args.type),
+        ('--name', args.name), ('--source-url', args.source_url),
+        ('--source-title', args.source_title), ('--source-type', args.source_type),
+        ('--credibility', args.credibility)
+    ) if value is None]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
+
     result = add_pathway_transaction(
         job_id=args.job_id,
         country=args.country,
@@ -419,7 +827,8 @@ def main():
         artifact_path=args.artifact_path,
         source_description=args.source_description,
         source_excerpt=args.source_excerpt,
-        source_relevance=args.source_relevance
+        source_relevance=args.source_relevance,
+        verify=args.verify
     )
 
 
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+Artifact Extract CLI Tool
+
+Convert downloaded PDF and HTML artifacts to markdown under data/extracted/
+and record the result on the artifact row (extraction_status,
+extracted_to_path, page_count, word_count, extraction_error).
+
+Pending artifacts are claimed in batches (artifact_extraction_claims) and
+converted on a process pool. Each markdown file is written under a temporary
+name and renamed into place before the batch is recorded in one
+transaction, so a crash never leaves a row pointing at a partial file.
+Claims held by a process that has exited are released by the next run,
+which extracts those artifacts again: a crashed run resumes by running the
+command again.
+
+PDFs need pymupdf or pdfplumber; HTML uses BeautifulSoup and html2text when
+installed (falls back to plain text otherwise). Compressed artifacts are
+read through blob_store.open_artifact(). New text is added to the
+search index (cli/search.py) after extraction.
+
+Usage:
+    python cli/artifact_extract.py
+    python cli/artifact_extract.py --type pdf --jobs 8 --batch-size 100
+    python cli/artifact_extract.py --artifact-id 45 --output data/extracted/italy/visa.pdf.md
+
+Examples:
+    # Extract every pending PDF and HTML artifact (prints "ID<TAB>path" per file)
+    python cli/artifact_extract.py
+
+    # Only the first 500 pending PDFs
+    python cli/artifact_extract.py --type pdf --limit 500
+
+    # Try failed artifacts again, once each (e.g. after installing pymupdf)
+    python cli/artifact_extract.py --retry-failed
+
+    # Re-extract one artifact, whatever its status
+    python cli/artifact_extract.py --artifact-id 45
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser
+from pathlib import Path
+
+try:
+    import fitz  # pymupdf
+except ImportError:
+    fitz = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+try:
+    import html2text
+except ImportError:
+    html2text = None
+
+from blob_store import compression_of, open_artifact
+from db_common import PROJECT_ROOT, begin_write, get_db_connection
+
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+
+# Tests (TEST_MODE=1) keep their extracted text apart, like their database
+if os.environ.get('TEST_MODE'):
+    EXTRACTED_DIR = PROJECT_ROOT / "data" / "test_extracted"
+else:
+    EXTRACTED_DIR = PROJECT_ROOT / "data" / "extracted"
+
+EXTRACTABLE_TYPES = ('pdf', 'html')
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_JOBS = os.cpu_count() or 1
+
+# Removed from HTML before conversion
+HTML_SKIP_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'nav', 'header', 'footer', 'form')
+HTML_BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'aside', 'br', 'li', 'tr', 'table',
+    'ul', 'ol', 'dl', 'dt', 'dd', 'blockquote', 'pre', 'hr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6'
+}
+
+UPDATE_ARTIFACT_SQL = """
+    UPDATE artifacts SET
+        extraction_status = ?,
+        extracted_to_path = ?,
+        extraction_error = ?,
+        page_count = ?,
+        word_count = ?
+    WHERE id = ?
+"""
+
+
+class HTMLTextParser(HTMLParser):
+    """Plain text of an HTML document (used when html2text is not installed)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_SKIP_TAGS:
+            self.skipping += 1
+        elif tag in HTML_BLOCK_TAGS:
+            self.parts.append("\n\n")
+            if tag[0] == 'h' and tag[1:].isdigit():
+                self.parts.append('#' * int(tag[1:]) + ' ')
+
+    def handle_endtag(self, tag):
+        if tag in HTML_SKIP_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in HTML_BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(re.sub(r'\s+', ' ', data))
+
+    def text(self) -> str:
+        blocks = (block.strip() for block in re.split(r'\n\s*\n', ''.join(self.parts)))
+        return "\n\n".join(block for block in blocks if block)
+
+
+def available_types() -> list:
+    """Artifact types that can be extracted with the installed libraries"""
+    types = ['html']
+    if fitz or pdfplumber:
+        types.insert(0, 'pdf')
+    return types
+
+
+def pdf_to_markdown(path: Path) -> tuple:
+    """
+    Extract the text layer of a PDF, one section per page.
+
+    Returns:
+        (markdown, page_count)
+    """
+    if fitz:
+        with fitz.open(path) as document:
+            pages = [page.get_text() for page in document]
+    elif pdfplumber:
+        with pdfplumber.open(path) as document:
+            pages = [page.extract_text() or '' for page in document.pages]
+    else:
+        raise RuntimeError("PDF extraction needs pymupdf or pdfplumber (pip install pymupdf)")
+
+    sections = [f"## Page {number}\n\n{text.strip()}"
+                for number, text in enumerate(pages, 1) if text.strip()]
+    return "\n\n".join(sections), len(pages)
+
+
+def html_to_markdown(path: Path) -> tuple:
+    """
+    Convert an HTML page to markdown, without scripts, navigation and forms.
+
+    Returns:
+        (markdown, None)
+    """
+    with open_artifact(path) as f:
+        html = f.read()
+
+    if BeautifulSoup:
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(HTML_SKIP_TAGS):
+            tag.decompose()
+        if not html2text:
+            return soup.get_text("\n\n", strip=True), None
+        html = str(soup)
+    else:
+        html = html.decode('utf-8', errors='replace')
+
+    if html2text:
+        converter = html2text.HTML2Text()
+        converter.body_width = 0
+        converter.ignore_images = True
+        return converter.handle(html).strip(), None
+
+    parser = HTMLTextParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text(), None
+
+
+EXTRACTORS = {
+    'pdf': pdf_to_markdown,
+    'html': html_to_markdown
+}
+
+
+def extracted_path(file_path: str, country: str) -> Path:
+    """
+    Where the markdown of an artifact goes.
+
+    data/raw/italy/visa.pdf -> data/extracted/italy/visa.pdf.md, and
+    visa.html (or a compressed visa.html.gz) -> visa.html.md: the source
+    extension is kept so they do not overwrite each other. Files outside
+    data/raw/ go to a directory named after the artifact's country.
+    """
+    source = PROJECT_ROOT / file_path
+    if compression_of(source):
+        source = source.with_suffix('')
+    try:
+        target = EXTRACTED_DIR / source.relative_to(RAW_DIR)
+    except ValueError:
+        folder = re.sub(r'\W+', '_', country.lower()) if country else 'other'
+        target = EXTRACTED_DIR / folder / source.name
+    return target.with_name(target.name + '.md')
+
+
+def write_atomically(path: Path, text: str) -> None:
+    """Write a file under a temporary name and rename it into place"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def extract_artifact(task: dict) -> dict:
+    """
+    Convert one artifact and write its markdown (runs in a pool worker).
+
+    Args:
+        task: id, artifact_type, file_path, title, source_url, output
+
+    Returns:
+        dict with id, status ('extracted' or 'failed'), output, page_count,
+        word_count and error
+    """
+    result = {'id': task['id'], 'status': 'failed', 'output': None,
+              'page_count': None, 'word_count': None, 'error': None}
+    try:
+        body, page_count = EXTRACTORS[task['artifact_type']](PROJECT_ROOT / task['file_path'])
+        result['page_count'] = page_count
+        if not body.strip():
+            result['error'] = "No text found (scanned PDF or empty page?)"
+            return result
+
+        header = [f"# {task['title']}", "", f"**Source**: `{task['file_path']}`"]
+        if task['source_url']:
+            header.append(f"**Source URL**: {task['source_url']}")
+        write_atomically(PROJECT_ROOT / task['output'], "\n".join(header) + "\n\n---\n\n" + body + "\n")
+
+        result.update(status='extracted', output=task['output'], word_count=len(body.split()))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def make_task(row: sqlite3.Row, output: Path = None) -> dict:
+    """Pool task for an artifact row"""
+    output = output or extracted_path(row['file_path'], row['country'])
+    try:
+        output = output.resolve().relative_to(PROJECT_ROOT.resolve())
+    except ValueError:
+        pass
+    return {
+        'id': row['id'],
+        'artifact_type': row['artifact_type'],
+        'file_path': row['file_path'],
+        'title': row['title'] or row['file_name'] or Path(row['file_path']).name,
+        'source_url': row['source_url'],
+        'output': str(output)
+    }
+
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this ID exists (on this machine)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def claim_batch(conn: sqlite3.Connection, types: list, size: int, statuses: tuple,
+                after_id: int = 0) -> list:
+    """
+    Claim up to size unclaimed artifacts for this process.
+
+    Claims of processes that no longer exist are released first. Artifacts
+    that are not pending are only claimed above after_id, the last artifact
+    claimed by this run, so a failed artifact is retried once per run.
+
+    Returns:
+        Claimed artifact rows
+    """
+    try:
+        begin_write(conn)
+        dead = [pid for (pid,) in conn.execute("SELECT DISTINCT pid FROM artifact_extraction_claims")
+                if not process_alive(pid)]
+        if dead:
+            conn.execute(f"""
+                DELETE FROM artifact_extraction_claims WHERE pid IN ({', '.join('?' for _ in dead)})
+            """, dead)
+
+        rows = conn.execute(f"""
+            SELECT a.id, a.artifact_type, a.file_path, a.file_name, a.title, a.source_url, a.country
+            FROM artifacts a
+            WHERE a.extraction_status IN ({', '.join('?' for _ in statuses)})
+              AND a.artifact_type IN ({', '.join('?' for _ in types)})
+              AND (a.extraction_status = 'pending' OR a.id > ?)
+              AND NOT EXISTS (SELECT 1 FROM artifact_extraction_claims c WHERE c.artifact_id = a.id)
+            ORDER BY a.id
+            LIMIT ?
+        """, (*statuses, *types, after_id, size)).fetchall()
+
+        conn.executemany("INSERT INTO artifact_extraction_claims (artifact_id, pid) VALUES (?, ?)",
+                         [(row['id'], os.getpid()) for row in rows])
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def record_results(conn: sqlite3.Connection, results: list) -> None:
+    """Update the artifact rows of a batch and release their claims, in one transaction"""
+    try:
+        begin_write(conn)
+        conn.executemany(UPDATE_ARTIFACT_SQL, [
+            (r['status'], r['output'], r['error'], r['page_count'], r['word_count'], r['id'])
+            for r in results
+        ])
+        conn.executemany("DELETE FROM artifact_extraction_claims WHERE artifact_id = ?",
+                         [(r['id'],) for r in results])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def release_claims(conn: sqlite3.Connection) -> None:
+    """Release every claim held by this process"""
+    try:
+        begin_write(conn)
+        conn.execute("DELETE FROM artifact_extraction_claims WHERE pid = ?", (os.getpid(),))
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"⚠️  Could not release extraction claims: {e}", file=sys.stderr)
+
+
+def run_batch(pool: ProcessPoolExecutor, tasks: list) -> tuple:
+    """
+    Extract a batch on the pool.
+
+    Returns:
+        (results, tasks lost because a worker process died)
+    """
+    futures = {pool.submit(extract_artifact, task): task for task in tasks}
+    results, crashed = [], []
+    for future in as_completed(futures):
+        try:
+            results.append(future.result())
+        except BrokenProcessPool:
+            crashed.append(futures[future])
+    return results, crashed
+
+
+def run_alone(task: dict) -> dict:
+    """Extract one artifact in its own process, marking it failed if that process dies"""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(extract_artifact, task).result()
+        except BrokenProcessPool:
+            return {'id': task['id'], 'status': 'failed', 'output': None, 'page_count': None,
+                    'word_count': None, 'error': "Extractor process crashed"}
+
+
+def extract_pending(conn: sqlite3.Connection, types: list, jobs: int = DEFAULT_JOBS,
+                    batch_size: int = DEFAULT_BATCH_SIZE, limit: int = None,
+                    retry_failed: bool = False) -> dict:
+    """
+    Extract pending (and with retry_failed, failed) artifacts batch by batch.
+
+    A worker process that dies (e.g. a PDF that crashes the parser) breaks
+    the pool; the artifacts it lost are then extracted one per process so
+    only the culprit is marked failed. Each failed artifact is retried at
+    most once per call (it fails again: it is not claimed again).
+
+    Returns:
+        dict with extracted, failed, pages and words counts
+    """
+    statuses = ('pending', 'failed') if retry_failed else ('pending',)
+    stats = {'extracted': 0, 'failed': 0, 'pages': 0, 'words': 0}
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    last_id = 0
+
+    try:
+        while limit is None or stats['extracted'] + stats['failed'] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats['extracted'] - stats['failed'])
+            rows = claim_batch(conn, types, size, statuses, last_id)
+            if not rows:
+                break
+            last_id = max(last_id, rows[-1]['id'])
+
+            tasks = [make_task(row) for row in rows]
+            if pool:
+                results, crashed = run_batch(pool, tasks)
+                if crashed:
+                    print(f"⚠️  Extractor process crashed; retrying {len(crashed)} artifact(s) one at a time",
+                          file=sys.stderr)
+                    pool.shutdown(cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=jobs)
+                    results.extend(run_alone(task) for task in crashed)
+            else:
+                results = [extract_artifact(task) for task in tasks]
+
+            record_results(conn, results)
+            for result in sorted(results, key=lambda r: r['id']):
+                if result['status'] == 'extracted':
+                    stats['extracted'] += 1
+                    stats['pages'] += result['page_count'] or 0
+                    stats['words'] += result['word_count']
+                    print(f"{result['id']}\t{result['output']}", flush=True)
+                else:
+                    stats['failed'] += 1
+                    print(f"⚠️  Artifact {result['id']} failed: {result['error']}", file=sys.stderr)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        release_claims(conn)
+
+    return stats
+
+
+def extract_one(conn: sqlite3.Connection, artifact_id: int, output: str = None) -> dict:
+    """
+    Extract a single artifact in this process, whatever its status.
+
+    Returns:
+        The extraction result (see extract_artifact)
+
+    Raises:
+        ValueError: If the artifact does not exist or is not a PDF/HTML file
+    """
+    row = conn.execute("""
+        SELECT id, artifact_type, file_path, file_name, title, source_url, country
+        FROM artifacts WHERE id = ?
+    """, (artifact_id,)).fetchone()
+    if not row:
+        raise ValueError(f"Artifact {artifact_id} not found")
+    if row['artifact_type'] not in EXTRACTABLE_TYPES:
+        raise ValueError(f"Artifact {artifact_id} is {row['artifact_type']}; only PDF and HTML can be extracted")
+
+    output = Path(output) if output else None
+    if output and not output.is_absolute():
+        output = Path.cwd() / output
+    result = extract_artifact(make_task(row, output))
+    record_results(conn, [result])
+    return result
+
+
+def index_extracted(conn: sqlite3.Connection) -> None:
+    """Add new extracted text to the search index"""
+    from search import index_artifacts
+
+    try:
+        stats = index_artifacts(conn)
+        print(f"   Search index: {stats['indexed']} indexed ({stats['paragraphs']} paragraphs)",
+              file=sys.stderr)
+    except sqlite3.Error as e:
+        print(f"⚠️  Search index not updated: {e} (run cli/search.py --index)", file=sys.stderr)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Extract text from PDF and HTML artifacts to markdown',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument('--type', action='append', choices=EXTRACTABLE_TYPES,
+                       help='Only extract this artifact type (repeatable; default: all)')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                       help=f'Extraction processes (default: {DEFAULT_JOBS})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f'Artifacts claimed per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--limit', type=int, help='Stop after this many artifacts')
+    parser.add_argument('--retry-failed', action='store_true',
+                       help='Also extract artifacts that failed before (once each)')
+    parser.add_argument('--artifact-id', type=int, help='Extract only this artifact (any status)')
+    parser.add_argument('--output', help='Markdown path for --artifact-id (default: under data/extracted/)')
+    parser.add_argument('--no-index', action='store_true', help='Do not update the search index')
+
+    args = parser.parse_args()
+
+    if args.output and not args.artifact_id:
+        parser.error("--output requires --artifact-id")
+    if args.jobs < 1 or args.batch_size < 1:
+        parser.error("--jobs and --batch-size must be at least 1")
+
+    conn = get_db_connection()
+    start = time.monotonic()
+
+    if args.artifact_id:
+        try:
+            result = extract_one(conn, args.artifact_id, args.output)
+        except (ValueError, sqlite3.Error) as e:
+            print(f"❌ Error extracting artifact: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        if result['status'] != 'extracted':
+            print(f"❌ Extraction failed: {result['error']}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"✅ Artifact extracted", file=sys.stderr)
+        print(f"   Output: {result['output']}", file=sys.stderr)
+        if result['page_count'] is not None:
+            print(f"   Pages: {result['page_count']}", file=sys.stderr)
+        print(f"   Words: {result['word_count']}", file=sys.stderr)
+        print(result['output'])  # For scripting
+
+        if not args.no_index:
+            index_extracted(conn)
+        return
+
+    types = args.type or list(EXTRACTABLE_TYPES)
+    missing = [t for t in types if t not in available_types()]
+    if missing:
+        print(f"⚠️  PDF extraction needs pymupdf or pdfplumber (pip install pymupdf); "
+              f"pending PDFs are left pending", file=sys.stderr)
+        types = [t for t in types if t not in missing]
+    if not types:
+        print(f"❌ Nothing to extract with the installed libraries", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        stats = extract_pending(conn, types, jobs=args.jobs, batch_size=args.batch_size,
+                                limit=args.limit, retry_failed=args.retry_failed)
+    except sqlite3.Error as e:
+        print(f"❌ Error extracting artifacts: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted; run again to resume", file=sys.stderr)
+        sys.exit(1)
+
+    elapsed = time.monotonic() - start
+    done = stats['extracted'] + stats['failed']
+    print(f"\n✅ Extraction complete", file=sys.stderr)
+    print(f"   Extracted: {stats['extracted']} ({stats['pages']} pages, {stats['words']} words)",
+          file=sys.stderr)
+    print(f"   Failed: {stats['failed']}", file=sys.stderr)
+    if done:
+        print(f"   Time: {elapsed:.1f}s ({done / elapsed:.1f} artifacts/s)", file=sys.stderr)
+
+    if stats['extracted'] and not args.no_index:
+        index_extracted(conn)
+
+
+if __name__ == '__main__':
+    main()
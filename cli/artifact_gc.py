@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Artifact GC CLI Tool
+
+Reconcile the artifact directories with the database:
+
+- orphaned files: files under data/raw/, data/extracted/ and the blob store
+  that nothing in the database refers to (left by aborted jobs, or by
+  failed registrations)
+- dangling rows: artifacts, aliases (artifact_paths) and extracted text
+  whose files are gone (e.g. after scripts/db_init.py --force or a manual
+  cleanup)
+
+The directories are listed once with os.scandir and every referenced path
+is read with one streaming query; the two sets are compared in memory, so
+a tree of 100k files costs no per-file queries. Only orphans are stat'ed,
+for their size and age.
+
+Files changed less than --min-age-hours ago (default 24) are never
+collected: a download may not be registered yet. Hidden files (temporary
+files of running tools) are ignored.
+
+Modes:
+    (default)      Dry run: report only
+    --quarantine   Move orphaned files to data/quarantine/<timestamp>/
+    --delete       Delete orphaned files
+
+With --prune-rows (quarantine/delete only), dangling rows are reconciled
+in one transaction: an artifact whose file is gone is re-pointed at a
+surviving alias, or removed if it has none; missing aliases are removed;
+artifacts whose extracted text is gone are set back to pending extraction.
+Audit trail rows are history and are never changed.
+
+--path limits the scan (and the dangling row check) to some directories.
+
+Orphans and dangling rows are printed to stdout as
+"STATUS<TAB>REF<TAB>PATH<TAB>DETAIL" lines; the size summary goes to stderr.
+
+Usage:
+    python cli/artifact_gc.py
+    python cli/artifact_gc.py --quarantine
+    python cli/artifact_gc.py --delete --prune-rows
+    python cli/artifact_gc.py --path data/raw/italy
+
+Examples:
+    # What would be collected?
+    python cli/artifact_gc.py
+
+    # Move orphans aside for a week before deleting them for good
+    python cli/artifact_gc.py --quarantine
+
+    # After a database rebuild: delete orphans and fix rows pointing at nothing
+    python cli/artifact_gc.py --delete --prune-rows --min-age-hours 0
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from artifact_extract import EXTRACTED_DIR, RAW_DIR
+from blob_store import BLOBS_DIR, blob_path
+from db_common import PROJECT_ROOT, begin_write, get_db_connection
+
+# Tests (TEST_MODE=1) keep their quarantine apart, like their database
+if os.environ.get('TEST_MODE'):
+    QUARANTINE_DIR = PROJECT_ROOT / "data" / "test_quarantine"
+else:
+    QUARANTINE_DIR = PROJECT_ROOT / "data" / "quarantine"
+
+GC_ROOTS = (RAW_DIR, EXTRACTED_DIR, BLOBS_DIR)
+DEFAULT_MIN_AGE_HOURS = 24
+
+# Every path the database refers to, in one pass
+REFERENCES_SQL = """
+    SELECT 'artifact' AS kind, file_path AS path, id AS ref_id, NULL AS compression FROM artifacts
+    UNION ALL
+    SELECT 'alias', path, artifact_id, NULL FROM artifact_paths
+    UNION ALL
+    SELECT 'extracted', extracted_to_path, id, NULL FROM artifacts WHERE extracted_to_path IS NOT NULL
+    UNION ALL
+    SELECT 'trail', artifact_path, id, NULL FROM scraper_audit_trail WHERE artifact_path IS NOT NULL
+    UNION ALL
+    SELECT 'blob', sha256, id, compression FROM artifacts WHERE sha256 IS NOT NULL
+"""
+
+
+def absolute(path) -> str:
+    """Normalized absolute path string (relative paths are relative to the project root)"""
+    return os.path.normpath(os.path.join(PROJECT_ROOT, path))
+
+
+def scan_files(roots: tuple) -> set:
+    """Absolute paths of all non-hidden files under roots (no stat calls)"""
+    files = set()
+    pending = [str(root) for root in roots if root.is_dir()]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    files.add(os.path.normpath(entry.path))
+    return files
+
+
+def load_references(conn: sqlite3.Connection) -> tuple:
+    """
+    Stream every referenced path from the database.
+
+    Returns:
+        (referenced paths, {path: [(kind, ref_id)]} for artifact, alias and
+        extracted rows, {artifact_id: [alias paths]})
+    """
+    referenced = set()
+    rows_by_path = {}
+    aliases = {}
+    for kind, path, ref_id, compression in conn.execute(REFERENCES_SQL):
+        if kind == 'blob':
+            # Either form may exist (stored before or after compression)
+            referenced.add(absolute(blob_path(path)))
+            if compression:
+                referenced.add(absolute(blob_path(path, compression)))
+            continue
+
+        path = absolute(path)
+        referenced.add(path)
+        if kind != 'trail':
+            rows_by_path.setdefault(path, []).append((kind, ref_id))
+        if kind == 'alias':
+            aliases.setdefault(ref_id, []).append(path)
+    return referenced, rows_by_path, aliases
+
+
+def find_dangling(rows_by_path: dict, on_disk: set, roots: tuple) -> dict:
+    """
+    Referenced paths whose files are gone.
+
+    Paths under roots are checked against the scan. On a full scan
+    (roots == GC_ROOTS), the few paths outside them (absolute paths
+    registered from elsewhere) are checked on disk.
+    """
+    prefixes = tuple(os.path.normpath(root) + os.sep for root in roots)
+    dangling = {}
+    for path, rows in rows_by_path.items():
+        if path.startswith(prefixes):
+            gone = path not in on_disk
+        else:
+            gone = roots == GC_ROOTS and under_gc_root(path) is None and not os.path.exists(path)
+        if gone:
+            dangling[path] = rows
+    return dangling
+
+
+def describe_orphans(orphans: set, min_age_hours: float) -> tuple:
+    """
+    Stat orphans and split off those too recent to collect.
+
+    A hard-linked file's data is only freed when all its links go, so the
+    reclaimable size counts an inode only if every link to it is collected.
+
+    Returns:
+        (collectable [(path, size)], number too recent, reclaimable bytes)
+    """
+    cutoff = time.time() - min_age_hours * 3600
+    collectable = []
+    recent = 0
+    links = {}
+    for path in sorted(orphans):
+        try:
+            stat = os.stat(path, follow_symlinks=False)
+        except FileNotFoundError:
+            continue
+        if max(stat.st_mtime, stat.st_ctime) > cutoff:
+            recent += 1
+            continue
+        collectable.append((path, stat.st_size))
+        inode = links.setdefault((stat.st_dev, stat.st_ino), [stat.st_nlink, 0, stat.st_size])
+        inode[1] += 1
+
+    reclaimable = sum(size for nlink, collected, size in links.values() if collected >= nlink)
+    return collectable, recent, reclaimable
+
+
+def remove_empty_parents(path: str, roots: tuple) -> None:
+    """Remove directories emptied by a collection, up to (not including) a root"""
+    roots = {os.path.normpath(root) for root in roots}
+    directory = os.path.dirname(path)
+    while directory not in roots and directory != os.path.dirname(directory):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+
+def collect(files: list, mode: str, roots: tuple, quarantine: Path) -> dict:
+    """
+    Quarantine (move under quarantine, keeping the project-relative path)
+    or delete files.
+
+    Returns:
+        {path: destination (quarantine) or None (deleted)} for files collected
+    """
+    collected = {}
+    for path, size in files:
+        try:
+            if mode == 'quarantine':
+                destination = quarantine / os.path.relpath(path, PROJECT_ROOT)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(path, destination)
+                collected[path] = destination
+            else:
+                os.unlink(path)
+                collected[path] = None
+        except OSError as e:
+            print(f"⚠️  Could not {mode} {path}: {e}", file=sys.stderr)
+            continue
+        remove_empty_parents(path, roots)
+    return collected
+
+
+def prune_rows(conn: sqlite3.Connection, dangling: dict, aliases: dict) -> dict:
+    """
+    Reconcile rows whose files are gone, in one transaction.
+
+    Returns:
+        dict with repointed, removed (artifacts), aliases and extractions counts
+    """
+    counts = {'repointed': 0, 'removed': 0, 'aliases': 0, 'extractions': 0}
+    gone_aliases = []
+    gone_artifacts = []
+    gone_extractions = []
+    for path, rows in dangling.items():
+        for kind, ref_id in rows:
+            if kind == 'alias':
+                gone_aliases.append((os.path.relpath(path, PROJECT_ROOT), path, ref_id))
+            elif kind == 'artifact':
+                gone_artifacts.append(ref_id)
+            else:
+                gone_extractions.append(ref_id)
+
+    try:
+        begin_write(conn)
+        # Stored paths may be relative or absolute: match both forms
+        conn.executemany("DELETE FROM artifact_paths WHERE path IN (?, ?)",
+                         [(relative, path) for relative, path, _ in gone_aliases])
+        counts['aliases'] = len(gone_aliases)
+
+        for artifact_id in gone_artifacts:
+            surviving = sorted(set(aliases.get(artifact_id, [])) - set(dangling))
+            if surviving:
+                conn.execute("UPDATE artifacts SET file_path = ? WHERE id = ?",
+                             (os.path.relpath(surviving[0], PROJECT_ROOT), artifact_id))
+                counts['repointed'] += 1
+            else:
+                conn.execute("DELETE FROM artifact_paths WHERE artifact_id = ?", (artifact_id,))
+                conn.execute("DELETE FROM artifact_extraction_claims WHERE artifact_id = ?", (artifact_id,))
+                conn.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,))
+                counts['removed'] += 1
+
+        conn.executemany("""
+            UPDATE artifacts SET
+                extraction_status = 'pending', extracted_to_path = NULL,
+                extraction_error = NULL, page_count = NULL, word_count = NULL
+            WHERE id = ?
+        """, [(artifact_id,) for artifact_id in set(gone_extractions) - set(gone_artifacts)])
+        counts['extractions'] = len(set(gone_extractions) - set(gone_artifacts))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
+
+
+def format_size(size: int) -> str:
+    """Human-readable byte count"""
+    for unit in ('bytes', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:,} {unit}" if unit == 'bytes' else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def under_gc_root(path: str) -> str:
+    """Project-relative name of the GC root a path is under, or None"""
+    for root in GC_ROOTS:
+        if path.startswith(os.path.normpath(root) + os.sep):
+            return os.path.relpath(root, PROJECT_ROOT)
+    return None
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Collect orphaned artifact files and reconcile dangling rows',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true', help='Report only (default)')
+    mode.add_argument('--quarantine', action='store_true', help='Move orphaned files to data/quarantine/')
+    mode.add_argument('--delete', action='store_true', help='Delete orphaned files')
+    parser.add_argument('--prune-rows', action='store_true',
+                       help='Also reconcile rows whose files are gone (with --quarantine/--delete)')
+    parser.add_argument('--min-age-hours', type=float, default=DEFAULT_MIN_AGE_HOURS,
+                       help=f'Keep files changed more recently (default: {DEFAULT_MIN_AGE_HOURS})')
+    parser.add_argument('--path', action='append',
+                       help='Only scan this directory (repeatable; default: data/raw, data/extracted, blobs)')
+
+    args = parser.parse_args()
+
+    mode = 'quarantine' if args.quarantine else 'delete' if args.delete else 'dry-run'
+    if args.prune_rows and mode == 'dry-run':
+        parser.error("--prune-rows requires --quarantine or --delete")
+
+    roots = GC_ROOTS
+    if args.path:
+        roots = tuple(Path(absolute(path)) for path in args.path)
+        outside = [str(root) for root in roots if under_gc_root(str(root) + os.sep) is None]
+        if outside:
+            parser.error(f"--path must be inside data/raw, data/extracted or the blob store: {', '.join(outside)}")
+
+    conn = get_db_connection()
+    start = time.monotonic()
+
+    try:
+        on_disk = scan_files(roots)
+        referenced, rows_by_path, aliases = load_references(conn)
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Error reading artifacts: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    orphans = on_disk - referenced
+    dangling = find_dangling(rows_by_path, on_disk, roots)
+    collectable, recent, reclaimable = describe_orphans(orphans, args.min_age_hours)
+
+    collected = {}
+    quarantine = QUARANTINE_DIR / datetime.now().strftime('%Y%m%d-%H%M%S')
+    if mode != 'dry-run':
+        collected = collect(collectable, mode, roots, quarantine)
+
+    status = {'dry-run': 'orphaned', 'quarantine': 'quarantined', 'delete': 'deleted'}[mode]
+    for path, size in collectable:
+        if mode == 'dry-run' or path in collected:
+            detail = os.path.relpath(collected[path], PROJECT_ROOT) if collected.get(path) else format_size(size)
+            print(f"{status}\t-\t{os.path.relpath(path, PROJECT_ROOT)}\t{detail}")  # For scripting
+    for path, rows in sorted(dangling.items()):
+        for kind, ref_id in rows:
+            print(f"dangling\t{kind}:{ref_id}\t{os.path.relpath(path, PROJECT_ROOT)}\t")
+
+    pruned = None
+    if args.prune_rows and dangling:
+        try:
+            pruned = prune_rows(conn, dangling, aliases)
+        except sqlite3.Error as e:
+            print(f"❌ Error pruning rows: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    # Size summary
+    by_root = {}
+    for path, size in collectable:
+        count, total = by_root.get(under_gc_root(path), (0, 0))
+        by_root[under_gc_root(path)] = (count + 1, total + size)
+
+    elapsed = time.monotonic() - start
+    verb = {'dry-run': 'Would collect', 'quarantine': 'Quarantined', 'delete': 'Deleted'}[mode]
+    done = len(collectable) if mode == 'dry-run' else len(collected)
+    print(f"\n{'🔍' if mode == 'dry-run' else '✅'} Artifact GC ({mode})", file=sys.stderr)
+    print(f"   Scanned: {len(on_disk):,} files, {len(referenced):,} referenced paths", file=sys.stderr)
+    print(f"   {verb}: {done:,} orphaned files "
+          f"({format_size(sum(size for _, size in collectable))}, "
+          f"{format_size(reclaimable)} reclaimable)", file=sys.stderr)
+    for root, (count, total) in sorted(by_root.items()):
+        print(f"      {root}: {count:,} files, {format_size(total)}", file=sys.stderr)
+    if recent:
+        print(f"   Kept (changed in the last {args.min_age_hours:g} h): {recent:,}", file=sys.stderr)
+    if mode == 'quarantine' and collected:
+        print(f"   Quarantine: {os.path.relpath(quarantine, PROJECT_ROOT)}", file=sys.stderr)
+    print(f"   Dangling rows: {sum(len(rows) for rows in dangling.values()):,}", file=sys.stderr)
+    if pruned:
+        print(f"   Pruned: {pruned['removed']} artifacts removed, {pruned['repointed']} re-pointed, "
+              f"{pruned['aliases']} aliases removed, {pruned['extractions']} set to re-extract",
+              file=sys.stderr)
+    elif dangling and mode != 'dry-run':
+        print(f"   (run with --prune-rows to reconcile them)", file=sys.stderr)
+    print(f"   Time: {elapsed:.2f}s", file=sys.stderr)
+    if mode == 'dry-run' and collectable:
+        print(f"\n   Run with --quarantine or --delete to collect", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,41 +5,57 @@ Artifact Register CLI Tool
 Register a downloaded artifact (PDF, HTML, screenshot, etc.) in the database.
 Computes SHA256 hash for deduplication and links to audit trail.
 
+Content is stored once (cli/blob_store.py): the registered path becomes a
+hard link to data/blobs/<sha256>, and a duplicate download is replaced by a
+link to the same blob and recorded as an alias in artifact_paths.
+
+HTML and extracted text are stored compressed: page.html is registered as
+page.html.gz (.zst with zstandard installed) and the uncompressed file is
+removed once registered; audit trail rows that pointed at page.html are
+re-pointed at page.html.gz. The SHA256 and file_size_bytes are those of the
+uncompressed content.
+
 Usage:
     python cli/artifact_register.py --type pdf --path "data/raw/italy/visa.pdf" --title "..."
+    python cli/artifact_register.py --type pdf --dir data/raw/italy --glob "*.pdf" --country Italy
 """
 
 import sqlite3
 import sys
-import hashlib
-import os
 from pathlib import Path
 from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
+from blob_store import (blob_path, find_compressed_copies, project_relative, record_alias,
+                        remove_uncompressed, repoint_trail, store_artifact, stored_path, unstore_artifact)
+from db_common import PROJECT_ROOT, begin_write, get_db_connection
+from file_hash import cached_sha256, cached_sha256_files
+from job_counters import add_job_counts
+
+INSERT_ARTIFACT_SQL = """
+    INSERT INTO artifacts (
+        trail_id,
+        source_id,
+        artifact_type,
+        file_path,
+        file_name,
+        file_size_bytes,
+        mime_type,
+        sha256,
+        title,
+        description,
+        source_url,
+        language,
+        downloaded_at,
+        extraction_status,
+        country,
+        pathway_type,
+        compression,
+        compressed_size_bytes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-def compute_sha256(file_path: Path) -> str:
-    """Compute SHA256 hash of a file"""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+# Hashes per "sha256 IN (...)" lookup
+LOOKUP_BATCH_SIZE = 500
 
 
 def get_mime_type(file_path: Path) -> str:
@@ -56,7 +72,9 @@ def get_mime_type(file_path: Path) -> str:
         '.doc': 'application/msword',
         '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
         '.txt': 'text/plain',
-        '.md': 'text/markdown'
+        '.md': 'text/markdown',
+        '.gz': 'application/gzip',
+        '.zst': 'application/zstd'
     }
     return mime_types.get(ext, 'application/octet-stream')
 
@@ -71,16 +89,21 @@ def register_artifact(
     description: str = None,
     country: str = None,
     pathway_type: str = None,
-    language: str = 'en'
+    language: str = 'en',
+    verify: bool = False
 ) -> int:
     """
     Register an artifact in the database.
 
+    The file is hashed unless the hash cache has it (verify: always hash).
+
     Returns:
         artifact_id (int): The ID of the registered artifact
     """
     conn = get_db_connection()
     cursor = conn.cursor()
+    stored = None
+    committed = False
 
     try:
         # Resolve file path
@@ -97,48 +120,45 @@ def register_artifact(
         file_name = full_path.name
         mime_type = get_mime_type(full_path)
 
-        # Compute hash
+        # Compute hash (of the uncompressed content, for a compressed copy already stored)
         print(f"🔍 Computing SHA256 hash...", file=sys.stderr)
-        sha256_hash = compute_sha256(full_path)
+        compression = find_compressed_copies(conn, [full_path]).get(full_path)
+        sha256_hash = cached_sha256(full_path, verify, decompress=compression is not None)
+
+        # Share the bytes with the blob store (before taking the write lock)
+        stored = store_artifact(full_path, sha256_hash, artifact_type, compression)
+        link_type = stored['link_type']
+
+        # Make path relative to project root
+        relative_path = project_relative(stored['path'])
+
+        # Take the write lock before the duplicate check
+        begin_write(conn)
+
+        # The compressed file replaces full_path in the audit trail too
+        if stored['path'] != full_path:
+            repoint_trail(cursor, [full_path], stored['compression'])
 
         # Check for duplicates
         cursor.execute("SELECT id, file_path FROM artifacts WHERE sha256 = ?", (sha256_hash,))
         existing = cursor.fetchone()
 
         if existing:
+            # Record this path as another name for the same content
+            record_alias(cursor, str(relative_path), existing['id'], link_type)
+            conn.commit()
+            committed = True
+            remove_uncompressed(full_path, stored)
             print(f"⚠️  Artifact already registered (ID: {existing['id']})", file=sys.stderr)
             print(f"   Existing path: {existing['file_path']}", file=sys.stderr)
             print(f"   Duplicate detected via SHA256: {sha256_hash[:16]}...", file=sys.stderr)
+            if link_type and str(relative_path) != existing['file_path']:
+                print(f"   Deduplicated: {relative_path} now links to {blob_path(sha256_hash)}", file=sys.stderr)
             print(existing['id'])  # Output to stdout for scripting
             return existing['id']
 
-        # Make path relative to project root
-        try:
-            relative_path = full_path.relative_to(PROJECT_ROOT)
-        except ValueError:
-            relative_path = full_path
-
         # Insert artifact
-        cursor.execute("""
-            INSERT INTO artifacts (
-                trail_id,
-                source_id,
-                artifact_type,
-                file_path,
-                file_name,
-                file_size_bytes,
-                mime_type,
-                sha256,
-                title,
-                description,
-                source_url,
-                language,
-                downloaded_at,
-                extraction_status,
-                country,
-                pathway_type
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(INSERT_ARTIFACT_SQL, (
             trail_id,
             source_id,
             artifact_type,
@@ -154,8 +174,12 @@ def register_artifact(
             datetime.now().isoformat(),
             'pending',
             country,
-            pathway_type
+            pathway_type,
+            stored['compression'],
+            stored['compressed_size']
         ))
+        artifact_id = cursor.lastrowid
+        record_alias(cursor, str(relative_path), artifact_id, link_type)
 
         # Update job statistics if trail_id provided
         if trail_id:
@@ -164,15 +188,11 @@ def register_artifact(
             """, (trail_id,))
             result = cursor.fetchone()
             if result:
-                job_run_id = result['job_run_id']
-                cursor.execute("""
-                    UPDATE job_run
-                    SET artifacts_downloaded = artifacts_downloaded + 1
-                    WHERE id = ?
-                """, (job_run_id,))
+                add_job_counts(cursor, result['job_run_id'], artifacts_downloaded=1)
 
         conn.commit()
-        artifact_id = cursor.lastrowid
+        committed = True
+        remove_uncompressed(full_path, stored)
 
         # Print summary
         print(f"✅ Artifact registered successfully", file=sys.stderr)
@@ -181,7 +201,13 @@ def register_artifact(
         print(f"   Title: {title}", file=sys.stderr)
         print(f"   Path: {relative_path}", file=sys.stderr)
         print(f"   Size: {file_size:,} bytes ({file_size / 1024:.1f} KB)", file=sys.stderr)
+        if stored['compressed_size'] is not None:
+            compressed_size = stored['compressed_size']
+            print(f"   Stored: {compressed_size:,} bytes {stored['compression']} "
+                  f"({file_size / max(compressed_size, 1):.1f}x)", file=sys.stderr)
         print(f"   Hash: {sha256_hash[:16]}...", file=sys.stderr)
+        blob = blob_path(sha256_hash, stored['compression'])
+        print(f"   Blob: {blob if link_type else 'not linked (separate copy)'}", file=sys.stderr)
         if country:
             print(f"   Country: {country}", file=sys.stderr)
 
@@ -193,9 +219,211 @@ def register_artifact(
     except Exception as e:
         print(f"❌ Error registering artifact: {e}", file=sys.stderr)
         conn.rollback()
+        if stored and not committed:
+            unstore_artifact(full_path, stored)
         sys.exit(1)
-    finally:
-        conn.close()
+
+
+def find_known_hashes(cursor: sqlite3.Cursor, hashes: list) -> dict:
+    """Look up registered artifacts by SHA256 in batches: {sha256: (id, file_path)}"""
+    known = {}
+    for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+        batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+        cursor.execute(f"""
+            SELECT id, file_path, sha256 FROM artifacts
+            WHERE sha256 IN ({', '.join('?' for _ in batch)})
+        """, batch)
+        for row in cursor.fetchall():
+            known[row['sha256']] = (row['id'], row['file_path'])
+    return known
+
+
+def find_known_paths(cursor: sqlite3.Cursor, paths: list) -> dict:
+    """Look up registered artifacts by file_path in batches: {file_path: id}"""
+    known = {}
+    for start in range(0, len(paths), LOOKUP_BATCH_SIZE):
+        batch = paths[start:start + LOOKUP_BATCH_SIZE]
+        cursor.execute(f"""
+            SELECT id, file_path FROM artifacts
+            WHERE file_path IN ({', '.join('?' for _ in batch)})
+        """, batch)
+        for row in cursor.fetchall():
+            known[row['file_path']] = row['id']
+    return known
+
+
+def register_directory(
+    artifact_type: str,
+    directory: str,
+    pattern: str = '*',
+    title: str = None,
+    trail_id: int = None,
+    source_id: int = None,
+    source_url: str = None,
+    description: str = None,
+    country: str = None,
+    pathway_type: str = None,
+    language: str = 'en',
+    workers: int = None,
+    verify: bool = False
+) -> dict:
+    """
+    Register every file in a directory matching a glob pattern.
+
+    Files not in the hash cache (all files, with verify) are hashed on a
+    thread pool; hashes already in the database are found with batched
+    IN (...) lookups, and all new files are inserted in one transaction.
+    Each file is titled with its name (prefixed by title, if given).
+
+    A file whose path is registered with other content is skipped before
+    it is stored; files stored for a transaction that rolls back are
+    taken out of the blob store again (see blob_store.unstore_artifact).
+
+    Returns:
+        {relative file path: artifact_id} for every matching file
+        that is registered (new or already known)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    root = Path(directory)
+    if not root.is_absolute():
+        root = PROJECT_ROOT / directory
+
+    if not root.is_dir():
+        print(f"❌ Directory not found: {root}", file=sys.stderr)
+        sys.exit(1)
+
+    files = sorted(path for path in root.glob(pattern) if path.is_file())
+    if not files:
+        print(f"⚠️  No files matching {pattern} in {root}", file=sys.stderr)
+        return {}
+
+    stored = {}
+    try:
+        print(f"🔍 Computing SHA256 hashes for {len(files)} files...", file=sys.stderr)
+        compressed = find_compressed_copies(conn, files)
+        hashes = cached_sha256_files(files, workers, verify, decompress=set(compressed))
+
+        relative_paths = {path: str(project_relative(stored_path(path, artifact_type))) for path in files}
+
+        def changed_since_registered(path) -> bool:
+            """Same path, different content: leave the existing record alone"""
+            if hashes[path] in known or relative_paths[path] not in known_paths:
+                return False
+            print(f"⚠️  {relative_paths[path]} changed since it was registered "
+                  f"(ID: {known_paths[relative_paths[path]]}); skipped", file=sys.stderr)
+            return True
+
+        # Files that will be skipped are not stored (checked again under the lock)
+        known = find_known_hashes(cursor, list(set(hashes.values())))
+        known_paths = find_known_paths(cursor, list(relative_paths.values()))
+        skipped = {path for path in files if changed_since_registered(path)}
+
+        # Share the bytes with the blob store (before taking the write lock)
+        for path in files:
+            if path not in skipped:
+                stored[path] = store_artifact(path, hashes[path], artifact_type, compressed.get(path))
+
+        # Take the write lock before the duplicate check
+        begin_write(conn)
+
+        known = find_known_hashes(cursor, list(set(hashes.values())))
+        known_paths = find_known_paths(cursor, list(relative_paths.values()))
+
+        mapping = {}
+        rows = []
+        deduplicated = 0
+        downloaded_at = datetime.now().isoformat()
+        for path in stored:
+            sha256_hash = hashes[path]
+            relative_path = relative_paths[path]
+
+            if sha256_hash in known:
+                artifact_id, known_path = known[sha256_hash]
+                mapping[relative_path] = artifact_id
+                record_alias(cursor, relative_path, artifact_id, stored[path]['link_type'])
+                if stored[path]['link_type'] and relative_path != known_path:
+                    deduplicated += 1
+                continue
+            if changed_since_registered(path):
+                # Registered by another process in the meantime
+                skipped.add(path)
+                continue
+
+            cursor.execute(INSERT_ARTIFACT_SQL, (
+                trail_id,
+                source_id,
+                artifact_type,
+                relative_path,
+                path.name,
+                path.stat().st_size,
+                get_mime_type(path),
+                sha256_hash,
+                f"{title} - {path.name}" if title else path.name,
+                description,
+                source_url,
+                language,
+                downloaded_at,
+                'pending',
+                country,
+                pathway_type,
+                stored[path]['compression'],
+                stored[path]['compressed_size']
+            ))
+            artifact_id = cursor.lastrowid
+            record_alias(cursor, relative_path, artifact_id, stored[path]['link_type'])
+            mapping[relative_path] = artifact_id
+            known[sha256_hash] = (artifact_id, relative_path)  # Duplicates within the directory
+            rows.append(artifact_id)
+
+        # Update job statistics if trail_id provided
+        if trail_id and rows:
+            cursor.execute("""
+                SELECT job_run_id FROM scraper_audit_trail WHERE id = ?
+            """, (trail_id,))
+            result = cursor.fetchone()
+            if result:
+                add_job_counts(cursor, result['job_run_id'], artifacts_downloaded=len(rows))
+
+        # The compressed files replace the registered originals in the audit trail too
+        replaced = [path for path in stored
+                    if relative_paths[path] in mapping and stored[path]['path'] != path]
+        if replaced:
+            repoint_trail(cursor, replaced)
+
+        conn.commit()
+
+    except Exception as e:
+        print(f"❌ Error registering artifacts: {e}", file=sys.stderr)
+        conn.rollback()
+        # Last stored first, so a blob created for an earlier duplicate can go too
+        for path in reversed(list(stored)):
+            unstore_artifact(path, stored[path])
+        sys.exit(1)
+
+    for path in sorted(skipped, reverse=True):
+        if path in stored:
+            unstore_artifact(path, stored[path])
+
+    compressed = [path for path in replaced if remove_uncompressed(path, stored[path])]
+
+    # Print summary
+    print(f"✅ Registered {len(rows)} new artifacts from {project_relative(root)}", file=sys.stderr)
+    print(f"   Already registered: {len(mapping) - len(rows)}", file=sys.stderr)
+    if deduplicated:
+        print(f"   Deduplicated: {deduplicated} (now linked to stored content)", file=sys.stderr)
+    if skipped:
+        print(f"   Skipped: {len(skipped)}", file=sys.stderr)
+    if compressed:
+        stored_bytes = sum(stored[path]['compressed_size'] for path in compressed)
+        print(f"   Compressed: {len(compressed)} ({stored_bytes:,} bytes stored)", file=sys.stderr)
+
+    # Output "ID<TAB>path" per file to stdout for scripting
+    for relative_path, artifact_id in mapping.items():
+        print(f"{artifact_id}\t{relative_path}")
+
+    return mapping
 
 
 def main():
@@ -224,6 +452,13 @@ Examples:
         --country Denmark \\
         --pathway digital_nomad
 
+    # Register every PDF in a scrape directory (prints "ID<TAB>path" per file)
+    python cli/artifact_register.py \\
+        --type pdf \\
+        --dir "data/raw/italy" \\
+        --glob "*.pdf" \\
+        --country Italy
+
     # Capture artifact ID
     artifact_id=$(python cli/artifact_register.py \\
         --type pdf \\
@@ -237,8 +472,14 @@ Examples:
                        choices=['pdf', 'html', 'screenshot', 'zip', 'doc', 'docx',
                                'extracted_text', 'extracted_table', 'extracted_list'],
                        help='Artifact type')
-    parser.add_argument('--path', required=True, help='File path (relative or absolute)')
-    parser.add_argument('--title', required=True, help='Artifact title')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--path', help='File path (relative or absolute)')
+    target.add_argument('--dir', help='Register every matching file in this directory')
+    parser.add_argument('--glob', default='*',
+                       help='File pattern for --dir, e.g. "*.pdf" or "**/*.pdf" (default: *)')
+    parser.add_argument('--jobs', type=int, help='Hashing threads for --dir (default: up to 8)')
+    parser.add_argument('--title', help='Artifact title (required with --path; title prefix with --dir)')
+    parser.add_argument('--verify', action='store_true', help='Re-hash files even if the hash cache has them')
     parser.add_argument('--trail-id', type=int, help='Audit trail ID (for linking)')
     parser.add_argument('--source-id', type=int, help='Source ID (for linking)')
     parser.add_argument('--source-url', help='Source URL')
@@ -249,6 +490,27 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.dir:
+        register_directory(
+            artifact_type=args.type,
+            directory=args.dir,
+            pattern=args.glob,
+            title=args.title,
+            trail_id=args.trail_id,
+            source_id=args.source_id,
+            source_url=args.source_url,
+            description=args.description,
+            country=args.country,
+            pathway_type=args.pathway,
+            language=args.language,
+            workers=args.jobs,
+            verify=args.verify
+        )
+        return
+
+    if not args.title:
+        parser.error("--title is required with --path")
+
     register_artifact(
         artifact_type=args.type,
         file_path=args.path,
@@ -259,7 +521,8 @@ Examples:
         description=args.description,
         country=args.country,
         pathway_type=args.pathway,
-        language=args.language
+        language=args.language,
+        verify=args.verify
     )
 
 
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Artifact Verify CLI Tool
+
+Check that the files the database points at are still there and unchanged:
+
+- artifacts.file_path and every alias in artifact_paths against
+  artifacts.sha256 (and the recorded size)
+- scraper_audit_trail.artifact_path against artifact_hash
+- artifacts.extracted_to_path (existence only)
+
+and list orphaned files: files under data/raw/ and data/extracted/ that
+nothing in the database refers to.
+
+Files are stat'ed first, on a bounded thread pool. A file whose size differs
+from the recorded one is reported as modified without reading it; the rest
+are only re-hashed if the hash cache (file_hashes) has no digest for their
+current size and mtime. --full re-hashes everything. The blob store's
+compressed copies are checked against the hash of their uncompressed
+content, so they are always read.
+
+Problems are printed to stdout as "STATUS<TAB>REF<TAB>PATH<TAB>DETAIL"
+lines (or one JSON report with --json); the summary goes to stderr. Exits
+with code 1 if anything is missing, modified or orphaned.
+
+Usage:
+    python cli/artifact_verify.py
+    python cli/artifact_verify.py --jobs 16 --full
+    python cli/artifact_verify.py --json > verify_report.json
+
+Examples:
+    # Nightly check (fast: only files changed since the last run are read)
+    python cli/artifact_verify.py
+
+    # Re-read every file, e.g. to catch silent corruption
+    python cli/artifact_verify.py --full
+
+    # Only missing files
+    python cli/artifact_verify.py --no-orphans | grep '^missing'
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from artifact_extract import EXTRACTED_DIR, RAW_DIR
+from blob_store import COMPRESSION_SUFFIXES, compression_of
+from db_common import PROJECT_ROOT, get_db_connection
+from file_hash import DEFAULT_HASH_WORKERS, lookup_hashes, sha256_file, store_hashes
+
+# Directories scanned for orphaned files
+ORPHAN_ROOTS = (RAW_DIR, EXTRACTED_DIR)
+
+STATUSES = ('missing', 'modified', 'orphaned', 'error')
+
+
+def resolve(path: str) -> Path:
+    """Absolute path of a stored path (relative paths are relative to the project root)"""
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def is_compressed_copy(path: Path, row: sqlite3.Row) -> bool:
+    """True if path is the blob store's compressed copy of a compressed artifact (hashed decompressed)"""
+    return row['compression'] is not None and compression_of(path) == row['compression']
+
+
+def expected_size(path: Path, row: sqlite3.Row) -> int:
+    """Size the file at path should have on disk, or None if unknown"""
+    if is_compressed_copy(path, row):
+        return row['compressed_size_bytes']
+    if row['compression'] is not None and compression_of(path):
+        return None
+    return row['file_size_bytes']
+
+
+def load_checks(conn: sqlite3.Connection) -> list:
+    """
+    Everything the database expects on disk.
+
+    Returns:
+        list of dicts with ref, path, sha256 (None: existence only), size
+        (None: unknown) and decompress (hash the uncompressed content)
+    """
+    checks = []
+    for row in conn.execute("""
+        SELECT id, file_path, sha256, file_size_bytes, compression, compressed_size_bytes, extracted_to_path
+        FROM artifacts
+    """):
+        path = resolve(row['file_path'])
+        checks.append({'ref': f"artifact:{row['id']}", 'path': path, 'sha256': row['sha256'],
+                       'size': expected_size(path, row), 'decompress': is_compressed_copy(path, row)})
+        if row['extracted_to_path']:
+            checks.append({'ref': f"extracted:{row['id']}", 'path': resolve(row['extracted_to_path']),
+                           'sha256': None, 'size': None, 'decompress': False})
+
+    for row in conn.execute("""
+        SELECT p.path, a.id, a.sha256, a.file_size_bytes, a.compression, a.compressed_size_bytes
+        FROM artifact_paths p
+        JOIN artifacts a ON a.id = p.artifact_id
+        WHERE p.path != a.file_path
+    """):
+        path = resolve(row['path'])
+        checks.append({'ref': f"alias:{row['id']}", 'path': path, 'sha256': row['sha256'],
+                       'size': expected_size(path, row), 'decompress': is_compressed_copy(path, row)})
+
+    # Trail rows re-pointed at a compressed copy recorded the hash of the original
+    compressed_copies = {check['path'] for check in checks if check['decompress']}
+    for row in conn.execute("""
+        SELECT id, artifact_path, artifact_hash FROM scraper_audit_trail
+        WHERE artifact_path IS NOT NULL AND artifact_hash IS NOT NULL
+    """):
+        path = resolve(row['artifact_path'])
+        checks.append({'ref': f"trail:{row['id']}", 'path': path, 'sha256': row['artifact_hash'],
+                       'size': None, 'decompress': path in compressed_copies})
+    return checks
+
+
+def try_stat(path: Path) -> tuple:
+    """
+    Stat a file, tolerating files that are missing or cannot be stat'ed.
+
+    Returns:
+        (os.stat result or None if missing or unreadable, error message or None)
+    """
+    try:
+        return path.stat(), None
+    except FileNotFoundError:
+        return None, None
+    except OSError as e:  # e.g. permission denied, symlink loop: report, keep going
+        return None, f"{type(e).__name__}: {e}"
+
+
+def try_hash(path: Path, decompress: bool = False) -> tuple:
+    """
+    Hash a file, tolerating files that disappear or change meanwhile.
+
+    Returns:
+        (digest or None, stat after hashing or None, error message or None)
+    """
+    try:
+        digest = sha256_file(path, decompress)
+        return digest, path.stat(), None
+    except Exception as e:  # Unreadable or corrupt (e.g. truncated .gz): report, keep going
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+def compressed_sibling(path: Path, stats: dict) -> Path:
+    """
+    The compressed file an audit trail path was replaced by (page.html ->
+    page.html.gz, see blob_store.store_compressed), or None. Trail rows are
+    re-pointed when the file is registered; this covers older rows.
+    """
+    for suffix in COMPRESSION_SUFFIXES.values():
+        candidate = path.with_name(path.name + suffix)
+        stat = stats.get(candidate) or try_stat(candidate)[0]
+        if stat:
+            stats[candidate] = stat
+            return candidate
+    return None
+
+
+def find_orphans(roots: tuple, referenced: set) -> list:
+    """Files under roots that are not in referenced (hidden temporary files are skipped)"""
+    orphans = []
+    pending = [root for root in roots if root.is_dir()]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif Path(entry.path) not in referenced:
+                    orphans.append(Path(entry.path))
+    return sorted(orphans)
+
+
+def verify_artifacts(conn: sqlite3.Connection, workers: int = DEFAULT_HASH_WORKERS,
+                     full: bool = False, orphans: bool = True) -> tuple:
+    """
+    Verify every file the database refers to.
+
+    Args:
+        workers: Threads for stat'ing and hashing
+        full: Re-hash every file instead of trusting the hash cache
+        orphans: Also scan ORPHAN_ROOTS for unreferenced files
+
+    Returns:
+        (problems, stats) - problems is a list of (status, ref, path, detail)
+    """
+    start = time.monotonic()
+    checks = load_checks(conn)
+    problems = []
+    stats = {'checked': len(checks), 'files': 0, 'hashed': 0, 'hashed_bytes': 0, 'cached': 0,
+             'size_mismatch': 0}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # 1. Stat every distinct file
+        paths = sorted({check['path'] for check in checks})
+        stats['files'] = len(paths)
+        file_stats = {}
+        unreadable = set()
+        for path, (stat, error) in zip(paths, pool.map(try_stat, paths)):
+            file_stats[path] = stat
+            if error:
+                unreadable.add(path)
+                problems.append(('error', '-', path, error))
+
+        # 2. Decide what needs a digest; sizes alone catch most modifications
+        need_digest = set()
+        decompress = set()
+        for check in checks:
+            path = check['path']
+            if path in unreadable:
+                check['done'] = True  # Reported above
+                continue
+            if file_stats.get(path) is None and check['ref'].startswith('trail:'):
+                sibling = compressed_sibling(path, file_stats)
+                if sibling:
+                    check['path'] = path = sibling
+                    check['decompress'] = True
+            stat = file_stats.get(path)
+            if stat is None:
+                problems.append(('missing', check['ref'], path, None))
+                check['done'] = True
+            elif check['size'] is not None and stat.st_size != check['size']:
+                problems.append(('modified', check['ref'], path,
+                                 f"size {stat.st_size:,} bytes, expected {check['size']:,}"))
+                stats['size_mismatch'] += 1
+                check['done'] = True
+            elif check['sha256']:
+                need_digest.add(path)
+                if check['decompress']:
+                    decompress.add(path)
+            else:
+                check['done'] = True
+
+        # 3. Cached digests for unchanged files, hash the rest (compressed
+        # copies are hashed decompressed, and not cached)
+        present = {path: file_stats[path] for path in need_digest if path not in decompress}
+        digests = {} if full else lookup_hashes(conn, present)
+        stats['cached'] = len(digests)
+
+        to_hash = sorted(path for path in need_digest if path not in digests)
+        rows = []
+        hashed = pool.map(lambda path: try_hash(path, path in decompress), to_hash)
+        for path, (digest, after, error) in zip(to_hash, hashed):
+            if error:
+                digests[path] = None
+                problems.append(('error', '-', path, error))
+                continue
+            digests[path] = digest
+            stats['hashed'] += 1
+            stats['hashed_bytes'] += after.st_size
+            if path in decompress:
+                continue
+            before = present[path]
+            if (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns):
+                rows.append((after.st_dev, after.st_ino, after.st_size, after.st_mtime_ns, digest, str(path)))
+        store_hashes(conn, rows)
+
+    for check in checks:
+        if check.get('done'):
+            continue
+        digest = digests.get(check['path'])
+        if digest and digest != check['sha256']:
+            problems.append(('modified', check['ref'], check['path'],
+                             f"sha256 {digest[:16]}..., expected {check['sha256'][:16]}..."))
+
+    if orphans:
+        referenced = {check['path'] for check in checks}
+        problems.extend(('orphaned', '-', path, None) for path in find_orphans(ORPHAN_ROOTS, referenced))
+
+    stats['seconds'] = time.monotonic() - start
+    return problems, stats
+
+
+def display_path(path: Path) -> str:
+    """Path relative to the project root when inside it"""
+    try:
+        return str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        return str(path)
+
+
+def print_summary(problems: list, stats: dict) -> None:
+    """Print counts and throughput to stderr"""
+    counts = {status: sum(1 for problem in problems if problem[0] == status) for status in STATUSES}
+    seconds = max(stats['seconds'], 1e-6)
+    megabytes = stats['hashed_bytes'] / (1024 * 1024)
+
+    if problems:
+        print(f"\n⚠️  Artifact verification found {len(problems)} problem(s)", file=sys.stderr)
+    else:
+        print(f"\n✅ All artifacts verified", file=sys.stderr)
+    print(f"   Checked: {stats['checked']} references to {stats['files']} files", file=sys.stderr)
+    print(f"   Missing: {counts['missing']}", file=sys.stderr)
+    print(f"   Modified: {counts['modified']}", file=sys.stderr)
+    print(f"   Orphaned: {counts['orphaned']}", file=sys.stderr)
+    if counts['error']:
+        print(f"   Unreadable: {counts['error']}", file=sys.stderr)
+    print(f"   Hashed: {stats['hashed']} files ({megabytes:.1f} MB); "
+          f"cached: {stats['cached']}; size mismatches: {stats['size_mismatch']}", file=sys.stderr)
+    print(f"   Time: {seconds:.2f}s ({stats['files'] / seconds:.0f} files/s, "
+          f"{megabytes / seconds:.1f} MB/s hashed)", file=sys.stderr)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Verify artifact files against the database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument('--jobs', type=int, default=DEFAULT_HASH_WORKERS,
+                       help=f'Threads for stat and hashing (default: {DEFAULT_HASH_WORKERS})')
+    parser.add_argument('--full', action='store_true', help='Re-hash every file, ignoring the hash cache')
+    parser.add_argument('--no-orphans', action='store_true', help='Skip the scan for unreferenced files')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    conn = get_db_connection()
+
+    try:
+        problems, stats = verify_artifacts(conn, workers=args.jobs, full=args.full,
+                                           orphans=not args.no_orphans)
+    except sqlite3.Error as e:
+        print(f"❌ Error verifying artifacts: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({
+            'problems': [{'status': status, 'ref': ref, 'path': display_path(path), 'detail': detail}
+                         for status, ref, path, detail in problems],
+            'stats': stats
+        }, indent=2))
+    else:
+        for status, ref, path, detail in problems:
+            print(f"{status}\t{ref}\t{display_path(path)}\t{detail or ''}")  # For scripting
+
+    print_summary(problems, stats)
+
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Audit Logging Daemon
+
+Long-running process that logs audit trail entries on behalf of
+cli/audit_log_client.py. Agents that log thousands of actions per job
+avoid paying interpreter startup, a fresh connection and an fsync per
+action: the daemon keeps one warm connection, caches known job IDs and
+group-commits bursts of scraper_audit_trail inserts.
+
+Protocol (JSON lines over a Unix socket, one request -> one response):
+    {"op": "log", "job_id": 42, "action_type": "navigate", "url": "..."}
+    -> {"ok": true, "trail_id": 123}
+
+    {"op": "ping"}   -> {"ok": true, "pid": 4567}
+    {"op": "stats"}  -> {"ok": true, "entries": ..., "batches": ..., "lock_wait_ms": ..., ...}
+
+Log fields are the keyword arguments of audit_log_page.log_page().
+Errors are reported as {"ok": false, "error": "..."}.
+
+Usage:
+    python cli/audit_daemon.py
+    python cli/audit_daemon.py --flush-ms 10 --max-batch 1000
+"""
+
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from db_common import DB_PATH, LOCK_STATS, begin_write, open_connection
+from job_counters import add_job_counts
+from audit_log_page import (
+    INSERT_TRAIL_SQL, build_trail_row, compute_hash, validate_entry
+)
+
+# The socket lives next to the database it serves (residency.sock / test_residency.sock)
+DEFAULT_SOCKET_PATH = Path(os.environ.get('AUDIT_DAEMON_SOCKET', DB_PATH.with_suffix('.sock')))
+
+DEFAULT_FLUSH_MS = 5
+DEFAULT_MAX_BATCH = 500
+
+
+class PendingEntry:
+    """A log entry waiting for the writer thread"""
+
+    __slots__ = ('row_kwargs', 'done', 'trail_id', 'error')
+
+    def __init__(self, row_kwargs: dict):
+        self.row_kwargs = row_kwargs
+        self.done = threading.Event()
+        self.trail_id = None
+        self.error = None
+
+
+class TrailWriter(threading.Thread):
+    """
+    Single writer thread owning the database connection.
+
+    Everything queued while a batch is being committed becomes the next
+    batch, so one commit (and one fsync) covers a whole burst of actions.
+    """
+
+    def __init__(self, flush_ms: int = DEFAULT_FLUSH_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        super().__init__(name='trail-writer', daemon=True)
+        self.flush_seconds = flush_ms / 1000
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.known_jobs = set()
+        self.stats = Counter()
+
+    def submit(self, row_kwargs: dict) -> PendingEntry:
+        pending = PendingEntry(row_kwargs)
+        self.queue.put(pending)
+        return pending
+
+    def stop(self) -> None:
+        self.queue.put(None)
+
+    def run(self) -> None:
+        conn = open_connection()
+        try:
+            stopping = False
+            while not stopping:
+                first = self.queue.get()
+                if first is None:
+                    break
+                batch = [first]
+                deadline = time.monotonic() + self.flush_seconds
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self.write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def load_jobs(self, conn: sqlite3.Connection, job_ids: set) -> None:
+        """Add any of job_ids that exist to the known-jobs cache"""
+        missing = list(job_ids - self.known_jobs)
+        if not missing:
+            return
+        placeholders = ', '.join('?' for _ in missing)
+        rows = conn.execute(f"SELECT id FROM job_run WHERE id IN ({placeholders})", missing)
+        self.known_jobs.update(row['id'] for row in rows)
+
+    def write_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        """Insert a batch of entries in one transaction"""
+        cursor = conn.cursor()
+        written = 0
+        try:
+            begin_write(conn)
+            self.load_jobs(conn, {p.row_kwargs['job_id'] for p in batch})
+
+            pages_per_job = Counter()
+            for pending in batch:
+                job_id = pending.row_kwargs['job_id']
+                if job_id not in self.known_jobs:
+                    pending.error = f"Job {job_id} not found"
+                    continue
+                try:
+                    cursor.execute(INSERT_TRAIL_SQL, build_trail_row(**pending.row_kwargs))
+                except sqlite3.IntegrityError as e:
+                    pending.error = str(e)
+                    continue
+                pending.trail_id = cursor.lastrowid
+                pages_per_job[job_id] += 1
+                written += 1
+
+            for job_id, count in pages_per_job.items():
+                add_job_counts(cursor, job_id, pages_visited=count)
+
+            conn.commit()
+            self.stats['entries'] += written
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        except Exception as e:
+            conn.rollback()
+            for pending in batch:
+                if not pending.error:
+                    pending.trail_id = None
+                    pending.error = f"Batch rolled back: {e}"
+            self.stats['failed_batches'] += 1
+
+        finally:
+            for pending in batch:
+                if pending.error:
+                    self.stats['errors'] += 1
+                pending.done.set()
+
+
+class AuditRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one client connection (any number of JSON lines)"""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.dispatch(json.loads(line))
+            except (ValueError, TypeError, AttributeError) as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+    def dispatch(self, message: dict) -> dict:
+        writer = self.server.writer
+        op = message.pop('op', 'log')
+
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+
+        if op == 'stats':
+            return {
+                'ok': True, **writer.stats, 'known_jobs': len(writer.known_jobs),
+                'lock_wait_ms': LOCK_STATS['wait_ms'], 'lock_retries': LOCK_STATS['retries']
+            }
+
+        if op != 'log':
+            return {'ok': False, 'error': f"Unknown op: {op}"}
+
+        # Artifact paths are relative to the client's working directory
+        cwd = message.pop('cwd', None)
+        validate_entry(message)
+
+        artifact_hash = None
+        if message.get('artifact_path'):
+            # Uncached: the writer thread is the daemon's only database writer
+            artifact_hash = compute_hash(os.path.join(cwd or '', message['artifact_path']), cached=False)
+
+        pending = writer.submit({
+            **message,
+            'artifact_hash': artifact_hash,
+            'timestamp': datetime.now().isoformat()
+        })
+        pending.done.wait()
+
+        if pending.error:
+            return {'ok': False, 'error': pending.error}
+        return {'ok': True, 'trail_id': pending.trail_id}
+
+
+class AuditDaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256  # Many agents may connect at once
+
+    def __init__(self, socket_path: Path, writer: TrailWriter):
+        self.writer = writer
+        super().__init__(str(socket_path), AuditRequestHandler)
+
+
+def daemon_is_running(socket_path: Path) -> bool:
+    """Check whether a daemon is accepting connections on socket_path"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(socket_path: Path, flush_ms: int, max_batch: int) -> None:
+    """Run the daemon until SIGINT/SIGTERM"""
+    if not DB_PATH.exists():
+        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
+        print("   Run: python scripts/db_init.py", file=sys.stderr)
+        sys.exit(1)
+
+    if socket_path.exists():
+        if daemon_is_running(socket_path):
+            print(f"❌ Audit daemon already running on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        socket_path.unlink()  # Stale socket from a crashed daemon
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    writer = TrailWriter(flush_ms=flush_ms, max_batch=max_batch)
+    writer.start()
+    server = AuditDaemonServer(socket_path, writer)
+
+    def request_shutdown(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
+    print(f"✅ Audit daemon listening on {socket_path}", file=sys.stderr)
+    print(f"   Database: {DB_PATH}", file=sys.stderr)
+    print(f"   PID: {os.getpid()}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        writer.stop()
+        writer.join()
+        if socket_path.exists():
+            socket_path.unlink()
+
+        print(f"\n✅ Audit daemon stopped", file=sys.stderr)
+        print(f"   Entries logged: {writer.stats['entries']}", file=sys.stderr)
+        print(f"   Commits: {writer.stats['batches']}", file=sys.stderr)
+        print(f"   Errors: {writer.stats['errors']}", file=sys.stderr)
+        print(f"   Lock wait: {LOCK_STATS['wait_ms']} ms ({LOCK_STATS['retries']} retries)", file=sys.stderr)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Run the audit logging daemon',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Start the daemon in the background
+    python cli/audit_daemon.py &
+
+    # Log through it (same arguments and output as audit_log_page.py)
+    trail_id=$(python cli/audit_log_client.py --job-id 42 --action navigate --url "...")
+
+    # Stop it
+    kill %1
+        """
+    )
+
+    parser.add_argument('--socket', type=Path, default=DEFAULT_SOCKET_PATH,
+                       help=f'Unix socket path (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--flush-ms', type=int, default=DEFAULT_FLUSH_MS,
+                       help=f'Max time to wait for more entries before committing (default: {DEFAULT_FLUSH_MS})')
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                       help=f'Max entries per commit (default: {DEFAULT_MAX_BATCH})')
+
+    args = parser.parse_args()
+
+    serve(args.socket, args.flush_ms, args.max_batch)
+
+
+if __name__ == '__main__':
+    main()
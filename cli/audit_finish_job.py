@@ -9,26 +9,11 @@ Usage:
     python cli/audit_finish_job.py --job-id 42 --status failed --error "Network timeout"
 """
 
-import sqlite3
 import sys
-from pathlib import Path
 from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from db_common import begin_write, get_db_connection
+from job_counters import rollup_job_counters
 
 
 def finish_job(job_id: int, status: str, error_summary: str = None, session_notes: str = None) -> None:
@@ -45,6 +30,8 @@ def finish_job(job_id: int, status: str, error_summary: str = None, session_note
     cursor = conn.cursor()
 
     try:
+        begin_write(conn)
+
         # Verify job exists and is running
         cursor.execute("""
             SELECT id, task_description, status, started_at,
@@ -69,6 +56,9 @@ def finish_job(job_id: int, status: str, error_summary: str = None, session_note
         """, (job_id,))
         error_count = cursor.fetchone()['error_count']
 
+        # Fold the job's counter shards into job_run
+        rollup_job_counters(cursor, job_id)
+
         # Update job
         cursor.execute("""
             UPDATE job_run
@@ -126,8 +116,6 @@ def finish_job(job_id: int, status: str, error_summary: str = None, session_note
         print(f"❌ Error finishing job: {e}", file=sys.stderr)
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def main():
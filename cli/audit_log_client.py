@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Audit Log Client CLI Tool
+
+Thin client for cli/audit_daemon.py. Takes the same arguments as
+cli/audit_log_page.py and has the same output contract: the trail ID on
+stdout, messages on stderr, exit code 1 on error.
+
+If no daemon is running, the action is logged directly (exactly like
+audit_log_page.py) unless --no-fallback is given.
+
+Usage:
+    python cli/audit_log_client.py --job-id 42 --action search --search-query "Italy visa"
+    python cli/audit_log_client.py --job-id 42 --action navigate --url "https://..." --title "..."
+
+Returns:
+    Trail ID (integer) for referencing this specific action
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+from audit_daemon import DEFAULT_SOCKET_PATH
+from audit_log_page import add_log_arguments, entry_from_args, log_page
+
+DEFAULT_TIMEOUT_SECONDS = 30
+
+
+class DaemonUnavailable(Exception):
+    """No audit daemon is listening on the socket"""
+
+
+def send_request(message: dict, socket_path: Path = DEFAULT_SOCKET_PATH,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+    """
+    Send one request to the audit daemon and return its response.
+
+    Raises:
+        DaemonUnavailable: If the daemon socket is missing or refuses connections
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        # Connect in blocking mode: a full accept backlog means "wait", not EAGAIN
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonUnavailable(str(e))
+        sock.settimeout(timeout)
+
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile('rb') as reader:
+            line = reader.readline()
+    finally:
+        sock.close()
+
+    if not line:
+        raise ConnectionError("Audit daemon closed the connection without responding")
+    return json.loads(line)
+
+
+def log_via_daemon(entry: dict, socket_path: Path = DEFAULT_SOCKET_PATH) -> int:
+    """
+    Log an action through the daemon.
+
+    Returns:
+        trail_id (int): The ID of the created audit trail entry
+    """
+    response = send_request({'op': 'log', 'cwd': os.getcwd(), **entry}, socket_path)
+    if not response.get('ok'):
+        raise RuntimeError(response.get('error', 'unknown error'))
+    return response['trail_id']
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Log a page visit or web action through the audit daemon',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Start the daemon once per session
+    python cli/audit_daemon.py &
+
+    # Then log exactly as with audit_log_page.py
+    trail_id=$(python cli/audit_log_client.py \\
+        --job-id 42 \\
+        --action navigate \\
+        --tool playwright_navigate \\
+        --url "https://vistoperitalia.esteri.it/home/en" \\
+        --title "Italy Visa Portal")
+    echo "Trail ID: $trail_id"
+        """
+    )
+
+    add_log_arguments(parser)
+    parser.add_argument('--socket', type=Path, default=DEFAULT_SOCKET_PATH,
+                       help=f'Daemon socket path (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--no-fallback', action='store_true',
+                       help='Fail instead of logging directly when the daemon is not running')
+
+    args = parser.parse_args()
+    entry = entry_from_args(args)
+
+    try:
+        trail_id = log_via_daemon(entry, args.socket)
+    except DaemonUnavailable:
+        if args.no_fallback:
+            print(f"❌ Audit daemon not running on {args.socket}", file=sys.stderr)
+            print("   Run: python cli/audit_daemon.py &", file=sys.stderr)
+            sys.exit(1)
+        log_page(**entry)
+        return
+    except Exception as e:
+        print(f"❌ Error logging page: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"✅ Action logged (via daemon)", file=sys.stderr)
+    print(f"   Trail ID: {trail_id}", file=sys.stderr)
+    print(f"   Job ID: {args.job_id}", file=sys.stderr)
+    print(f"   Action: {args.action}", file=sys.stderr)
+    if args.url:
+        print(f"   URL: {args.url}", file=sys.stderr)
+    print(file=sys.stderr)
+
+    # Output trail ID to stdout for scripting
+    print(trail_id)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,44 +8,127 @@ This creates a complete audit trail for reproducibility.
 Usage:
     python cli/audit_log_page.py --job-id 42 --action search --search-query "Italy visa"
     python cli/audit_log_page.py --job-id 42 --action navigate --url "https://..." --title "..."
+    python cli/audit_log_page.py --batch actions.ndjson
 
 Returns:
     Trail ID (integer) for referencing this specific action
+    (--batch: one trail ID per line, in input order)
 """
 
-import sqlite3
 import sys
-import hashlib
+import json
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
+from db_common import begin_write, get_db_connection
+from file_hash import cached_sha256, cached_sha256_files, sha256_file
+from job_counters import add_job_counts
+
+ACTION_TYPES = ['search', 'fetch', 'navigate', 'click', 'extract', 'screenshot', 'download']
+STATUSES = ['success', 'error', 'timeout', 'skipped']
+
+# Fields accepted by log_page() (and by the audit daemon / batch mode)
+LOG_FIELDS = (
+    'job_id', 'action_type', 'tool_name', 'url', 'search_query', 'http_status',
+    'page_title', 'page_language', 'artifact_path', 'parent_trail_id',
+    'session_id', 'status', 'error_message', 'duration_ms', 'notes'
+)
+
+INSERT_TRAIL_SQL = """
+    INSERT INTO scraper_audit_trail (
+        job_run_id,
+        action_type,
+        tool_name,
+        url,
+        search_query,
+        http_status,
+        page_title,
+        page_language,
+        artifact_path,
+        artifact_hash,
+        parent_trail_id,
+        session_id,
+        timestamp,
+        status,
+        error_message,
+        duration_ms,
+        notes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
 
+def compute_hash(file_path: str, verify: bool = False, cached: bool = True) -> str:
+    """
+    Compute SHA256 hash of a file (None if it does not exist).
 
-def compute_hash(file_path: str) -> str:
-    """Compute SHA256 hash of a file"""
+    Uses the hash cache unless verify, or unless cached is False (for
+    callers that must not write to the database from this thread).
+    """
     if not Path(file_path).exists():
         return None
+    if not cached:
+        return sha256_file(file_path)
+    return cached_sha256(file_path, verify)
+
 
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+def validate_entry(entry: dict) -> None:
+    """
+    Validate a log entry dict (keys from LOG_FIELDS).
+
+    Raises:
+        ValueError: If the entry is missing required fields or uses unknown values
+    """
+    unknown = set(entry) - set(LOG_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if not isinstance(entry.get('job_id'), int):
+        raise ValueError("job_id must be an integer")
+    if entry.get('action_type') not in ACTION_TYPES:
+        raise ValueError(f"action_type must be one of: {', '.join(ACTION_TYPES)}")
+    if entry.get('status', 'success') not in STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+
+
+def build_trail_row(
+    job_id: int,
+    action_type: str,
+    tool_name: str = None,
+    url: str = None,
+    search_query: str = None,
+    http_status: int = None,
+    page_title: str = None,
+    page_language: str = None,
+    artifact_path: str = None,
+    artifact_hash: str = None,
+    parent_trail_id: int = None,
+    session_id: str = None,
+    status: str = "success",
+    error_message: str = None,
+    duration_ms: int = None,
+    notes: str = None,
+    timestamp: str = None
+) -> tuple:
+    """Build the parameter tuple for INSERT_TRAIL_SQL"""
+    return (
+        job_id,
+        action_type,
+        tool_name,
+        url,
+        search_query,
+        http_status,
+        page_title,
+        page_language,
+        artifact_path,
+        artifact_hash,
+        parent_trail_id,
+        session_id,
+        timestamp or datetime.now().isoformat(),
+        status,
+        error_message,
+        duration_ms,
+        notes
+    )
 
 
 def log_page(
@@ -63,7 +146,8 @@ def log_page(
     status: str = "success",
     error_message: str = None,
     duration_ms: int = None,
-    notes: str = None
+    notes: str = None,
+    verify: bool = False
 ) -> int:
     """
     Log a page visit or web action.
@@ -75,6 +159,13 @@ def log_page(
     cursor = conn.cursor()
 
     try:
+        # Compute artifact hash (before taking the write lock)
+        artifact_hash = None
+        if artifact_path:
+            artifact_hash = compute_hash(artifact_path, verify)
+
+        begin_write(conn)
+
         # Verify job exists
         cursor.execute("SELECT id FROM job_run WHERE id = ?", (job_id,))
         if not cursor.fetchone():
@@ -82,61 +173,31 @@ def log_page(
             print("   Run: python cli/audit_start_job.py --task '...'", file=sys.stderr)
             sys.exit(1)
 
-        # Compute artifact hash if path provided
-        artifact_hash = None
-        if artifact_path:
-            artifact_hash = compute_hash(artifact_path)
-
         # Insert audit trail entry
-        cursor.execute("""
-            INSERT INTO scraper_audit_trail (
-                job_run_id,
-                action_type,
-                tool_name,
-                url,
-                search_query,
-                http_status,
-                page_title,
-                page_language,
-                artifact_path,
-                artifact_hash,
-                parent_trail_id,
-                session_id,
-                timestamp,
-                status,
-                error_message,
-                duration_ms,
-                notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            job_id,
-            action_type,
-            tool_name,
-            url,
-            search_query,
-            http_status,
-            page_title,
-            page_language,
-            artifact_path,
-            artifact_hash,
-            parent_trail_id,
-            session_id,
-            datetime.now().isoformat(),
-            status,
-            error_message,
-            duration_ms,
-            notes
+        cursor.execute(INSERT_TRAIL_SQL, build_trail_row(
+            job_id=job_id,
+            action_type=action_type,
+            tool_name=tool_name,
+            url=url,
+            search_query=search_query,
+            http_status=http_status,
+            page_title=page_title,
+            page_language=page_language,
+            artifact_path=artifact_path,
+            artifact_hash=artifact_hash,
+            parent_trail_id=parent_trail_id,
+            session_id=session_id,
+            status=status,
+            error_message=error_message,
+            duration_ms=duration_ms,
+            notes=notes
         ))
+        trail_id = cursor.lastrowid
 
         # Update job statistics
-        cursor.execute("""
-            UPDATE job_run
-            SET pages_visited = pages_visited + 1
-            WHERE id = ?
-        """, (job_id,))
+        add_job_counts(cursor, job_id, pages_visited=1)
 
         conn.commit()
-        trail_id = cursor.lastrowid
 
         # Print to stderr for logging, stdout for scripting
         print(f"✅ Action logged", file=sys.stderr)
@@ -160,8 +221,140 @@ def log_page(
         print(f"❌ Error logging page: {e}", file=sys.stderr)
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
+
+
+def read_batch(stream, default_job_id: int = None) -> list:
+    """
+    Read and validate newline-delimited JSON log entries.
+
+    Each line is an object with log_page() keyword arguments, e.g.
+        {"job_id": 42, "action_type": "fetch", "url": "https://..."}
+    Lines without a job_id use default_job_id.
+
+    Raises:
+        ValueError: On the first invalid line (nothing has been written yet)
+    """
+    entries = []
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            if not isinstance(entry, dict):
+                raise ValueError("expected a JSON object")
+            if 'job_id' not in entry and default_job_id is not None:
+                entry['job_id'] = default_job_id
+            validate_entry(entry)
+        except ValueError as e:
+            raise ValueError(f"line {line_number}: {e}")
+        entries.append(entry)
+    return entries
+
+
+def log_batch(entries: list, verify: bool = False) -> list:
+    """
+    Log many actions in one transaction.
+
+    Inserts all entries with executemany, then applies one aggregated
+    pages_visited increment per job.
+
+    Returns:
+        trail_ids (list): IDs of the created entries, in input order
+    """
+    if not entries:
+        return []
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Compute artifact hashes before taking the write lock
+        artifact_paths = sorted({entry['artifact_path'] for entry in entries
+                                 if entry.get('artifact_path') and Path(entry['artifact_path']).exists()})
+        hashes = cached_sha256_files(artifact_paths, verify=verify) if artifact_paths else {}
+        rows = [build_trail_row(**entry, artifact_hash=hashes.get(entry.get('artifact_path')))
+                for entry in entries]
+
+        begin_write(conn)
+
+        # Verify all jobs exist
+        job_ids = sorted({entry['job_id'] for entry in entries})
+        placeholders = ', '.join('?' for _ in job_ids)
+        cursor.execute(f"SELECT id FROM job_run WHERE id IN ({placeholders})", job_ids)
+        missing = set(job_ids) - {row['id'] for row in cursor.fetchall()}
+        if missing:
+            print(f"❌ Job(s) not found: {', '.join(str(j) for j in sorted(missing))}", file=sys.stderr)
+            print("   Run: python cli/audit_start_job.py --task '...'", file=sys.stderr)
+            sys.exit(1)
+
+        # Insert audit trail entries
+        cursor.executemany(INSERT_TRAIL_SQL, rows)
+
+        # AUTOINCREMENT ids are consecutive while this transaction holds the write lock
+        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        trail_ids = list(range(last_id - len(rows) + 1, last_id + 1))
+
+        # Update job statistics (one increment per job)
+        pages_per_job = Counter(entry['job_id'] for entry in entries)
+        for job_id, count in pages_per_job.items():
+            add_job_counts(cursor, job_id, pages_visited=count)
+
+        conn.commit()
+
+        print(f"✅ {len(trail_ids)} actions logged", file=sys.stderr)
+        print(f"   Trail IDs: {trail_ids[0]}-{trail_ids[-1]}", file=sys.stderr)
+        print(f"   Jobs: {', '.join(str(j) for j in job_ids)}", file=sys.stderr)
+        print(file=sys.stderr)
+
+        # Output trail IDs to stdout for scripting (input order)
+        sys.stdout.write("".join(f"{trail_id}\n" for trail_id in trail_ids))
+
+        return trail_ids
+
+    except Exception as e:
+        print(f"❌ Error logging batch: {e}", file=sys.stderr)
+        conn.rollback()
+        sys.exit(1)
+
+
+def add_log_arguments(parser, required: bool = True) -> None:
+    """Add the per-action arguments (shared with cli/audit_log_client.py)"""
+    parser.add_argument('--job-id', required=required, type=int, help='Job ID from audit_start_job.py')
+    parser.add_argument('--action', required=required, choices=ACTION_TYPES, help='Action type')
+    parser.add_argument('--tool', help='Tool name (e.g., brave_web_search, playwright_navigate)')
+    parser.add_argument('--url', help='URL visited')
+    parser.add_argument('--search-query', help='Search query (for search actions)')
+    parser.add_argument('--http-status', type=int, help='HTTP status code')
+    parser.add_argument('--title', help='Page title')
+    parser.add_argument('--language', help='Page language code')
+    parser.add_argument('--artifact-path', help='Path to saved artifact (HTML/PDF/screenshot)')
+    parser.add_argument('--parent-trail-id', type=int, help='Parent trail ID (for linked actions)')
+    parser.add_argument('--session-id', help='Session ID (for grouping related actions)')
+    parser.add_argument('--status', default='success', choices=STATUSES, help='Action status')
+    parser.add_argument('--error', help='Error message (if status=error)')
+    parser.add_argument('--duration', type=int, help='Duration in milliseconds')
+    parser.add_argument('--notes', help='Additional notes')
+
+
+def entry_from_args(args) -> dict:
+    """Map parsed arguments to log_page() keyword arguments"""
+    return {
+        'job_id': args.job_id,
+        'action_type': args.action,
+        'tool_name': args.tool,
+        'url': args.url,
+        'search_query': args.search_query,
+        'http_status': args.http_status,
+        'page_title': args.title,
+        'page_language': args.language,
+        'artifact_path': args.artifact_path,
+        'parent_trail_id': args.parent_trail_id,
+        'session_id': args.session_id,
+        'status': args.status,
+        'error_message': args.error,
+        'duration_ms': args.duration,
+        'notes': args.notes
+    }
 
 
 def main():
@@ -200,48 +393,40 @@ Examples:
     # Capture trail ID for later reference
     trail_id=$(python cli/audit_log_page.py --job-id 42 --action navigate --url "...")
     echo "Trail ID: $trail_id"
+
+    # Replay a crawl log in one process and one commit
+    # (one JSON object per line with log fields, e.g. action_type, url, page_title)
+    python cli/audit_log_page.py --job-id 42 --batch crawl_log.ndjson > trail_ids.txt
+    cat actions.ndjson | python cli/audit_log_page.py --batch -
         """
     )
 
-    parser.add_argument('--job-id', required=True, type=int, help='Job ID from audit_start_job.py')
-    parser.add_argument('--action', required=True,
-                       choices=['search', 'fetch', 'navigate', 'click', 'extract', 'screenshot', 'download'],
-                       help='Action type')
-    parser.add_argument('--tool', help='Tool name (e.g., brave_web_search, playwright_navigate)')
-    parser.add_argument('--url', help='URL visited')
-    parser.add_argument('--search-query', help='Search query (for search actions)')
-    parser.add_argument('--http-status', type=int, help='HTTP status code')
-    parser.add_argument('--title', help='Page title')
-    parser.add_argument('--language', help='Page language code')
-    parser.add_argument('--artifact-path', help='Path to saved artifact (HTML/PDF/screenshot)')
-    parser.add_argument('--parent-trail-id', type=int, help='Parent trail ID (for linked actions)')
-    parser.add_argument('--session-id', help='Session ID (for grouping related actions)')
-    parser.add_argument('--status', default='success', choices=['success', 'error', 'timeout', 'skipped'],
-                       help='Action status')
-    parser.add_argument('--error', help='Error message (if status=error)')
-    parser.add_argument('--duration', type=int, help='Duration in milliseconds')
-    parser.add_argument('--notes', help='Additional notes')
+    add_log_arguments(parser, required=False)
+    parser.add_argument('--batch', metavar='FILE',
+                       help='Log many actions from an NDJSON file ("-" for stdin); '
+                            '--job-id, if given, applies to lines without job_id')
+    parser.add_argument('--verify', action='store_true',
+                       help='Re-hash artifacts even if the hash cache has them')
 
     args = parser.parse_args()
 
-    log_page(
-        job_id=args.job_id,
-        action_type=args.action,
-        tool_name=args.tool,
-        url=args.url,
-        search_query=args.search_query,
-        http_status=args.http_status,
-        page_title=args.title,
-        page_language=args.language,
-        artifact_path=args.artifact_path,
-        parent_trail_id=args.parent_trail_id,
-        session_id=args.session_id,
-        status=args.status,
-        error_message=args.error,
-        duration_ms=args.duration,
-        notes=args.notes
-    )
+    if args.batch:
+        try:
+            if args.batch == '-':
+                entries = read_batch(sys.stdin, args.job_id)
+            else:
+                with open(args.batch) as f:
+                    entries = read_batch(f, args.job_id)
+        except (OSError, ValueError) as e:
+            print(f"❌ Invalid batch input: {e}", file=sys.stderr)
+            sys.exit(1)
+        log_batch(entries, args.verify)
+        return
+
+    if args.job_id is None or args.action is None:
+        parser.error("--job-id and --action are required (unless --batch is given)")
 
+    log_page(**entry_from_args(args), verify=args.verify)
 
 if __name__ == '__main__':
     main()
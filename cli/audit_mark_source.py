@@ -9,25 +9,10 @@ Usage:
     python cli/audit_mark_source.py --trail-id 123 --source-type official --credibility 5
 """
 
-import sqlite3
 import sys
-from pathlib import Path
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from db_common import begin_write, get_db_connection
+from job_counters import add_job_counts
 
 
 def mark_source(
@@ -51,6 +36,8 @@ def mark_source(
     cursor = conn.cursor()
 
     try:
+        begin_write(conn)
+
         # Verify trail exists
         cursor.execute("""
             SELECT id, job_run_id, url, page_title, is_source
@@ -118,11 +105,7 @@ def mark_source(
         """, (source_id, notes, notes, notes, trail_id))
 
         # Update job statistics
-        cursor.execute("""
-            UPDATE job_run
-            SET sources_found = sources_found + 1
-            WHERE id = ?
-        """, (trail['job_run_id'],))
+        add_job_counts(cursor, trail['job_run_id'], sources_found=1)
 
         conn.commit()
 
@@ -140,8 +123,6 @@ def mark_source(
         print(f"❌ Error marking source: {e}", file=sys.stderr)
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def main():
@@ -11,26 +11,10 @@ Returns:
     Job ID (integer) that should be used for all subsequent audit logging
 """
 
-import sqlite3
 import sys
-from pathlib import Path
 from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from db_common import begin_write, get_db_connection
 
 
 def start_job(task: str, country: str = None, pathway_type: str = None, llm_model: str = None) -> int:
@@ -44,6 +28,7 @@ def start_job(task: str, country: str = None, pathway_type: str = None, llm_mode
     cursor = conn.cursor()
 
     try:
+        begin_write(conn)
         cursor.execute("""
             INSERT INTO job_run (
                 task_description,
@@ -85,8 +70,6 @@ def start_job(task: str, country: str = None, pathway_type: str = None, llm_mode
         print(f"❌ Error starting job: {e}", file=sys.stderr)
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def main():
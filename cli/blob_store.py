@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Artifact Blob Store
+
+Keeps the bytes of each artifact once, under data/blobs/ab/cdef... (the
+SHA256, split after two characters). The human-friendly paths under
+data/raw/ - the registered file_path and any later download of the same
+content under another name - are hard links to the blob, or reflinks
+where a hard link is not possible, and each one is recorded in
+artifact_paths.
+
+Blobs are made read-only: a hard-linked file shares its inode with the
+blob, so editing it in place would change every alias.
+
+Text artifacts (HTML, extracted text) compress 5-10x and are stored
+compressed: the blob is data/blobs/ab/cdef....gz (.zst when the zstandard
+package is installed) and the artifact's path gains the same suffix. The
+SHA256 stays that of the uncompressed content, so deduplication does not
+depend on the compressor. Read artifact files with open_artifact(), which
+decompresses on the fly. Files that were downloaded compressed are stored
+and hashed as they are; find_compressed_copies() tells the blob store's
+own compressed copies (artifacts.compression set) apart from them.
+
+Audit trail rows that point at a file replaced by its compressed copy are
+re-pointed at the copy (repoint_trail), in the transaction that registers
+it.
+
+Usage (from any script in cli/):
+    from blob_store import (link_to_blob, open_artifact, record_alias, remove_uncompressed,
+                            repoint_trail, store_artifact, unstore_artifact)
+
+    link_type = link_to_blob(full_path, sha256)  # Before the transaction
+    record_alias(cursor, relative_path, artifact_id, link_type)
+
+    stored = store_artifact(full_path, sha256, 'html')  # Compressed copy
+    ...  # Register stored['path'] and repoint_trail(), commit
+    remove_uncompressed(full_path, stored)  # Or unstore_artifact() after a rollback
+
+    with open_artifact(path) as f:
+        for block in iter(lambda: f.read(65536), b''):
+            ...
+"""
+
+import fcntl
+import gzip
+import os
+import shutil
+import sqlite3
+import stat
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from db_common import PROJECT_ROOT
+
+# Tests (TEST_MODE=1) keep their blobs apart, like their database
+if os.environ.get('TEST_MODE'):
+    BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
+else:
+    BLOBS_DIR = PROJECT_ROOT / "data" / "blobs"
+
+# ioctl that clones a file's extents (Linux: btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Artifact types stored compressed
+COMPRESSED_TYPES = ('html', 'extracted_text', 'extracted_table', 'extracted_list')
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+DEFAULT_COMPRESSION = 'zstd' if zstandard else 'gzip'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Paths per "... IN (...)" query
+PATH_BATCH_SIZE = 500
+
+
+def blob_path(sha256: str, compression: str = None) -> Path:
+    """Path of the blob holding the content with this SHA256 (compressed, if given)"""
+    path = BLOBS_DIR / sha256[:2] / sha256[2:]
+    if compression:
+        path = path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+    return path
+
+
+def compression_of(path) -> str:
+    """'gzip' or 'zstd' from a file's suffix, or None if it is not compressed"""
+    suffix = Path(path).suffix
+    for compression, compressed_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compressed_suffix:
+            return compression
+    return None
+
+
+def open_artifact(path):
+    """
+    Open an artifact file for reading in binary mode, decompressing .gz and
+    .zst files as they are read.
+
+    Raises:
+        RuntimeError: For a .zst file when zstandard is not installed
+    """
+    compression = compression_of(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def read_artifact_text(path) -> str:
+    """Whole text of an artifact file (UTF-8, undecodable bytes replaced)"""
+    with open_artifact(path) as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+def compress_file(source: Path, target: Path, compression: str) -> None:
+    """Write a compressed copy of source to target (deterministic: no name or time in the header)"""
+    with open(source, 'rb') as src, open(target, 'xb') as dst:
+        if compression == 'zstd':
+            with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(dst, closefd=False) as out:
+                shutil.copyfileobj(src, out, COPY_BUFFER_SIZE)
+        else:
+            with gzip.GzipFile(filename='', mode='wb', fileobj=dst, compresslevel=GZIP_LEVEL, mtime=0) as out:
+                shutil.copyfileobj(src, out, COPY_BUFFER_SIZE)
+
+
+def reflink(source: Path, target: Path) -> None:
+    """Create target as a copy-on-write clone of source (OSError if unsupported)"""
+    with open(source, 'rb') as src:
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, src.fileno())
+        except OSError:
+            os.close(fd)
+            os.unlink(target)
+            raise
+        os.close(fd)
+
+
+def link_or_clone(source: Path, target: Path) -> str:
+    """
+    Create target sharing source's bytes.
+
+    Returns:
+        'hardlink', 'reflink', or None if neither is possible (e.g.
+        another filesystem); FileExistsError if target exists
+    """
+    try:
+        os.link(source, target)
+        return 'hardlink'
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+
+    try:
+        reflink(source, target)
+        return 'reflink'
+    except FileExistsError:
+        raise
+    except OSError:
+        return None
+
+
+def make_read_only(path: Path) -> None:
+    """Clear the write bits of a file"""
+    mode = stat.S_IMODE(path.stat().st_mode)
+    os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def link_to_blob(file_path: Path, sha256: str, compression: str = None) -> str:
+    """
+    Make file_path share its bytes with the blob for sha256.
+
+    If there is no blob yet, file_path becomes the blob (no copy). If there
+    is, file_path is atomically replaced by a link to it, so its duplicate
+    bytes are freed. A file that is already compressed is linked to the
+    compressed blob of its content.
+
+    Returns:
+        'hardlink' or 'reflink', or None if file_path could not be linked
+        (it then keeps its own bytes)
+    """
+    blob = blob_path(sha256, compression)
+    try:
+        blob_stat = blob.stat()
+    except FileNotFoundError:
+        blob_stat = None
+
+    if blob_stat is None:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            link_type = link_or_clone(file_path, blob)
+        except FileExistsError:
+            # Another process stored the same content first
+            return link_to_blob(file_path, sha256, compression)
+        if link_type:
+            make_read_only(blob)
+        return link_type
+
+    # Duplicate content: replace file_path with a link to the blob
+    return replace_with_link(blob, file_path, blob_stat)
+
+
+def replace_with_link(blob: Path, file_path: Path, blob_stat: os.stat_result) -> str:
+    """
+    Atomically make file_path a link to blob (if it is not one already).
+
+    Returns:
+        'hardlink' or 'reflink', or None if no link could be made (file_path
+        is then left as it was)
+    """
+    try:
+        file_stat = file_path.stat()
+        if (file_stat.st_dev, file_stat.st_ino) == (blob_stat.st_dev, blob_stat.st_ino):
+            return 'hardlink'
+    except FileNotFoundError:
+        pass
+
+    # Link the blob next to file_path, then swap it in (never leave the link behind)
+    temp = file_path.with_name(f".{file_path.name}.{os.getpid()}.blob")
+    try:
+        link_type = link_or_clone(blob, temp)
+        if link_type:
+            os.replace(temp, file_path)
+    finally:
+        temp.unlink(missing_ok=True)
+    return link_type
+
+
+def store_compressed(file_path: Path, sha256: str, compression: str = DEFAULT_COMPRESSION) -> tuple:
+    """
+    Store a compressed copy of file_path as a blob, linked next to it as
+    file_path + '.gz' (or '.zst').
+
+    file_path itself is left in place: remove it once the compressed path
+    is registered.
+
+    Returns:
+        (compressed path, link_type); link_type is None if the compressed
+        path is a separate copy of the blob
+    """
+    blob = blob_path(sha256, compression)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temp = blob.with_name(f".{blob.name}.{os.getpid()}.tmp")
+        try:
+            compress_file(file_path, temp, compression)
+            make_read_only(temp)
+            os.link(temp, blob)  # Fails if another process stored it first
+        except FileExistsError:
+            pass
+        finally:
+            temp.unlink(missing_ok=True)
+
+    target = file_path.with_name(file_path.name + COMPRESSION_SUFFIXES[compression])
+    link_type = replace_with_link(blob, target, blob.stat())
+    if link_type is None:
+        temp = target.with_name(f".{target.name}.{os.getpid()}.blob")
+        try:
+            shutil.copyfile(blob, temp)
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+    return target, link_type
+
+
+def stored_path(file_path: Path, artifact_type: str) -> Path:
+    """Path store_artifact() will leave the artifact at (file_path, or its compressed copy)"""
+    if compression_of(file_path) is None and artifact_type in COMPRESSED_TYPES:
+        return file_path.with_name(file_path.name + COMPRESSION_SUFFIXES[DEFAULT_COMPRESSION])
+    return file_path
+
+
+def store_artifact(file_path: Path, sha256: str, artifact_type: str, compression: str = None) -> dict:
+    """
+    Put an artifact file in the blob store (before the transaction).
+
+    Text artifacts (COMPRESSED_TYPES) that are not compressed yet get a
+    compressed blob and path (see store_compressed); everything else is
+    linked in place (see link_to_blob). If the artifact is then not
+    registered, undo this with unstore_artifact().
+
+    Args:
+        sha256: Digest of the uncompressed content
+        compression: How file_path is compressed if it is a compressed copy
+            made by the blob store (see find_compressed_copies); any other
+            file, even a downloaded .gz, is stored as it is
+
+    Returns:
+        dict with path (where the artifact is now), link_type, compression
+        and compressed_size (both None for an uncompressed file), and undo
+        (what unstore_artifact() needs)
+    """
+    path = stored_path(file_path, artifact_type)
+    if path != file_path:
+        compression = DEFAULT_COMPRESSION
+    blob = blob_path(sha256, compression)
+    file_stat = file_path.stat()
+    undo = {'blob': None if blob.exists() else blob,
+            'alias': None if path == file_path or path.exists() else path,
+            'inode': (file_stat.st_dev, file_stat.st_ino), 'nlink': file_stat.st_nlink,
+            'mode': stat.S_IMODE(file_stat.st_mode)}
+
+    if path != file_path:
+        path, link_type = store_compressed(file_path, sha256, compression)
+        return {'path': path, 'link_type': link_type, 'compression': compression,
+                'compressed_size': path.stat().st_size, 'undo': undo}
+
+    return {'path': file_path, 'link_type': link_to_blob(file_path, sha256, compression),
+            'compression': compression,
+            'compressed_size': file_path.stat().st_size if compression else None, 'undo': undo}
+
+
+def unstore_artifact(file_path: Path, stored: dict) -> None:
+    """
+    Undo store_artifact() for an artifact that was not registered (rolled
+    back, or skipped): remove the blob and compressed path it created, and
+    give file_path its own bytes and permissions back.
+
+    A new blob that another file has been linked to since is kept.
+    """
+    undo = stored['undo']
+    if undo['alias']:
+        undo['alias'].unlink(missing_ok=True)
+
+    file_stat = file_path.stat()
+    if undo['blob']:
+        try:
+            blob_stat = undo['blob'].stat()
+            shared = (blob_stat.st_dev, blob_stat.st_ino) == (file_stat.st_dev, file_stat.st_ino)
+            if blob_stat.st_nlink <= (undo['nlink'] + 1 if shared else 1):
+                undo['blob'].unlink()
+                file_stat = file_path.stat()
+        except FileNotFoundError:
+            pass
+
+    if (file_stat.st_dev, file_stat.st_ino) != undo['inode'] or file_stat.st_nlink > undo['nlink']:
+        # file_path was linked to a blob: copy the bytes back out of it
+        temp = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(file_path, temp)
+            os.chmod(temp, undo['mode'])
+            os.replace(temp, file_path)
+        finally:
+            temp.unlink(missing_ok=True)
+    elif stat.S_IMODE(file_stat.st_mode) != undo['mode']:
+        os.chmod(file_path, undo['mode'])
+
+
+def find_compressed_copies(conn: sqlite3.Connection, paths: list) -> dict:
+    """
+    Find the compressed copies made by the blob store among files: .gz/.zst
+    paths registered (as file_path or alias) for an artifact whose
+    compression is set. Their sha256 is that of the uncompressed content.
+
+    Args:
+        paths: Absolute paths
+
+    Returns:
+        {path: compression} for the compressed copies
+    """
+    by_name = {str(project_relative(Path(path))): path for path in paths if compression_of(path)}
+    names = list(by_name)
+    found = {}
+    for start in range(0, len(names), PATH_BATCH_SIZE):
+        batch = names[start:start + PATH_BATCH_SIZE]
+        placeholders = ', '.join('?' for _ in batch)
+        rows = conn.execute(f"""
+            SELECT p.path, a.compression FROM artifact_paths p
+            JOIN artifacts a ON a.id = p.artifact_id
+            WHERE a.compression IS NOT NULL AND p.path IN ({placeholders})
+            UNION
+            SELECT file_path, compression FROM artifacts
+            WHERE compression IS NOT NULL AND file_path IN ({placeholders})
+        """, batch * 2)
+        for name, compression in rows:
+            if compression_of(name) == compression:
+                found[by_name[name]] = compression
+    return found
+
+
+def record_alias(cursor: sqlite3.Cursor, path: str, artifact_id: int, link_type: str) -> None:
+    """Record path (relative to the project root) as an alias of an artifact"""
+    cursor.execute("""
+        INSERT INTO artifact_paths (path, artifact_id, link_type)
+        VALUES (?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            artifact_id = excluded.artifact_id,
+            link_type = excluded.link_type,
+            added_at = CURRENT_TIMESTAMP
+    """, (path, artifact_id, link_type))
+
+
+def project_relative(full_path: Path) -> Path:
+    """Path relative to the project root, or unchanged if outside it"""
+    try:
+        return full_path.relative_to(PROJECT_ROOT)
+    except ValueError:
+        return full_path
+
+
+def remove_uncompressed(file_path: Path, stored: dict) -> bool:
+    """Remove the original of an artifact stored compressed (after it is registered)"""
+    if stored['path'] == file_path:
+        return False
+    file_path.unlink(missing_ok=True)
+    return True
+
+
+def repoint_trail(cursor: sqlite3.Cursor, paths: list, compression: str = DEFAULT_COMPRESSION) -> None:
+    """
+    Point scraper_audit_trail rows at the compressed copies that replace
+    files (page.html -> page.html.gz, see store_compressed).
+
+    Args:
+        paths: Absolute paths of the replaced files; rows may record them
+            absolute or relative to the project root
+    """
+    suffix = COMPRESSION_SUFFIXES[compression]
+    paths = sorted({str(form) for path in paths for form in (path, project_relative(path))})
+    for start in range(0, len(paths), PATH_BATCH_SIZE):
+        batch = paths[start:start + PATH_BATCH_SIZE]
+        cursor.execute(f"""
+            UPDATE scraper_audit_trail SET artifact_path = artifact_path || ?
+            WHERE artifact_path IN ({', '.join('?' for _ in batch)})
+        """, (suffix, *batch))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Shared Database Access
+
+One place for the connection logic every CLI tool used to copy.
+Each process (and each thread within it) reuses a single connection
+configured for concurrent research agents:
+
+- WAL journaling, so readers never block the writer
+- synchronous=NORMAL (durable in WAL mode, without an fsync per commit)
+- large page cache and memory-mapped I/O
+- busy_timeout, so a second writer waits instead of failing with
+  "database is locked"
+- a larger prepared-statement cache
+
+Writes take the write lock up front (BEGIN IMMEDIATE) instead of
+upgrading a read transaction, which under concurrent agents fails with
+SQLITE_BUSY no matter how long busy_timeout is. Lock acquisition retries
+with jittered exponential backoff until DB_WRITE_DEADLINE seconds
+(default 30) have passed; the time spent waiting is recorded in
+LOCK_STATS and reported on stderr when it is noticeable.
+
+Schema changes after the initial config/schema.sql live in
+config/migrations/NNN_description.sql. PRAGMA user_version records the
+last one applied; pending migrations are applied automatically the first
+time a process connects (and by scripts/db_init.py).
+
+Usage (from any script in cli/):
+    from db_common import PROJECT_ROOT, get_db_connection, begin_write
+
+    conn = get_db_connection()
+    try:
+        begin_write(conn)
+        ...
+        conn.commit()
+    except Exception:
+        conn.rollback()
+"""
+
+import atexit
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+DATABASE_DIR = PROJECT_ROOT / "data" / "database"
+MIGRATIONS_DIR = PROJECT_ROOT / "config" / "migrations"
+
+# Tests set TEST_MODE=1 so the CLIs write to a throwaway database
+if os.environ.get('TEST_MODE'):
+    DB_PATH = DATABASE_DIR / "test_residency.db"
+else:
+    DB_PATH = DATABASE_DIR / "residency.db"
+
+# Connection tuning
+BUSY_TIMEOUT_MS = 10000
+CACHE_SIZE_KB = 65536          # 64 MB page cache
+MMAP_SIZE_BYTES = 268435456    # 256 MB memory-mapped I/O
+STATEMENT_CACHE_SIZE = 256
+
+# Write lock acquisition
+WRITE_DEADLINE_SECONDS = float(os.environ.get('DB_WRITE_DEADLINE', 30))
+BACKOFF_BASE_SECONDS = 0.005
+BACKOFF_CAP_SECONDS = 0.5
+LOCK_WAIT_REPORT_MS = 250      # Report waits longer than this on stderr
+
+# Per-process lock statistics: transactions, retries, wait_ms, max_wait_ms
+LOCK_STATS = Counter()
+_lock_stats_lock = threading.Lock()
+
+_local = threading.local()
+_open_connections = []
+_open_connections_lock = threading.Lock()
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the standard pragmas to a connection"""
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def open_connection(db_path: Path = None) -> sqlite3.Connection:
+    """Open a new, fully configured connection (not shared)"""
+    conn = sqlite3.connect(
+        db_path or DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    return configure_connection(conn)
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """
+    Get the shared database connection for this process/thread.
+
+    The connection is created on first use and reused afterwards.
+    Callers should not close it; it is closed at interpreter exit.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'pid', None) == os.getpid():
+        return conn
+
+    if not DB_PATH.exists():
+        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
+        print("   Run: python scripts/db_init.py", file=sys.stderr)
+        sys.exit(1)
+
+    conn = open_connection()
+    try:
+        apply_migrations(conn)
+    except sqlite3.Error as e:
+        print(f"❌ Database migration failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    _local.conn = conn
+    _local.pid = os.getpid()
+    with _open_connections_lock:
+        _open_connections.append(conn)
+    return conn
+
+
+class WriteLockTimeout(sqlite3.OperationalError):
+    """The write lock could not be acquired before the deadline"""
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Check whether an sqlite3 error means the database is locked/busy"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in message or 'busy' in message
+    )
+
+
+def begin_write(conn: sqlite3.Connection, deadline: float = None) -> float:
+    """
+    Start a write transaction, waiting for the write lock if needed.
+
+    Runs BEGIN IMMEDIATE with SQLite's own busy handler disabled and
+    retries with full-jitter exponential backoff, so parallel agents
+    spread out instead of waking up in lockstep.
+
+    Args:
+        conn: Connection with no open transaction
+        deadline: Max seconds to wait (default: DB_WRITE_DEADLINE or 30)
+
+    Returns:
+        Seconds spent waiting for the lock
+
+    Raises:
+        WriteLockTimeout: If the lock is still held by another writer at the deadline
+    """
+    if deadline is None:
+        deadline = WRITE_DEADLINE_SECONDS
+
+    started = time.monotonic()
+    attempt = 0
+    conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        while True:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                elapsed = time.monotonic() - started
+                if elapsed >= deadline:
+                    raise WriteLockTimeout(
+                        f"Database write lock not acquired after {elapsed:.1f}s "
+                        f"({attempt + 1} attempts)"
+                    ) from e
+                backoff = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+                time.sleep(min(random.uniform(0, backoff), deadline - elapsed))
+                attempt += 1
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+    waited = time.monotonic() - started
+    record_lock_wait(waited, attempt)
+    return waited
+
+
+def record_lock_wait(waited: float, retries: int) -> None:
+    """Add one lock acquisition to LOCK_STATS (and stderr if it was slow)"""
+    wait_ms = int(waited * 1000)
+    with _lock_stats_lock:
+        LOCK_STATS['transactions'] += 1
+        LOCK_STATS['retries'] += retries
+        LOCK_STATS['wait_ms'] += wait_ms
+        LOCK_STATS['max_wait_ms'] = max(LOCK_STATS['max_wait_ms'], wait_ms)
+
+    if wait_ms > LOCK_WAIT_REPORT_MS:
+        print(f"⏳ Waited {wait_ms} ms for the database write lock ({retries} retries)",
+              file=sys.stderr)
+
+
+def list_migrations() -> list:
+    """Return (number, path) for every migration file, in order"""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob('[0-9][0-9][0-9]_*.sql')):
+        migrations.append((int(path.name[:3]), path))
+    return migrations
+
+
+def split_sql(script: str) -> list:
+    """Split a SQL script into statements (trigger bodies stay intact)"""
+    statements = []
+    current = ''
+    for line in script.splitlines(keepends=True):
+        if not current and (not line.strip() or line.lstrip().startswith('--')):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def apply_migrations(conn: sqlite3.Connection) -> list:
+    """
+    Apply any pending migrations in one write transaction.
+
+    Unlike executescript(), each statement runs inside the transaction,
+    so a failed migration leaves the database untouched.
+
+    Returns:
+        Numbers of the migrations that were applied
+    """
+    migrations = list_migrations()
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if not migrations or migrations[-1][0] <= current:
+        return []
+
+    begin_write(conn)
+    try:
+        # Another process may have migrated while we waited for the lock
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        applied = []
+        for number, path in migrations:
+            if number <= current:
+                continue
+            for statement in split_sql(path.read_text()):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            applied.append(number)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    for number in applied:
+        print(f"🔧 Applied database migration {number:03d}", file=sys.stderr)
+    return applied
+
+
+def close_db_connections() -> None:
+    """Close every shared connection opened by this process"""
+    with _open_connections_lock:
+        for conn in _open_connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _open_connections.clear()
+    _local.__dict__.clear()
+
+
+atexit.register(close_db_connections)
@@ -8,6 +8,7 @@ Usage:
     python cli/db_insert.py pathway --country Italy --type digital_nomad --name "Digital Nomad Visa" ...
     python cli/db_insert.py source --url "https://..." --title "..." --credibility 5
     python cli/db_insert.py legal-ref --country Italy --ref-number "Law 123/2025" --title "..."
+    python cli/db_insert.py bulk records.jsonl
 
 Examples:
     # Insert a pathway
@@ -35,30 +36,66 @@ Examples:
         --title "Digital Nomad Visa Decree" \
         --type decree \
         --effective-date "2025-01-15"
+
+    # Bulk import a research dump (JSONL or CSV, mixed record kinds)
+    #   {"kind": "source", "url": "https://...", "title": "...", "source_type": "embassy", "credibility": 4}
+    #   {"kind": "pathway", "country": "Italy", "pathway_type": "digital_nomad", "name": "..."}
+    #   {"kind": "link", "country": "Italy", "pathway_type": "digital_nomad",
+    #    "pathway_name": "...", "source_url": "https://...", "relevance_score": 5}
+    python cli/db_insert.py bulk data/imports/italy.jsonl
 """
 
 import sqlite3
 import sys
+import csv
 import json
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-
-
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}")
-        print("   Run: python scripts/db_init.py")
-        sys.exit(1)
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+from db_common import WriteLockTimeout, begin_write, get_db_connection
+
+
+# Bulk import: record kind -> (table, insertable columns)
+BULK_TABLES = {
+    'source': ('sources', [
+        'url', 'title', 'source_type', 'credibility', 'description', 'language',
+        'country_id', 'pathway_type', 'is_active', 'last_accessed_date',
+        'last_verified_date', 'notes'
+    ]),
+    'pathway': ('residency_pathways', [
+        'country_id', 'pathway_type', 'name', 'official_name', 'description',
+        'legal_basis', 'min_income_eur', 'min_investment_eur',
+        'education_requirement', 'language_requirement', 'age_restrictions',
+        'required_documents', 'application_process', 'processing_time_days',
+        'application_fee_eur', 'initial_duration_months', 'renewable',
+        'max_renewals', 'total_max_duration_months', 'path_to_permanent_residency',
+        'path_to_citizenship', 'min_years_to_citizenship', 'work_rights',
+        'family_inclusion', 'travel_rights', 'restrictions', 'tax_implications',
+        'is_active', 'last_verified_date', 'policy_changes_2025'
+    ]),
+    'legal-ref': ('legal_references', [
+        'country_id', 'reference_number', 'title', 'official_url', 'reference_type',
+        'enactment_date', 'effective_date', 'expiry_date', 'summary',
+        'full_text_path', 'language'
+    ]),
+    'link': ('pathway_sources', [
+        'pathway_id', 'source_id', 'relevance_score', 'excerpt', 'page_number', 'notes'
+    ]),
+}
+
+# Kinds are inserted in this order so links can refer to sources/pathways from the same file
+BULK_ORDER = ['source', 'pathway', 'legal-ref', 'link']
+
+BULK_REQUIRED = {
+    'source': ['url', 'title', 'source_type', 'credibility'],
+    'pathway': ['country', 'pathway_type', 'name'],
+    'legal-ref': ['country', 'reference_number', 'title'],
+    'link': [],
+}
+
+BULK_BOOLEAN_COLUMNS = {'renewable', 'is_active'}
+BULK_CHUNK_SIZE = 500
 
 
 def get_country_id(conn: sqlite3.Connection, country_name: str) -> Optional[int]:
@@ -69,6 +106,11 @@ def get_country_id(conn: sqlite3.Connection, country_name: str) -> Optional[int]
     return row['id'] if row else None
 
 
+def load_country_map(conn: sqlite3.Connection) -> dict:
+    """Map every country name to its ID (one query)"""
+    return {row['name']: row['id'] for row in conn.execute("SELECT id, name FROM countries")}
+
+
 def insert_pathway(args) -> None:
     """Insert a residency pathway"""
     conn = get_db_connection()
@@ -126,6 +168,7 @@ def insert_pathway(args) -> None:
             VALUES ({', '.join(placeholders)})
         """
 
+        begin_write(conn)
         cursor.execute(query, values)
         conn.commit()
 
@@ -144,8 +187,6 @@ def insert_pathway(args) -> None:
         print(f"❌ Error inserting pathway: {e}")
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def insert_source(args) -> None:
@@ -188,6 +229,7 @@ def insert_source(args) -> None:
             VALUES ({', '.join(placeholders)})
         """
 
+        begin_write(conn)
         cursor.execute(query, values)
         conn.commit()
 
@@ -207,8 +249,6 @@ def insert_source(args) -> None:
         print(f"❌ Error inserting source: {e}")
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def insert_legal_ref(args) -> None:
@@ -248,6 +288,7 @@ def insert_legal_ref(args) -> None:
             VALUES ({', '.join(placeholders)})
         """
 
+        begin_write(conn)
         cursor.execute(query, values)
         conn.commit()
 
@@ -266,8 +307,6 @@ def insert_legal_ref(args) -> None:
         print(f"❌ Error inserting legal reference: {e}")
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
 
 
 def link_pathway_source(args) -> None:
@@ -276,6 +315,8 @@ def link_pathway_source(args) -> None:
     cursor = conn.cursor()
 
     try:
+        begin_write(conn)
+
         # Verify pathway exists
         cursor.execute("SELECT id FROM residency_pathways WHERE id = ?", (args.pathway_id,))
         if not cursor.fetchone():
@@ -305,8 +346,219 @@ def link_pathway_source(args) -> None:
         print(f"❌ Error linking pathway to source: {e}")
         conn.rollback()
         sys.exit(1)
-    finally:
-        conn.close()
+
+
+def read_bulk_records(path: Path, file_format: str = None) -> list:
+    """
+    Read bulk records from a JSONL or CSV file.
+
+    Returns:
+        list of (line_number, record dict); empty CSV cells become None
+    """
+    if not file_format:
+        file_format = 'csv' if path.suffix.lower() == '.csv' else 'jsonl'
+
+    records = []
+    with open(path, newline='' if file_format == 'csv' else None) as f:
+        if file_format == 'csv':
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                records.append((line_number, {k: (v if v != '' else None) for k, v in row.items()}))
+        else:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {'kind': None, '_error': f"Invalid JSON: {e}"}
+                if not isinstance(record, dict):
+                    record = {'kind': None, '_error': f"Expected a JSON object, got {type(record).__name__}"}
+                records.append((line_number, record))
+    return records
+
+
+def parse_bool(value) -> int:
+    """Parse a boolean from JSON or CSV (true/false, yes/no, 1/0)"""
+    if isinstance(value, str):
+        if value.strip().lower() in ('1', 'true', 'yes', 'y'):
+            return 1
+        if value.strip().lower() in ('0', 'false', 'no', 'n'):
+            return 0
+        raise ValueError(f"Invalid boolean: {value}")
+    return 1 if value else 0
+
+
+def prepare_bulk_row(kind: str, record: dict, maps: dict) -> tuple:
+    """
+    Resolve lookups and defaults for one bulk record.
+
+    Returns:
+        Parameter tuple matching BULK_TABLES[kind] columns
+
+    Raises:
+        ValueError: If the record is invalid or a lookup fails
+    """
+    table, columns = BULK_TABLES[kind]
+    data = {k: v for k, v in record.items() if k != 'kind' and v is not None}
+
+    missing = [field for field in BULK_REQUIRED[kind] if field not in data]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+
+    # Resolve country name -> country_id
+    if 'country' in data:
+        country = data.pop('country')
+        if country not in maps['countries']:
+            raise ValueError(f"Country '{country}' not found")
+        data['country_id'] = maps['countries'][country]
+
+    if kind == 'link':
+        if 'source_url' in data:
+            source_url = data.pop('source_url')
+            if source_url not in maps['sources']:
+                raise ValueError(f"Source URL not found: {source_url}")
+            data['source_id'] = maps['sources'][source_url]
+        if 'pathway_name' in data:
+            key = (data.pop('country_id', None), data.pop('pathway_type', None), data.pop('pathway_name'))
+            if key not in maps['pathways']:
+                raise ValueError(f"Pathway not found: {key[2]} ({key[1]})")
+            data['pathway_id'] = maps['pathways'][key]
+        if 'pathway_id' not in data or 'source_id' not in data:
+            raise ValueError("Link needs pathway_id or country/pathway_type/pathway_name, "
+                             "and source_id or source_url")
+
+    unknown = set(data) - set(columns)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    # Same defaults as the single-record commands
+    today = datetime.now().strftime('%Y-%m-%d')
+    if kind == 'source':
+        data.setdefault('language', 'en')
+        data.setdefault('is_active', 1)
+        data.setdefault('last_accessed_date', today)
+        data.setdefault('last_verified_date', today)
+    elif kind == 'pathway':
+        data.setdefault('renewable', 0)
+        data.setdefault('is_active', 1)
+        data.setdefault('last_verified_date', today)
+    elif kind == 'legal-ref':
+        data.setdefault('language', 'en')
+    elif kind == 'link':
+        data.setdefault('relevance_score', 5)
+
+    for column in BULK_BOOLEAN_COLUMNS & set(data):
+        data[column] = parse_bool(data[column])
+
+    return tuple(data.get(column) for column in columns)
+
+
+def insert_bulk_chunk(conn: sqlite3.Connection, query: str, chunk: list) -> list:
+    """
+    Insert one chunk of (line_number, row) pairs in a single transaction.
+
+    The whole chunk goes through executemany; only if that fails are the
+    rows retried one by one to find the bad ones.
+
+    Returns:
+        list of (line_number, error message) for rows that were not inserted
+    """
+    cursor = conn.cursor()
+    errors = []
+    begin_write(conn)
+    try:
+        cursor.executemany(query, [row for _, row in chunk])
+    except sqlite3.Error:
+        conn.rollback()
+        begin_write(conn)
+        for line_number, row in chunk:
+            try:
+                cursor.execute(query, row)
+            except sqlite3.Error as e:
+                errors.append((line_number, str(e)))
+    conn.commit()
+    return errors
+
+
+def bulk_insert(args) -> None:
+    """Bulk insert pathways, sources, legal references and links from a file"""
+    path = Path(args.file)
+    if not path.exists():
+        print(f"❌ File not found: {path}")
+        sys.exit(1)
+
+    conn = get_db_connection()
+
+    try:
+        records = read_bulk_records(path, args.format)
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        print(f"❌ Error reading {path}: {e}")
+        sys.exit(1)
+
+    # Group by kind, keeping file order within each kind
+    by_kind = {kind: [] for kind in BULK_ORDER}
+    errors = []
+    for line_number, record in records:
+        kind = record.get('kind')
+        if '_error' in record:
+            errors.append((line_number, record['_error']))
+        elif kind not in by_kind:
+            errors.append((line_number, f"Unknown kind: {kind} (expected one of: {', '.join(BULK_ORDER)})"))
+        else:
+            by_kind[kind].append((line_number, record))
+
+    # Lookup maps, loaded once
+    maps = {'countries': load_country_map(conn), 'sources': {}, 'pathways': {}}
+
+    inserted = {}
+    for kind in BULK_ORDER:
+        if not by_kind[kind]:
+            continue
+
+        if kind == 'link':
+            urls = sorted({r['source_url'] for _, r in by_kind[kind] if r.get('source_url')})
+            for start in range(0, len(urls), BULK_CHUNK_SIZE):
+                batch = urls[start:start + BULK_CHUNK_SIZE]
+                placeholders = ', '.join('?' for _ in batch)
+                for row in conn.execute(f"SELECT id, url FROM sources WHERE url IN ({placeholders})", batch):
+                    maps['sources'][row['url']] = row['id']
+            maps['pathways'] = {
+                (row['country_id'], row['pathway_type'], row['name']): row['id']
+                for row in conn.execute("SELECT id, country_id, pathway_type, name FROM residency_pathways")
+            }
+
+        table, columns = BULK_TABLES[kind]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+        rows = []
+        for line_number, record in by_kind[kind]:
+            try:
+                rows.append((line_number, prepare_bulk_row(kind, record, maps)))
+            except ValueError as e:
+                errors.append((line_number, str(e)))
+
+        chunk_errors = []
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            try:
+                chunk_errors.extend(insert_bulk_chunk(conn, query, rows[start:start + BULK_CHUNK_SIZE]))
+            except WriteLockTimeout as e:
+                print(f"❌ {e}")
+                print(f"   {kind}: {start - len(chunk_errors)} inserted before the timeout")
+                sys.exit(1)
+        errors.extend(chunk_errors)
+        inserted[kind] = len(rows) - len(chunk_errors)
+
+    print(f"✅ Bulk import complete: {path}")
+    print(f"   Records read: {len(records)}")
+    for kind in BULK_ORDER:
+        if kind in inserted:
+            print(f"   {kind}: {inserted[kind]} inserted")
+
+    if errors:
+        print(f"\n❌ {len(errors)} record(s) failed:")
+        for line_number, message in sorted(errors):
+            print(f"   line {line_number}: {message}")
+        sys.exit(1)
 
 
 def main():
@@ -391,6 +643,13 @@ def main():
     parser_link.add_argument('--page', type=int, help='Page number (for PDFs)')
     parser_link.add_argument('--notes', help='Notes')
 
+    # Bulk import
+    parser_bulk = subparsers.add_parser('bulk', help='Bulk insert records from a JSONL or CSV file')
+    parser_bulk.add_argument('file', help='JSONL or CSV file; each record has a "kind" '
+                             '(source, pathway, legal-ref, link) and table column names')
+    parser_bulk.add_argument('--format', choices=['jsonl', 'csv'],
+                             help='Input format (default: from file extension)')
+
     args = parser.parse_args()
 
     if not args.command:
@@ -403,6 +662,7 @@ def main():
         'source': insert_source,
         'legal-ref': insert_legal_ref,
         'link': link_pathway_source,
+        'bulk': bulk_insert,
     }
 
     handler = handlers.get(args.command)
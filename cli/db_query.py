@@ -26,62 +26,169 @@ Examples:
     # Show audit trail for a specific job
     python cli/db_query.py audit-trail --job-id 42
 
+    # List jobs, newest first, 50 at a time
+    python cli/db_query.py audit-trail --limit 50
+    python cli/db_query.py audit-trail --limit 50 --after-id 1201
+
+    # Page through a long audit trail (1000 actions at a time)
+    python cli/db_query.py audit-trail --job-id 42 --limit 1000
+    python cli/db_query.py audit-trail --job-id 42 --limit 1000 --after-id 81234
+
     # Show all artifacts for Italy
     python cli/db_query.py artifacts --country Italy
+
+    # Machine-readable output (every column, one row per line, no headings)
+    python cli/db_query.py pathways --country Italy --format jsonl
+    python cli/db_query.py audit-trail --job-id 42 --format csv > trail.csv
+    python cli/db_query.py sources --format tsv | cut -f1,5
 """
 
+import csv
+import os
 import sqlite3
 import sys
 import json
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Any, Optional
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
+from db_common import get_db_connection
 
 
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}")
-        print("   Run: python scripts/db_init.py")
-        sys.exit(1)
+# Output
+OUTPUT_FORMATS = ('table', 'jsonl', 'csv', 'tsv')
+TABLE_SAMPLE_ROWS = 200   # Column widths are sized from this many rows
+MAX_COLUMN_WIDTH = 60     # Longer values are truncated with …
+RECENT_JOBS_LIMIT = 20    # Jobs listed by audit-trail without --job-id or --limit
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Access columns by name
-    return conn
 
+def format_cell(value: Any) -> str:
+    """Render one table cell"""
+    if value is None:
+        return ""
+    text = str(value)
+    if len(text) > MAX_COLUMN_WIDTH:
+        text = text[:MAX_COLUMN_WIDTH - 1] + "…"
+    return text
+
+
+def print_table(cursor: sqlite3.Cursor, columns: Optional[List[str]] = None) -> tuple:
+    """
+    Stream the rows of an executed query as a table.
 
-def format_table(rows: List[sqlite3.Row], columns: Optional[List[str]] = None) -> str:
-    """Format rows as a table"""
-    if not rows:
-        return "No results found."
+    Column widths come from the header and the first TABLE_SAMPLE_ROWS
+    rows; later rows are written as they are fetched, so memory use does
+    not grow with the result size. A later value wider than its column
+    just pushes the line out.
 
-    # Get column names
+    Returns:
+        (number of rows printed, last row or None)
+    """
+    names = [description[0] for description in cursor.description]
     if columns is None:
-        columns = rows[0].keys()
+        columns = names
+    indexes = [names.index(col) for col in columns]
+
+    sample = cursor.fetchmany(TABLE_SAMPLE_ROWS)
+    if not sample:
+        print("No results found.")
+        return 0, None
+
+    sample_cells = [[format_cell(row[i]) for i in indexes] for row in sample]
+    widths = [
+        max([len(col)] + [len(cells[n]) for cells in sample_cells])
+        for n, col in enumerate(columns)
+    ]
+
+    write = sys.stdout.write
+    write(" | ".join(col.ljust(width) for col, width in zip(columns, widths)) + "\n")
+    write("-+-".join("-" * width for width in widths) + "\n")
+    for cells in sample_cells:
+        write(" | ".join(cell.ljust(width) for cell, width in zip(cells, widths)) + "\n")
+
+    count = len(sample)
+    last_row = sample[-1]
+    del sample, sample_cells
+
+    for row in cursor:
+        write(" | ".join(format_cell(row[i]).ljust(width) for i, width in zip(indexes, widths)) + "\n")
+        count += 1
+        last_row = row
+
+    return count, last_row
 
-    # Calculate column widths
-    widths = {col: len(col) for col in columns}
-    for row in rows:
-        for col in columns:
-            val = str(row[col]) if row[col] is not None else ""
-            widths[col] = max(widths[col], len(val))
 
-    # Build table
-    header = " | ".join(col.ljust(widths[col]) for col in columns)
-    separator = "-+-".join("-" * widths[col] for col in columns)
+def add_page_arguments(parser) -> None:
+    """Add keyset pagination arguments (--limit, --after-id)"""
+    parser.add_argument('--limit', type=int, help='Max rows to show')
+    parser.add_argument('--after-id', type=int, help='Show rows after this ID (from the previous page)')
 
-    lines = [header, separator]
-    for row in rows:
-        line = " | ".join(
-            str(row[col]).ljust(widths[col]) if row[col] is not None else "".ljust(widths[col])
-            for col in columns
-        )
-        lines.append(line)
 
-    return "\n".join(lines)
+def add_format_argument(parser) -> None:
+    """Add the --format argument"""
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='table',
+                       help='Output format (default: table)')
+
+
+def write_records(cursor: sqlite3.Cursor, output_format: str) -> tuple:
+    """
+    Stream the rows of an executed query as jsonl, csv or tsv.
+
+    Every selected column is written (the table view may hide some).
+    Rows go straight from the cursor to stdout.
+
+    Returns:
+        (number of rows written, last row or None)
+    """
+    names = [description[0] for description in cursor.description]
+    count = 0
+    last_row = None
+
+    if output_format == 'jsonl':
+        write = sys.stdout.write
+        for row in cursor:
+            write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n")
+            count += 1
+            last_row = row
+    else:
+        dialect = 'excel-tab' if output_format == 'tsv' else 'excel'
+        writer = csv.writer(sys.stdout, dialect=dialect, lineterminator="\n")
+        writer.writerow(names)
+        for row in cursor:
+            writer.writerow(row)
+            count += 1
+            last_row = row
+
+    return count, last_row
+
+
+def print_rows(cursor: sqlite3.Cursor, args, title: str, noun: str,
+               columns: Optional[List[str]] = None) -> int:
+    """
+    Print the rows of an executed query in the requested --format.
+
+    The table format gets a title and a row count; the machine-readable
+    formats get only the rows on stdout (the next-page hint, if any, goes
+    to stderr).
+
+    Returns:
+        Number of rows printed
+    """
+    limit = getattr(args, 'limit', None)
+
+    if args.format == 'table':
+        print(f"\n{title}\n")
+        count, last_row = print_table(cursor, columns)
+        print(f"\n{count} {noun}")
+        out = sys.stdout
+    else:
+        count, last_row = write_records(cursor, args.format)
+        out = sys.stderr
+
+    if limit and count == limit and last_row is not None:
+        print(f"Next page: --after-id {last_row['id']} --limit {limit}", file=out)
+    if args.format == 'table':
+        print()
+
+    return count
 
 
 def query_countries(args) -> None:
@@ -103,13 +210,7 @@ def query_countries(args) -> None:
     """
 
     cursor.execute(query)
-    rows = cursor.fetchall()
-
-    print(f"\n📍 Countries ({len(rows)} total)\n")
-    print(format_table(rows))
-    print()
-
-    conn.close()
+    print_rows(cursor, args, "📍 Countries", 'total')
 
 
 def query_pathways(args) -> None:
@@ -151,9 +252,6 @@ def query_pathways(args) -> None:
 
     query += " ORDER BY c.name, p.pathway_type"
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-
     filter_info = []
     if args.country:
         filter_info.append(f"country={args.country}")
@@ -162,11 +260,8 @@ def query_pathways(args) -> None:
 
     filter_str = f" ({', '.join(filter_info)})" if filter_info else ""
 
-    print(f"\n🛂 Residency Pathways{filter_str} ({len(rows)} found)\n")
-    print(format_table(rows))
-    print()
-
-    conn.close()
+    cursor.execute(query, params)
+    print_rows(cursor, args, f"🛂 Residency Pathways{filter_str}", 'found')
 
 
 def query_sources(args) -> None:
@@ -209,9 +304,6 @@ def query_sources(args) -> None:
 
     query += " ORDER BY s.credibility DESC, c.name"
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-
     filter_info = []
     if args.country:
         filter_info.append(f"country={args.country}")
@@ -220,11 +312,9 @@ def query_sources(args) -> None:
 
     filter_str = f" ({', '.join(filter_info)})" if filter_info else ""
 
-    print(f"\n📚 Sources{filter_str} ({len(rows)} found)\n")
-    print(format_table(rows, columns=['title', 'type', 'credibility', 'country', 'verified']))
-    print()
-
-    conn.close()
+    cursor.execute(query, params)
+    print_rows(cursor, args, f"📚 Sources{filter_str}", 'found',
+               columns=['title', 'type', 'credibility', 'country', 'verified'])
 
 
 def query_audit_trail(args) -> None:
@@ -233,49 +323,62 @@ def query_audit_trail(args) -> None:
     cursor = conn.cursor()
 
     if not args.job_id:
-        # List recent jobs
-        cursor.execute("""
+        # List recent jobs, newest first; keyset pagination on id (which follows start order)
+        query = """
             SELECT
-                id,
-                task_description as task,
-                country,
-                status,
-                started_at,
-                pages_visited,
-                sources_found
-            FROM job_run
-            ORDER BY started_at DESC
-            LIMIT 20
-        """)
-        rows = cursor.fetchall()
-        print(f"\n📋 Recent Jobs ({len(rows)} shown)\n")
-        print(format_table(rows))
-        print("\nUse --job-id N to see detailed audit trail")
+                j.id,
+                j.task_description as task,
+                j.country,
+                j.status,
+                j.started_at,
+                s.pages_visited,
+                s.sources_found
+            FROM job_run j
+            JOIN job_run_stats s ON s.job_run_id = j.id
+        """
+        params = []
+
+        if args.after_id:
+            query += " WHERE j.id < ?"
+            params.append(args.after_id)
+
+        if args.limit is None:
+            args.limit = RECENT_JOBS_LIMIT
+        query += " ORDER BY j.id DESC LIMIT ?"
+        params.append(args.limit)
+
+        cursor.execute(query, params)
+        if print_rows(cursor, args, "📋 Recent Jobs", 'shown') and args.format == 'table':
+            print("Use --job-id N to see detailed audit trail\n")
     else:
         # Show job details
         cursor.execute("""
-            SELECT *
-            FROM job_run
-            WHERE id = ?
+            SELECT
+                j.id, j.task_description, j.country, j.status,
+                j.started_at, j.completed_at,
+                s.pages_visited, s.sources_found, s.artifacts_downloaded
+            FROM job_run j
+            JOIN job_run_stats s ON s.job_run_id = j.id
+            WHERE j.id = ?
         """, (args.job_id,))
         job = cursor.fetchone()
 
         if not job:
-            print(f"❌ Job {args.job_id} not found")
-            conn.close()
-            return
-
-        print(f"\n📋 Job #{job['id']}: {job['task_description']}\n")
-        print(f"Country: {job['country']}")
-        print(f"Status: {job['status']}")
-        print(f"Started: {job['started_at']}")
-        print(f"Completed: {job['completed_at']}")
-        print(f"Pages visited: {job['pages_visited']}")
-        print(f"Sources found: {job['sources_found']}")
-        print(f"Artifacts: {job['artifacts_downloaded']}")
-
-        # Show trail
-        cursor.execute("""
+            print(f"❌ Job {args.job_id} not found", file=sys.stderr)
+            sys.exit(1)
+
+        if args.format == 'table':
+            print(f"\n📋 Job #{job['id']}: {job['task_description']}\n")
+            print(f"Country: {job['country']}")
+            print(f"Status: {job['status']}")
+            print(f"Started: {job['started_at']}")
+            print(f"Completed: {job['completed_at']}")
+            print(f"Pages visited: {job['pages_visited']}")
+            print(f"Sources found: {job['sources_found']}")
+            print(f"Artifacts: {job['artifacts_downloaded']}")
+
+        # Show trail (keyset pagination on id, which follows insertion order)
+        query = """
             SELECT
                 id,
                 action_type,
@@ -287,18 +390,22 @@ def query_audit_trail(args) -> None:
                 timestamp
             FROM scraper_audit_trail
             WHERE job_run_id = ?
-            ORDER BY timestamp
-        """, (args.job_id,))
-        trail_rows = cursor.fetchall()
+        """
+        params = [args.job_id]
+
+        if args.after_id:
+            query += " AND id > ?"
+            params.append(args.after_id)
 
-        if trail_rows:
-            print(f"\n📜 Audit Trail ({len(trail_rows)} actions)\n")
-            print(format_table(trail_rows, columns=['id', 'action_type', 'tool_name', 'page_title', 'source', 'status']))
-        else:
-            print("\nNo audit trail entries found.")
+        query += " ORDER BY id"
 
-    print()
-    conn.close()
+        if args.limit:
+            query += " LIMIT ?"
+            params.append(args.limit)
+
+        cursor.execute(query, params)
+        print_rows(cursor, args, "📜 Audit Trail", 'actions',
+                   columns=['id', 'action_type', 'tool_name', 'page_title', 'source', 'status'])
 
 
 def query_artifacts(args) -> None:
@@ -334,13 +441,19 @@ def query_artifacts(args) -> None:
         conditions.append("extraction_status = ?")
         params.append(args.extraction_status)
 
+    # Newest first; keyset pagination on id (which follows download order)
+    if args.after_id:
+        conditions.append("id < ?")
+        params.append(args.after_id)
+
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
 
-    query += " ORDER BY downloaded_at DESC"
+    query += " ORDER BY id DESC"
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+    if args.limit:
+        query += " LIMIT ?"
+        params.append(args.limit)
 
     filter_info = []
     if args.country:
@@ -350,11 +463,9 @@ def query_artifacts(args) -> None:
 
     filter_str = f" ({', '.join(filter_info)})" if filter_info else ""
 
-    print(f"\n📦 Artifacts{filter_str} ({len(rows)} found)\n")
-    print(format_table(rows, columns=['id', 'type', 'title', 'country', 'size_kb', 'extracted']))
-    print()
-
-    conn.close()
+    cursor.execute(query, params)
+    print_rows(cursor, args, f"📦 Artifacts{filter_str}", 'found',
+               columns=['id', 'type', 'title', 'country', 'size_kb', 'extracted'])
 
 
 def main():
@@ -388,12 +499,17 @@ def main():
     # Audit trail command
     parser_audit = subparsers.add_parser('audit-trail', help='Show audit trail')
     parser_audit.add_argument('--job-id', type=int, help='Job ID to query')
+    add_page_arguments(parser_audit)
 
     # Artifacts command
     parser_artifacts = subparsers.add_parser('artifacts', help='List artifacts')
     parser_artifacts.add_argument('--country', help='Filter by country')
     parser_artifacts.add_argument('--artifact-type', help='Filter by artifact type')
     parser_artifacts.add_argument('--extraction-status', help='Filter by extraction status')
+    add_page_arguments(parser_artifacts)
+
+    for subparser in subparsers.choices.values():
+        add_format_argument(subparser)
 
     args = parser.parse_args()
 
@@ -412,7 +528,14 @@ def main():
 
     handler = handlers.get(args.command)
     if handler:
-        handler(args)
+        try:
+            handler(args)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head): stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(1)
     else:
         print(f"❌ Unknown command: {args.command}")
         sys.exit(1)
@@ -21,475 +21,1180 @@ Examples:
 
     # Export all pathways for all countries
     python cli/export.py all-pathways --format obsidian --overwrite
+
+    # Same, exporting 8 countries at a time
+    python cli/export.py all-pathways --format obsidian --overwrite --jobs 8
+
+    # One matrix of every country and pathway type (vault note, or csv/json)
+    python cli/export.py comparison --overwrite
+    python cli/export.py comparison --countries Italy,Spain,Portugal --format csv
+
+    # Stay running and re-export pathways as agents change them
+    python cli/export.py watch --overwrite
+
+    # Re-render every file even if its inputs are unchanged
+    python cli/export.py all-pathways --format obsidian --overwrite --full
+
+    # Datasets: one JSON document per pathway (with its sources), or one
+    # CSV row per pathway (with source counts); stdout unless --output
+    python cli/export.py all-pathways --format json --output pathways.jsonl.gz
+    python cli/export.py country Italy --format csv > italy.csv
+
+Exports are incremental: the export_manifest table records, for each file,
+a hash of the rows it was rendered from. A file is re-rendered only when
+those inputs change, and written only when the rendered bytes differ.
+Without --overwrite, a file is replaced only if it still holds what was
+last exported; hand-edited files are left alone. Triggers log which pathways each write touches (export_changes), so
+`watch` re-renders just those notes and their country index. Every country
+export deletes the changes it has covered, so the log stays small (a
+pathway export leaves them for the country index, and a file that was
+left alone keeps its changes).
+
+Vault writes are atomic: a country's files are staged in a hidden
+directory in the vault and renamed into place once all of them are
+rendered, so Obsidian never sees a half-written note, even if the export
+is interrupted or runs while the vault is open.
 """
 
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
 import sqlite3
 import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
 
-# Project root
-PROJECT_ROOT = Path(__file__).parent.parent
-DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
-VAULT_PATH = PROJECT_ROOT / "docs" / "vault"
+from db_common import PROJECT_ROOT, begin_write, get_db_connection
+from templates import get_template
+
+# Tests (TEST_MODE=1) export to a throwaway vault, like their database
+if os.environ.get('TEST_MODE'):
+    VAULT_PATH = PROJECT_ROOT / "data" / "test_vault"
+else:
+    VAULT_PATH = PROJECT_ROOT / "docs" / "vault"
+
+# Bump when the markdown layout changes, so every file is re-rendered once
+RENDER_VERSION = 2
+
+# Flags shown in pathway headers, by countries.code (ISO 3166-1 alpha-2)
+COUNTRY_FLAGS = {
+    'AT': '🇦🇹', 'BE': '🇧🇪', 'CH': '🇨🇭', 'CZ': '🇨🇿', 'DE': '🇩🇪',
+    'DK': '🇩🇰', 'ES': '🇪🇸', 'FR': '🇫🇷', 'GR': '🇬🇷', 'IE': '🇮🇪',
+    'IT': '🇮🇹', 'NL': '🇳🇱', 'NO': '🇳🇴', 'PT': '🇵🇹', 'SE': '🇸🇪',
+}
+
+# Formats written by export_data() rather than as vault markdown
+DATA_FORMATS = ('json', 'csv')
+
+# Per-source fields nested in each JSON pathway document
+SOURCE_FIELDS = """
+    s.id AS source_id,
+    s.url,
+    s.title,
+    s.source_type,
+    s.credibility,
+    s.language,
+    s.last_verified_date,
+    ps.relevance_score,
+    ps.excerpt,
+    ps.page_number,
+    ps.added_at
+"""
+
 
+class ExportError(Exception):
+    """A country or pathway cannot be exported (not found, nothing to export)"""
 
-def get_db_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    if not DB_PATH.exists():
-        print(f"❌ Database not found at {DB_PATH}", file=sys.stderr)
-        print("   Run: python scripts/db_init.py", file=sys.stderr)
-        sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+def country_flag(code: str) -> str:
+    """Flag emoji for a country code (regional indicator letters if not in COUNTRY_FLAGS)"""
+    if not code:
+        return '🏳️'
+    code = code.upper()
+    flag = COUNTRY_FLAGS.get(code)
+    if flag is None:
+        flag = ''.join(chr(0x1F1E6 + ord(letter) - ord('A')) for letter in code if 'A' <= letter <= 'Z')
+        COUNTRY_FLAGS[code] = flag
+    return flag
+
+
+def fetch_records(cursor: sqlite3.Cursor) -> list:
+    """
+    Fetch the rest of a query as named tuples (row.name instead of row['name']).
+
+    Templates render from these; tuple(record) gives the raw values.
+    """
+    cursor.row_factory = None
+    Record = namedtuple('Record', [description[0] for description in cursor.description], rename=True)
+    return [Record._make(row) for row in cursor]
+
 
+def get_sources_by_pathway(conn: sqlite3.Connection, pathway_ids: list) -> dict:
+    """
+    Get the sources linked to each of several pathways in one query.
+
+    Returns:
+        {pathway_id: [source rows]}, every requested ID present
+    """
+    sources = {pathway_id: [] for pathway_id in pathway_ids}
+    if not pathway_ids:
+        return sources
 
-def get_pathway_sources(conn: sqlite3.Connection, pathway_id: int) -> list:
-    """Get all sources linked to a pathway"""
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT
+            ps.pathway_id,
             s.id,
             s.url,
             s.title,
             s.source_type,
             s.credibility,
             ps.excerpt,
-            ps.relevance_score
+            ps.relevance_score,
+            ps.added_at,
+            s.updated_at
         FROM pathway_sources ps
         JOIN sources s ON ps.source_id = s.id
-        WHERE ps.pathway_id = ?
+        WHERE ps.pathway_id IN ({', '.join('?' for _ in pathway_ids)})
         ORDER BY s.credibility DESC, ps.relevance_score DESC
-    """, (pathway_id,))
-    return cursor.fetchall()
+    """, list(pathway_ids))
+
+    for record in fetch_records(cursor):
+        sources[record.pathway_id].append(record)
+    return sources
+
+
+def load_country_snapshot(conn: sqlite3.Connection, country: str) -> dict:
+    """
+    Load everything a country export needs with one query per table.
+
+    The queries run in one read transaction, so they see a single
+    consistent snapshot even while other processes are writing.
+
+    Returns:
+        dict with country_info, pathways, pathway_sources
+        ({pathway_id: [source rows]}) and country_sources,
+        or None if the country does not exist
+    """
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        return _read_country_snapshot(conn, country)
+    finally:
+        if own_transaction:
+            conn.rollback()
+
+
+def _read_country_snapshot(conn: sqlite3.Connection, country: str) -> dict:
+    """Run the queries for load_country_snapshot()"""
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT * FROM countries WHERE name = ?", (country,))
+    records = fetch_records(cursor)
+    if not records:
+        return None
+    country_info = records[0]
+
+    cursor.execute("""
+        SELECT p.*, c.name as country_name, c.code as country_code
+        FROM residency_pathways p
+        JOIN countries c ON p.country_id = c.id
+        WHERE p.country_id = ?
+        ORDER BY p.pathway_type
+    """, (country_info.id,))
+    pathways = fetch_records(cursor)
+
+    cursor.execute("""
+        SELECT DISTINCT s.*
+        FROM sources s
+        WHERE s.country_id = ?
+        ORDER BY s.credibility DESC, s.title
+    """, (country_info.id,))
+    country_sources = fetch_records(cursor)
+
+    return {
+        'country_info': country_info,
+        'pathways': pathways,
+        'pathway_sources': get_sources_by_pathway(conn, [p.id for p in pathways]),
+        'country_sources': country_sources,
+    }
+
+
+def latest(*timestamps) -> str:
+    """Latest of several CURRENT_TIMESTAMP strings, ignoring NULLs"""
+    return max((ts for ts in timestamps if ts), default='N/A')
+
+
+def pathway_last_updated(pathway, sources: list) -> str:
+    """When the pathway or any of its source links last changed"""
+    return latest(
+        pathway.updated_at,
+        *(source.added_at for source in sources),
+        *(source.updated_at for source in sources)
+    )
 
 
-def generate_pathway_markdown(pathway: sqlite3.Row, sources: list) -> str:
+def country_last_updated(country_info, pathways: list, country_sources: list) -> str:
+    """When anything shown in the country index last changed"""
+    return latest(
+        country_info.updated_at,
+        *(pathway.updated_at for pathway in pathways),
+        *(source.updated_at for source in country_sources)
+    )
+
+
+def input_key(*row_lists) -> str:
+    """SHA256 over the rows a file is rendered from"""
+    data = [RENDER_VERSION] + [[tuple(row) for row in rows] for rows in row_lists]
+    return hashlib.sha256(json.dumps(data, default=str).encode()).hexdigest()
+
+
+def load_export_manifest(conn: sqlite3.Connection, paths: list) -> dict:
+    """Get the export_manifest rows for some files, keyed by path"""
+    if not paths:
+        return {}
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT * FROM export_manifest
+        WHERE path IN ({', '.join('?' for _ in paths)})
+    """, [str(path) for path in paths])
+    return {row['path']: row for row in cursor}
+
+
+def save_export_manifest(conn: sqlite3.Connection, entries: list) -> None:
+    """Record exported files (no-op, and no write lock, if nothing changed)"""
+    if not entries:
+        return
+    begin_write(conn)
+    try:
+        conn.executemany("""
+            INSERT INTO export_manifest
+                (path, kind, ref_id, input_key, content_sha256, file_size_bytes, mtime_ns)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET
+                kind = excluded.kind,
+                ref_id = excluded.ref_id,
+                input_key = excluded.input_key,
+                content_sha256 = excluded.content_sha256,
+                file_size_bytes = excluded.file_size_bytes,
+                mtime_ns = excluded.mtime_ns,
+                exported_at = CURRENT_TIMESTAMP
+        """, entries)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+class VaultWriter:
+    """
+    Write a run's files to a staging directory, then move them into place.
+
+    Files are staged in a hidden directory (.export-<pid>-*, which Obsidian
+    does not index) on the same filesystem as their destination, so that
+    commit() can os.replace() each one: a note in the vault is always
+    either the previous version or the complete new one, even if the
+    export is interrupted or another export runs at the same time.
+
+    fsync is batched per directory, not per file: each destination
+    directory is synced once after the renames. Files themselves are not
+    synced; if a power cut loses one, its size no longer matches the
+    export_manifest, so the next export renders it again.
+
+    Usage:
+        with VaultWriter() as writer:
+            stat = writer.stage(path, content)
+        # Committed on success, staged files removed on error
+    """
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root or VAULT_PATH)
+        self.staging = {}  # destination filesystem root -> staging directory
+        self.staged = []  # (staged path, destination path)
+        self.files_written = 0
+        self.bytes_written = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def staging_dir(self, path: Path) -> Path:
+        """Staging directory for a destination path (vault root, or its own directory if outside the vault)"""
+        path = path.absolute()
+        base = self.root if path.is_relative_to(self.root) else path.parent
+        if base not in self.staging:
+            base.mkdir(parents=True, exist_ok=True)
+            remove_stale_staging(base)
+            self.staging[base] = Path(tempfile.mkdtemp(prefix=f".export-{os.getpid()}-", dir=base))
+        return self.staging[base]
+
+    def stage(self, path: Path, content: bytes) -> os.stat_result:
+        """
+        Stage content for path.
+
+        Returns:
+            stat of the staged file; size and mtime survive the rename
+        """
+        staged = self.staging_dir(path) / f"{len(self.staged)}-{path.name}"
+        staged.write_bytes(content)
+        self.staged.append((staged, path))
+        return staged.stat()
+
+    def skip(self, size: int) -> None:
+        """Count a file that did not need writing"""
+        self.files_skipped += 1
+        self.bytes_skipped += size
+
+    def commit(self) -> None:
+        """Rename staged files into place and sync their directories"""
+        try:
+            directories = set()
+            for staged, path in self.staged:
+                size = staged.stat().st_size
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged, path)
+                directories.add(path.parent)
+                self.files_written += 1
+                self.bytes_written += size
+
+            for directory in directories:
+                fsync_directory(directory)
+        finally:
+            self.abort()
+
+    def abort(self) -> None:
+        """Remove whatever is still staged"""
+        for staging in self.staging.values():
+            shutil.rmtree(staging, ignore_errors=True)
+        self.staging.clear()
+        self.staged.clear()
+
+
+def fsync_directory(path: Path) -> None:
+    """fsync a directory so renames into it are durable"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_stale_staging(directory: Path) -> None:
+    """Remove staging directories left by exports that were killed"""
+    for staging in directory.glob('.export-*-*'):
+        try:
+            pid = int(staging.name.split('-')[1])
+            os.kill(pid, 0)
+        except ValueError:
+            continue
+        except ProcessLookupError:
+            shutil.rmtree(staging, ignore_errors=True)
+        except PermissionError:
+            pass
+
+
+def is_exported_copy(path: Path, previous) -> bool:
+    """True if the file still holds the content last exported to it (per the manifest)"""
+    if previous is None:
+        return False
+    return hashlib.sha256(path.read_bytes()).hexdigest() == previous['content_sha256']
+
+
+def export_file(path: Path, kind: str, ref_id: int, key: str, render, manifest: dict,
+                writer: VaultWriter, overwrite: bool = False, full: bool = False) -> tuple:
+    """
+    Render and stage one vault file, skipping work that is not needed.
+
+    The file is not re-rendered if the manifest has the same input key and
+    the file on disk still has the recorded size and mtime. It is not
+    rewritten if the rendered bytes match what is already there.
+
+    Without overwrite, an existing file is only replaced if it still holds
+    what was last exported (its sha256 matches the manifest); a file that
+    was edited by hand, or was never exported, is left alone.
+
+    Args:
+        render: Callable returning the markdown
+        manifest: export_manifest rows by path (from load_export_manifest)
+        writer: VaultWriter the new content is staged in
+        full: Re-render even if the inputs are unchanged
+
+    Returns:
+        (status, manifest entry or None); status is 'written' (staged),
+        'unchanged' or 'exists' (edited by hand, and overwrite is off)
+    """
+    previous = manifest.get(str(path))
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        stat = None
+
+    if (not full and previous is not None and stat is not None
+            and previous['input_key'] == key
+            and previous['file_size_bytes'] == stat.st_size
+            and previous['mtime_ns'] == stat.st_mtime_ns):
+        writer.skip(stat.st_size)
+        return 'unchanged', None
+
+    content = render().encode('utf-8')
+
+    if stat is not None and stat.st_size == len(content) and path.read_bytes() == content:
+        writer.skip(stat.st_size)
+        status = 'unchanged'
+    elif stat is not None and not overwrite and not is_exported_copy(path, previous):
+        return 'exists', None
+    else:
+        # Size and mtime carry over when the staged file is renamed
+        stat = writer.stage(path, content)
+        status = 'written'
+
+    entry = (str(path), kind, ref_id, key, hashlib.sha256(content).hexdigest(),
+             stat.st_size, stat.st_mtime_ns)
+    return status, entry
+
+
+def generate_pathway_markdown(pathway, sources: list) -> str:
     """
     Generate Obsidian-compatible markdown for a pathway.
 
     DATABASE IS SOURCE OF TRUTH - this is generated from DB data.
+    Layout: config/templates/pathway.md
     """
+    return get_template('pathway.md')(
+        pathway, sources, country_flag(pathway.country_code),
+        pathway_last_updated(pathway, sources)[:10]
+    )
 
-    # Build markdown
-    md = []
-
-    # Header
-    md.append(f"# {pathway['name']}")
-    md.append("")
-    md.append(f"**Country**: 🇮🇹 {pathway['country_name']}")
-    md.append(f"**Type**: {pathway['pathway_type']}")
-    md.append(f"**Status**: {'✅ Active' if pathway['is_active'] else '❌ Inactive'}")
-    if pathway['official_name']:
-        md.append(f"**Official Name**: {pathway['official_name']}")
-    md.append(f"**Last Updated**: {datetime.now().strftime('%Y-%m-%d')}")
-    md.append(f"**Generated from Database**: Pathway ID {pathway['id']}")
-    md.append("")
-    md.append("---")
-    md.append("")
-
-    # Overview
-    md.append("## Overview")
-    md.append("")
-    if pathway['description']:
-        md.append(pathway['description'])
-    md.append("")
-
-    if pathway['legal_basis']:
-        md.append(f"**Legal Basis**: {pathway['legal_basis']}")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-
-    # Requirements
-    md.append("## Requirements")
-    md.append("")
-
-    if pathway['min_income_eur']:
-        md.append(f"### Financial")
-        md.append(f"- **Minimum Income**: €{pathway['min_income_eur']:,}/year")
-        md.append("")
-
-    if pathway['min_investment_eur']:
-        md.append(f"### Investment")
-        md.append(f"- **Minimum Investment**: €{pathway['min_investment_eur']:,}")
-        md.append("")
-
-    if pathway['education_requirement']:
-        md.append(f"### Education")
-        md.append(f"- {pathway['education_requirement']}")
-        md.append("")
-
-    if pathway['language_requirement']:
-        md.append(f"### Language")
-        md.append(f"- {pathway['language_requirement']}")
-        md.append("")
-
-    if pathway['age_restrictions']:
-        md.append(f"### Age")
-        md.append(f"- {pathway['age_restrictions']}")
-        md.append("")
-
-    if pathway['required_documents']:
-        md.append(f"### Required Documents")
-        md.append(f"{pathway['required_documents']}")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-
-    # Application Process
-    if pathway['application_process']:
-        md.append("## Application Process")
-        md.append("")
-        md.append(pathway['application_process'])
-        md.append("")
-
-        if pathway['processing_time_days']:
-            md.append(f"**Processing Time**: {pathway['processing_time_days']} days")
-            md.append("")
-
-        if pathway['application_fee_eur']:
-            md.append(f"**Application Fee**: €{pathway['application_fee_eur']}")
-            md.append("")
-
-        md.append("---")
-        md.append("")
-
-    # Duration & Renewal
-    md.append("## Duration & Renewal")
-    md.append("")
-
-    if pathway['initial_duration_months']:
-        md.append(f"- **Initial Duration**: {pathway['initial_duration_months']} months ({pathway['initial_duration_months']//12} year{'s' if pathway['initial_duration_months']//12 != 1 else ''})")
-
-    if pathway['renewable']:
-        md.append(f"- **Renewable**: Yes")
-        if pathway['max_renewals']:
-            md.append(f"- **Max Renewals**: {pathway['max_renewals']}")
-        if pathway['total_max_duration_months']:
-            md.append(f"- **Total Max Duration**: {pathway['total_max_duration_months']} months")
-    else:
-        md.append(f"- **Renewable**: No")
-
-    md.append("")
-
-    if pathway['path_to_permanent_residency']:
-        md.append(f"**Path to Permanent Residency**: {pathway['path_to_permanent_residency']}")
-        md.append("")
-
-    if pathway['path_to_citizenship']:
-        md.append(f"**Path to Citizenship**: {pathway['path_to_citizenship']}")
-        if pathway['min_years_to_citizenship']:
-            md.append(f"- Typically {pathway['min_years_to_citizenship']} years")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-
-    # Rights & Restrictions
-    md.append("## Rights & Restrictions")
-    md.append("")
-
-    if pathway['work_rights']:
-        md.append(f"### Work Rights")
-        md.append(f"{pathway['work_rights']}")
-        md.append("")
-
-    if pathway['family_inclusion']:
-        md.append(f"### Family")
-        md.append(f"{pathway['family_inclusion']}")
-        md.append("")
-
-    if pathway['travel_rights']:
-        md.append(f"### Travel")
-        md.append(f"{pathway['travel_rights']}")
-        md.append("")
-
-    if pathway['restrictions']:
-        md.append(f"### Restrictions")
-        md.append(f"{pathway['restrictions']}")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-
-    # Tax Implications
-    if pathway['tax_implications']:
-        md.append("## Tax Implications")
-        md.append("")
-        md.append(pathway['tax_implications'])
-        md.append("")
-        md.append("---")
-        md.append("")
-
-    # Policy Changes
-    if pathway['policy_changes_2025']:
-        md.append("## 2025 Policy Changes")
-        md.append("")
-        md.append(pathway['policy_changes_2025'])
-        md.append("")
-        md.append("---")
-        md.append("")
-
-    # Sources
-    if sources:
-        md.append("## Sources")
-        md.append("")
-        for idx, source in enumerate(sources, 1):
-            md.append(f"{idx}. **{source['title']}**")
-            md.append(f"   - URL: {source['url']}")
-            md.append(f"   - Type: {source['source_type']}")
-            md.append(f"   - Credibility: {'⭐' * source['credibility']} ({source['credibility']}/5)")
-            if source['relevance_score']:
-                md.append(f"   - Relevance: {source['relevance_score']}/5")
-            if source['excerpt']:
-                md.append(f"   - Excerpt: \"{source['excerpt']}\"")
-            md.append("")
-
-        md.append("---")
-        md.append("")
-
-    # Metadata
-    md.append("## Metadata")
-    md.append("")
-    md.append(f"- **Database ID**: {pathway['id']}")
-    md.append(f"- **Last Verified**: {pathway['last_verified_date'] or 'N/A'}")
-    md.append(f"- **Created**: {pathway['created_at']}")
-    md.append(f"- **Updated**: {pathway['updated_at']}")
-    md.append("")
-
-    # Tags
-    md.append("---")
-    md.append("")
-    md.append(f"**Tags**: #{pathway['country_name'].lower().replace(' ', '-')} #{pathway['pathway_type'].replace('_', '-')} #residency #visa")
-
-    return "\n".join(md)
-
-
-def export_pathway(country: str, pathway_type: str, output_path: str = None, overwrite: bool = False) -> None:
+
+def export_pathway(country: str, pathway_type: str, output_path: str = None, overwrite: bool = False,
+                   full: bool = False) -> None:
     """Export a single pathway to markdown"""
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    try:
-        # Get pathway with country name
-        cursor.execute("""
-            SELECT p.*, c.name as country_name
-            FROM residency_pathways p
-            JOIN countries c ON p.country_id = c.id
-            WHERE c.name = ? AND p.pathway_type = ?
-        """, (country, pathway_type))
-
-        pathway = cursor.fetchone()
-
-        if not pathway:
-            print(f"❌ Pathway not found: {country} / {pathway_type}", file=sys.stderr)
-            sys.exit(1)
+    # Get pathway with country name
+    cursor.execute("""
+        SELECT p.*, c.name as country_name, c.code as country_code
+        FROM residency_pathways p
+        JOIN countries c ON p.country_id = c.id
+        WHERE c.name = ? AND p.pathway_type = ?
+    """, (country, pathway_type))
 
-        # Get sources
-        sources = get_pathway_sources(conn, pathway['id'])
+    records = fetch_records(cursor)
 
-        # Generate markdown
-        markdown = generate_pathway_markdown(pathway, sources)
+    if not records:
+        print(f"❌ Pathway not found: {country} / {pathway_type}", file=sys.stderr)
+        sys.exit(1)
+    pathway = records[0]
 
-        # Determine output path
-        if not output_path:
-            filename = f"{pathway['name'].replace('/', '_').replace(' ', '_')}.md"
-            output_path = VAULT_PATH / "Countries" / country / filename
-        else:
-            output_path = Path(output_path)
+    # Get sources
+    sources = get_sources_by_pathway(conn, [pathway.id])[pathway.id]
 
-        # Check if exists
-        if output_path.exists() and not overwrite:
-            print(f"⚠️  File exists: {output_path}", file=sys.stderr)
-            print(f"   Use --overwrite to replace", file=sys.stderr)
-            sys.exit(1)
+    path = pathway_path(pathway, output_path)
+    manifest = load_export_manifest(conn, [path])
 
-        # Write file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(markdown)
+    with VaultWriter() as writer:
+        status, entry = write_pathway(pathway, sources, path, manifest, writer, overwrite, full)
+    if status == 'exists':
+        sys.exit(1)
+    save_export_manifest(conn, [entry] if entry else [])
 
-        print(f"✅ Exported pathway to {output_path}", file=sys.stderr)
-        print(f"   Country: {country}", file=sys.stderr)
-        print(f"   Type: {pathway_type}", file=sys.stderr)
-        print(f"   Name: {pathway['name']}", file=sys.stderr)
-        print(f"   Size: {len(markdown)} bytes", file=sys.stderr)
-        print(f"   Sources: {len(sources)}", file=sys.stderr)
 
-        # Output path for scripting
-        print(output_path)
+def pathway_filename(pathway) -> str:
+    """Markdown file name for a pathway"""
+    return f"{pathway.name.replace('/', '_').replace(' ', '_')}.md"
 
-    finally:
-        conn.close()
-
-
-def generate_country_index(country: str, pathways: list, country_info: sqlite3.Row) -> str:
-    """Generate country index/README from database"""
-    md = []
-
-    # Header
-    md.append(f"# {country} - Residency & Citizenship Pathways")
-    md.append("")
-    md.append(f"**EU Member**: {'✅ Yes' if country_info['is_eu_member'] else '❌ No'}")
-    md.append(f"**Schengen**: {'✅ Yes' if country_info['is_schengen'] else '❌ No'}")
-    md.append(f"**Capital**: {country_info['capital']}")
-    md.append(f"**Language**: {country_info['official_language']}")
-    md.append(f"**Currency**: {country_info['currency']}")
-    md.append(f"**Last Updated**: {datetime.now().strftime('%Y-%m-%d')}")
-    md.append(f"**Generated from Database**")
-    md.append("")
-    md.append("---")
-    md.append("")
-
-    # Pathways overview
-    md.append(f"## Residency Pathways ({len(pathways)} documented)")
-    md.append("")
 
-    for pathway in pathways:
-        filename = f"{pathway['name'].replace('/', '_').replace(' ', '_')}.md"
-        md.append(f"### [{pathway['name']}]({filename})")
-        md.append(f"- **Type**: {pathway['pathway_type']}")
-        md.append(f"- **Status**: {'✅ Active' if pathway['is_active'] else '❌ Inactive'}")
-        if pathway['min_income_eur']:
-            md.append(f"- **Min Income**: €{pathway['min_income_eur']:,}/year")
-        if pathway['min_investment_eur']:
-            md.append(f"- **Min Investment**: €{pathway['min_investment_eur']:,}")
-        if pathway['initial_duration_months']:
-            md.append(f"- **Duration**: {pathway['initial_duration_months']} months")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-
-    # Quick comparison table
-    md.append("## Quick Comparison")
-    md.append("")
-    md.append("| Pathway | Min Income/Investment | Duration | Renewable |")
-    md.append("|---------|----------------------|----------|-----------|")
+def pathway_path(pathway, output_path: str = None) -> Path:
+    """Where a pathway is exported (the vault unless output_path is given)"""
+    if output_path:
+        return Path(output_path)
+    return VAULT_PATH / "Countries" / pathway.country_name / pathway_filename(pathway)
 
-    for pathway in pathways:
-        amount = ""
-        if pathway['min_income_eur']:
-            amount = f"€{pathway['min_income_eur']:,}/yr"
-        elif pathway['min_investment_eur']:
-            amount = f"€{pathway['min_investment_eur']:,}"
 
-        duration = f"{pathway['initial_duration_months']} mo" if pathway['initial_duration_months'] else "N/A"
-        renewable = "✅" if pathway['renewable'] else "❌"
+def write_pathway(pathway, sources: list, output_path: Path, manifest: dict, writer: VaultWriter,
+                  overwrite: bool = False, full: bool = False) -> tuple:
+    """
+    Export a pathway to output_path if it changed (see export_file).
 
-        md.append(f"| {pathway['name']} | {amount} | {duration} | {renewable} |")
+    Returns:
+        (status, manifest entry or None)
+    """
+    status, entry = export_file(
+        output_path, 'pathway', pathway.id, input_key([pathway], sources),
+        lambda: generate_pathway_markdown(pathway, sources),
+        manifest, writer, overwrite, full
+    )
 
-    md.append("")
-    md.append("---")
-    md.append("")
+    if status == 'exists':
+        print(f"⚠️  File exists: {output_path}", file=sys.stderr)
+        print(f"   Use --overwrite to replace", file=sys.stderr)
+        return status, entry
 
-    # Add sources summary
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    if status == 'unchanged':
+        print(f"   Unchanged: {output_path}", file=sys.stderr)
+    else:
+        print(f"✅ Exported pathway to {output_path}", file=sys.stderr)
+        print(f"   Country: {pathway.country_name}", file=sys.stderr)
+        print(f"   Type: {pathway.pathway_type}", file=sys.stderr)
+        print(f"   Name: {pathway.name}", file=sys.stderr)
+        print(f"   Size: {entry[5]} bytes", file=sys.stderr)
+        print(f"   Sources: {len(sources)}", file=sys.stderr)
 
-    cursor.execute("""
-        SELECT DISTINCT s.*
-        FROM sources s
-        WHERE s.country_id = ?
-        ORDER BY s.credibility DESC, s.title
-    """, (country_info['id'],))
+    # Output path for scripting
+    print(output_path)
+    return status, entry
 
-    country_sources = cursor.fetchall()
-    conn.close()
 
-    if country_sources:
-        md.append("## All Sources")
-        md.append("")
+def generate_country_index(country: str, pathways: list, country_info, country_sources: list) -> str:
+    """
+    Generate country index/README from database
+
+    Layout: config/templates/country_index.md
+    """
+    # Group sources by credibility, highest first
+    by_credibility = {}
+    for source in country_sources:
+        by_credibility.setdefault(source.credibility, []).append(source)
+
+    return get_template('country_index.md')(
+        country,
+        country_info,
+        [(pathway, pathway_filename(pathway)) for pathway in pathways],
+        [(cred, by_credibility[cred]) for cred in sorted(by_credibility, reverse=True)],
+        country_last_updated(country_info, pathways, country_sources)[:10]
+    )
 
-        # Group by credibility
-        by_credibility = {}
-        for source in country_sources:
-            cred = source['credibility']
-            if cred not in by_credibility:
-                by_credibility[cred] = []
-            by_credibility[cred].append(source)
 
-        for cred in sorted(by_credibility.keys(), reverse=True):
-            md.append(f"### {'⭐' * cred} ({cred}/5) - {len(by_credibility[cred])} source(s)")
-            md.append("")
-            for source in by_credibility[cred]:
-                md.append(f"- **{source['title']}**")
-                md.append(f"  - URL: {source['url']}")
-                md.append(f"  - Type: {source['source_type']}")
-                if source['last_verified_date']:
-                    md.append(f"  - Last Verified: {source['last_verified_date']}")
-                md.append("")
+def export_country(country: str, overwrite: bool = False, full: bool = False,
+                   pathway_ids: set = None, changes_up_to: int = None) -> dict:
+    """
+    Export all pathways for a country AND generate index
 
-        md.append("---")
-        md.append("")
+    Only files whose inputs changed are re-rendered (unless full), and
+    only files whose bytes changed are written. With pathway_ids, only
+    those pathways' notes are considered (the index always is).
 
-    md.append(f"**Generated from Database** - Country ID: {country_info['id']}")
-    md.append(f"**Tags**: #{country.lower().replace(' ', '-')} #overview #index")
+    Files are staged and renamed into the vault together (see VaultWriter).
 
-    return "\n".join(md)
+    The country's export_changes are pruned afterwards, except those of
+    notes that were not exported ('exists' or an error), and all of them
+    if the index was not. With pathway_ids, only changes up to
+    changes_up_to are covered (none are pruned without it).
 
+    Returns:
+        dict with the number of pathway files 'written' and 'unchanged',
+        and the 'bytes_written' and 'bytes_skipped' of all files
 
-def export_country(country: str, overwrite: bool = False) -> None:
-    """Export all pathways for a country AND generate index"""
+    Raises:
+        ExportError: If the country does not exist or has no pathways
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
 
-    try:
-        # Get country info
-        cursor.execute("SELECT * FROM countries WHERE name = ?", (country,))
-        country_info = cursor.fetchone()
+    # Changes logged before the snapshot is taken are covered by this export
+    last_change = latest_change_id(conn) if pathway_ids is None else changes_up_to
 
-        if not country_info:
-            print(f"❌ Country not found: {country}", file=sys.stderr)
-            sys.exit(1)
+    # Load the country, its pathways and sources up front; render from that
+    snapshot = load_country_snapshot(conn, country)
 
-        # Get all pathways for country
-        cursor.execute("""
-            SELECT p.*, c.name as country_name
-            FROM residency_pathways p
-            JOIN countries c ON p.country_id = c.id
-            WHERE c.name = ?
-            ORDER BY p.pathway_type
-        """, (country,))
+    if not snapshot:
+        raise ExportError(f"Country not found: {country}")
 
-        pathways = cursor.fetchall()
+    country_info = snapshot['country_info']
+    pathways = snapshot['pathways']
 
-        if not pathways:
-            print(f"❌ No pathways found for {country}", file=sys.stderr)
-            sys.exit(1)
+    if not pathways:
+        raise ExportError(f"No pathways found for {country}")
+
+    selected = [p for p in pathways if pathway_ids is None or p.id in pathway_ids]
+    print(f"📤 Exporting {len(selected)} pathways for {country}...\n", file=sys.stderr)
 
-        print(f"📤 Exporting {len(pathways)} pathways for {country}...\n", file=sys.stderr)
+    index_path = VAULT_PATH / "Countries" / country / "README.md"
+    paths = {pathway.id: pathway_path(pathway) for pathway in selected}
+    manifest = load_export_manifest(conn, [*paths.values(), index_path])
 
-        # Export individual pathways
-        exported = []
-        for pathway in pathways:
+    # Stage every file of the country, then rename them into place together
+    counts = {'written': 0, 'unchanged': 0}
+    entries = []
+    # Pathways whose changes stay pending (unselected ones may have older changes kept)
+    not_exported = {p.id for p in pathways if pathway_ids is not None and p.id not in pathway_ids}
+    with VaultWriter() as writer:
+        for pathway in selected:
             try:
-                export_pathway(country, pathway['pathway_type'], overwrite=overwrite)
-                exported.append(pathway['pathway_type'])
+                status, entry = write_pathway(pathway, snapshot['pathway_sources'][pathway.id],
+                                              paths[pathway.id], manifest, writer, overwrite, full)
+                if status in counts:
+                    counts[status] += 1
+                else:
+                    not_exported.add(pathway.id)
+                if entry:
+                    entries.append(entry)
             except Exception as e:
-                print(f"❌ Error exporting {pathway['pathway_type']}: {e}", file=sys.stderr)
+                print(f"❌ Error exporting {pathway.pathway_type}: {e}", file=sys.stderr)
+                not_exported.add(pathway.id)
 
         # Generate country index
         print(f"\n📋 Generating country index...", file=sys.stderr)
-        index_md = generate_country_index(country, pathways, country_info)
-        index_path = VAULT_PATH / "Countries" / country / "README.md"
-
-        if index_path.exists() and not overwrite:
+        status, entry = export_file(
+            index_path, 'country_index', country_info.id,
+            input_key([country_info], pathways, snapshot['country_sources']),
+            lambda: generate_country_index(country, pathways, country_info, snapshot['country_sources']),
+            manifest, writer, overwrite, full
+        )
+
+        if status == 'exists':
             print(f"⚠️  Index exists: {index_path}", file=sys.stderr)
             print(f"   Use --overwrite to replace", file=sys.stderr)
+            last_change = None
+        elif status == 'unchanged':
+            print(f"   Unchanged: {index_path}", file=sys.stderr)
         else:
-            index_path.write_text(index_md)
             print(f"✅ Generated country index: {index_path}", file=sys.stderr)
+        if entry:
+            entries.append(entry)
 
-        print(f"\n✅ Exported {len(exported)} pathways + index for {country}", file=sys.stderr)
+    save_export_manifest(conn, entries)
+    prune_export_changes(conn, last_change, country_id=country_info.id, keep_pathway_ids=not_exported)
 
-    finally:
-        conn.close()
+    counts['bytes_written'] = writer.bytes_written
+    counts['bytes_skipped'] = writer.bytes_skipped
+    print(f"\n✅ Exported {counts['written']} pathways + index for {country} "
+          f"({counts['unchanged']} unchanged)", file=sys.stderr)
+    print(f"   {writer.files_written} files / {writer.bytes_written:,} bytes written, "
+          f"{writer.files_skipped} files / {writer.bytes_skipped:,} bytes unchanged", file=sys.stderr)
+    return counts
+
+
+def export_country_job(country: str, overwrite: bool = False, full: bool = False) -> dict:
+    """
+    Export one country for all-pathways (runs in a worker process).
+
+    Output is captured and returned with the result, so the parent can
+    print each country's messages in one piece.
+
+    Returns:
+        dict with country, status ('exported', 'skipped' or 'error'),
+        pathways, written, bytes_written, bytes_skipped, seconds, message,
+        stdout and stderr
+    """
+    result = {'country': country, 'status': 'exported', 'pathways': 0, 'written': 0,
+              'bytes_written': 0, 'bytes_skipped': 0, 'message': None}
+    stdout, stderr = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            counts = export_country(country, overwrite, full)
+            result['pathways'] = counts['written'] + counts['unchanged']
+            result['written'] = counts['written']
+            result['bytes_written'] = counts['bytes_written']
+            result['bytes_skipped'] = counts['bytes_skipped']
+        except ExportError as e:
+            result['status'] = 'skipped'
+            result['message'] = str(e)
+        except Exception as e:
+            result['status'] = 'error'
+            result['message'] = f"{type(e).__name__}: {e}"
+        except SystemExit as e:
+            # e.g. get_db_connection() with the database gone: fail this country, not the pool
+            result['status'] = 'error'
+            result['message'] = f"Exited with code {e.code}"
+
+    result['seconds'] = time.perf_counter() - start
+    result['stdout'] = stdout.getvalue()
+    result['stderr'] = stderr.getvalue()
+    return result
+
+
+def export_all_countries(overwrite: bool = False, jobs: int = 1, full: bool = False) -> list:
+    """
+    Export every country, optionally in a pool of worker processes.
+
+    Args:
+        overwrite: Overwrite existing files
+        jobs: Number of worker processes (1 = export in this process)
+        full: Re-render every file even if its inputs are unchanged
+
+    Returns:
+        List of export_country_job() results, in country order
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM countries ORDER BY name")
+    countries = [row['name'] for row in cursor.fetchall()]
+
+    # Changes logged so far are covered by this export (see watch)
+    last_change = latest_change_id(conn)
+
+    print(f"📤 Exporting pathways for {len(countries)} countries"
+          f"{f' ({jobs} workers)' if jobs > 1 else ''}...\n", file=sys.stderr)
+
+    def report(result: dict) -> None:
+        sys.stdout.write(result['stdout'])
+        sys.stdout.flush()
+        sys.stderr.write(result['stderr'])
+        if result['status'] == 'error':
+            print(f"❌ {result['country']}: {result['message']}", file=sys.stderr)
+
+    results = []
+    if jobs <= 1:
+        for country in countries:
+            results.append(export_country_job(country, overwrite, full))
+            report(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(export_country_job, country, overwrite, full) for country in countries]
+            for future in as_completed(futures):
+                report(future.result())
+            results = [future.result() for future in futures]
+
+    if last_change and not any(result['status'] == 'error' for result in results):
+        prune_export_changes(conn, last_change)
+
+    return results
+
+
+def print_export_summary(results: list) -> None:
+    """Print per-country status and timings for all-pathways"""
+    print(f"\n📊 Export summary\n", file=sys.stderr)
+    icons = {'exported': '✅', 'skipped': '⏭️ ', 'error': '❌'}
+    for result in results:
+        if result['status'] == 'exported':
+            detail = f"{result['pathways']} pathways ({result['written']} written)"
+        else:
+            detail = result['message']
+        print(f"   {icons[result['status']]} {result['country']}: {detail} ({result['seconds']:.2f}s)",
+              file=sys.stderr)
+
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in icons}
+    print(f"\n   Countries exported: {counts['exported']}, skipped: {counts['skipped']}, "
+          f"failed: {counts['error']}", file=sys.stderr)
+    print(f"   Pathways exported: {sum(r['pathways'] for r in results)} "
+          f"({sum(r['written'] for r in results)} written)", file=sys.stderr)
+    print(f"   Bytes written: {sum(r['bytes_written'] for r in results):,}, "
+          f"unchanged: {sum(r['bytes_skipped'] for r in results):,}", file=sys.stderr)
+
+
+def read_export_changes(conn: sqlite3.Connection, after_id: int) -> tuple:
+    """
+    Read the export_changes rows logged after after_id.
+
+    Returns:
+        (last change id, {country name: set of changed pathway ids})
+    """
+    cursor = conn.execute("""
+        SELECT ec.id, c.name, ec.pathway_id
+        FROM export_changes ec
+        LEFT JOIN countries c ON c.id = ec.country_id
+        WHERE ec.id > ?
+        ORDER BY ec.id
+    """, (after_id,))
+
+    last_id = after_id
+    changed = {}
+    for change_id, country, pathway_id in cursor:
+        last_id = change_id
+        if country is None:
+            continue
+        pathway_ids = changed.setdefault(country, set())
+        if pathway_id is not None:
+            pathway_ids.add(pathway_id)
+    return last_id, changed
+
+
+def latest_change_id(conn: sqlite3.Connection) -> int:
+    """ID of the last export_changes row (0 if there is none)"""
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM export_changes").fetchone()[0]
+
+
+def prune_export_changes(conn: sqlite3.Connection, up_to_id: int, country_id: int = None,
+                         keep_pathway_ids: set = ()) -> None:
+    """
+    Delete export_changes rows that have been exported (no write lock if
+    there are none).
+
+    Args:
+        up_to_id: Last change covered by the export
+        country_id: Only changes of this country (a country export)
+        keep_pathway_ids: Pathways whose notes were not exported
+    """
+    if not up_to_id:
+        return
+
+    query = "DELETE FROM export_changes WHERE id <= ?"
+    params = [up_to_id]
+    if country_id is not None:
+        query += " AND country_id = ?"
+        params.append(country_id)
+    if keep_pathway_ids:
+        placeholders = ','.join('?' * len(keep_pathway_ids))
+        query += f" AND (pathway_id IS NULL OR pathway_id NOT IN ({placeholders}))"
+        params.extend(sorted(keep_pathway_ids))
+
+    if not conn.execute(query.replace("DELETE", "SELECT 1", 1) + " LIMIT 1", params).fetchone():
+        return
+
+    begin_write(conn)
+    try:
+        conn.execute(query, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def export_pending_changes(conn: sqlite3.Connection, after_id: int, overwrite: bool = False) -> int:
+    """
+    Re-export the notes and country indexes affected by changes after after_id.
+
+    Each country prunes the changes it exported (see export_country);
+    those of files that were not replaced stay for the next full export.
+
+    Returns:
+        Last change id handled
+    """
+    last_id, changed = read_export_changes(conn, after_id)
+
+    for country, pathway_ids in sorted(changed.items()):
+        start = time.perf_counter()
+        try:
+            counts = export_country(country, overwrite, pathway_ids=pathway_ids, changes_up_to=last_id)
+        except ExportError as e:
+            print(f"⚠️  {e}", file=sys.stderr)
+            continue
+        print(f"🔄 {country}: {counts['written']} of {len(pathway_ids)} changed pathways written "
+              f"({time.perf_counter() - start:.2f}s)\n", file=sys.stderr)
+
+    return last_id
+
+
+def watch_exports(overwrite: bool = False, interval: float = 0.5) -> None:
+    """
+    Re-export changed pathways and country indexes until interrupted.
+
+    PRAGMA data_version is polled every interval seconds; it changes when
+    another connection commits, and only then is export_changes (filled by
+    triggers on pathways, sources and pathway_sources) read.
+    """
+    conn = get_db_connection()
+    last_id = latest_change_id(conn)
+    version = None
+
+    print(f"👀 Watching for database changes every {interval}s (Ctrl-C to stop)...\n", file=sys.stderr)
+    try:
+        while True:
+            current = conn.execute("PRAGMA data_version").fetchone()[0]
+            if current != version:
+                version = current
+                last_id = export_pending_changes(conn, last_id, overwrite)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped watching", file=sys.stderr)
+
+
+def pathway_filter(country: str = None, pathway_type: str = None) -> tuple:
+    """WHERE clause and params selecting pathways (p) by country name (c) and type"""
+    conditions = []
+    params = []
+    if country:
+        conditions.append("c.name = ?")
+        params.append(country)
+    if pathway_type:
+        conditions.append("p.pathway_type = ?")
+        params.append(pathway_type)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def iter_pathway_documents(conn: sqlite3.Connection, where: str, params: list):
+    """
+    Yield one dict per pathway with its linked sources nested under 'sources'.
+
+    Pathways and links are read by two cursors ordered by pathway ID and
+    merged as they stream, so memory use does not grow with the result.
+    """
+    pathways = conn.execute(f"""
+        SELECT c.name AS country, p.*
+        FROM residency_pathways p
+        JOIN countries c ON p.country_id = c.id
+        {where}
+        ORDER BY p.id
+    """, params)
+
+    links = conn.execute(f"""
+        SELECT ps.pathway_id, {SOURCE_FIELDS}
+        FROM pathway_sources ps
+        JOIN sources s ON ps.source_id = s.id
+        JOIN residency_pathways p ON ps.pathway_id = p.id
+        JOIN countries c ON p.country_id = c.id
+        {where}
+        ORDER BY ps.pathway_id, s.credibility DESC, ps.relevance_score DESC
+    """, params)
+
+    link = next(links, None)
+    for pathway in pathways:
+        document = dict(pathway)
+        document['sources'] = []
+
+        while link is not None and link['pathway_id'] < pathway['id']:
+            link = next(links, None)
+        while link is not None and link['pathway_id'] == pathway['id']:
+            source = dict(link)
+            del source['pathway_id']
+            document['sources'].append(source)
+            link = next(links, None)
+
+        yield document
+
+
+def iter_pathway_rows(conn: sqlite3.Connection, where: str, params: list) -> sqlite3.Cursor:
+    """Cursor over flat pathway rows with source counts (header in .description)"""
+    return conn.execute(f"""
+        SELECT
+            c.name AS country,
+            p.*,
+            COALESCE(l.source_count, 0) AS source_count,
+            COALESCE(l.official_source_count, 0) AS official_source_count,
+            l.max_credibility
+        FROM residency_pathways p
+        JOIN countries c ON p.country_id = c.id
+        LEFT JOIN (
+            SELECT
+                ps.pathway_id,
+                COUNT(*) AS source_count,
+                SUM(s.source_type = 'official_government') AS official_source_count,
+                MAX(s.credibility) AS max_credibility
+            FROM pathway_sources ps
+            JOIN sources s ON ps.source_id = s.id
+            GROUP BY ps.pathway_id
+        ) l ON l.pathway_id = p.id
+        {where}
+        ORDER BY p.id
+    """, params)
+
+
+def open_data_output(output: str = None, compress: bool = False, overwrite: bool = False):
+    """
+    Open the destination of a dataset export for writing text.
+
+    Args:
+        output: File path, or None/'-' for stdout
+        compress: gzip the output (implied by a .gz output path)
+
+    Returns:
+        Context manager yielding a text file object
+    """
+    if not output or output == '-':
+        if compress:
+            return gzip.open(sys.stdout.buffer, 'wt', encoding='utf-8', newline='')
+        return contextlib.nullcontext(sys.stdout)
+
+    path = Path(output)
+    if path.exists() and not overwrite:
+        raise ExportError(f"File exists: {path} (use --overwrite to replace)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if compress or path.suffix == '.gz':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_data(output_format: str, country: str = None, pathway_type: str = None,
+                output: str = None, compress: bool = False, overwrite: bool = False) -> int:
+    """
+    Export pathways as a dataset, streamed from the database.
+
+    json: one document per line (pathway columns plus nested sources)
+    csv: one row per pathway (pathway columns plus source counts)
+
+    Returns:
+        Number of pathways written
+
+    Raises:
+        ExportError: If the country or pathway does not exist
+    """
+    conn = get_db_connection()
+    where, params = pathway_filter(country, pathway_type)
+
+    if country and not conn.execute("SELECT 1 FROM countries WHERE name = ?", (country,)).fetchone():
+        raise ExportError(f"Country not found: {country}")
+    if pathway_type and not conn.execute(
+            f"SELECT 1 FROM residency_pathways p JOIN countries c ON p.country_id = c.id {where}",
+            params).fetchone():
+        raise ExportError(f"Pathway not found: {country} / {pathway_type}")
+
+    count = 0
+    with open_data_output(output, compress, overwrite) as out:
+        # One read transaction: pathways and links come from the same snapshot
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+        try:
+            if output_format == 'json':
+                for document in iter_pathway_documents(conn, where, params):
+                    out.write(json.dumps(document, ensure_ascii=False) + "\n")
+                    count += 1
+            else:
+                cursor = iter_pathway_rows(conn, where, params)
+                writer = csv.writer(out)
+                writer.writerow([description[0] for description in cursor.description])
+                for row in cursor:
+                    writer.writerow(row)
+                    count += 1
+        finally:
+            if own_transaction:
+                conn.rollback()
+
+    destination = output if output and output != '-' else 'stdout'
+    print(f"✅ Exported {count} pathways as {output_format} to {destination}", file=sys.stderr)
+    if destination != 'stdout':
+        # Output path for scripting
+        print(output)
+    return count
+
+
+def load_comparison(conn: sqlite3.Connection, countries: list = None) -> dict:
+    """
+    Aggregate pathways per country and pathway type in one grouped query.
+
+    Returns:
+        Columns by name (country, country_code, pathway_type, pathways,
+        min_income_eur, ..., source_count, max_credibility, last_updated),
+        each a list with one value per (country, pathway type)
+
+    Raises:
+        ExportError: If a requested country does not exist
+    """
+    where = ""
+    params = []
+    if countries:
+        known = {row[0] for row in conn.execute(
+            f"SELECT name FROM countries WHERE name IN ({', '.join('?' for _ in countries)})", countries)}
+        missing = [country for country in countries if country not in known]
+        if missing:
+            raise ExportError(f"Country not found: {', '.join(missing)}")
+        where = f"WHERE c.name IN ({', '.join('?' for _ in countries)})"
+        params = countries
+
+    cursor = conn.execute(f"""
+        SELECT
+            c.name AS country,
+            c.code AS country_code,
+            p.pathway_type,
+            COUNT(DISTINCT p.id) AS pathways,
+            MIN(p.min_income_eur) AS min_income_eur,
+            MIN(p.min_investment_eur) AS min_investment_eur,
+            MIN(p.application_fee_eur) AS application_fee_eur,
+            MAX(p.initial_duration_months) AS initial_duration_months,
+            MAX(p.renewable) AS renewable,
+            MIN(p.min_years_to_citizenship) AS min_years_to_citizenship,
+            COUNT(DISTINCT ps.source_id) AS source_count,
+            MAX(s.credibility) AS max_credibility,
+            MAX(p.updated_at) AS last_updated
+        FROM residency_pathways p
+        JOIN countries c ON p.country_id = c.id
+        LEFT JOIN pathway_sources ps ON ps.pathway_id = p.id
+        LEFT JOIN sources s ON s.id = ps.source_id
+        {where}
+        GROUP BY c.id, p.pathway_type
+        ORDER BY c.name, p.pathway_type
+    """, params)
+
+    names = [description[0] for description in cursor.description]
+    rows = cursor.fetchall()
+    columns = zip(*rows) if rows else [()] * len(names)
+    return {name: list(values) for name, values in zip(names, columns)}
+
+
+def generate_comparison_markdown(matrix: dict) -> str:
+    """
+    Generate the cross-country comparison note
+
+    Layout: config/templates/comparison.md
+    """
+    countries = {}
+    rows_by_type = {}
+    for i, (country, pathway_type) in enumerate(zip(matrix['country'], matrix['pathway_type'])):
+        countries.setdefault(country, set()).add(pathway_type)
+        rows_by_type.setdefault(pathway_type, []).append(i)
+
+    pathway_types = sorted(rows_by_type)
+    return get_template('comparison.md')(
+        matrix,
+        list(countries.items()),
+        pathway_types,
+        [(pathway_type, rows_by_type[pathway_type]) for pathway_type in pathway_types],
+        (max(matrix['last_updated'], default=None) or '')[:10]
+    )
+
+
+def export_comparison(output_format: str, countries: list = None, output: str = None,
+                      compress: bool = False, overwrite: bool = False) -> int:
+    """
+    Export the comparison matrix across countries and pathway types.
+
+    markdown: one note (default: Comparison.md in the vault)
+    json: one document per line, per country and pathway type
+    csv: one row per country and pathway type
+
+    Returns:
+        Number of (country, pathway type) rows
+
+    Raises:
+        ExportError: If a country does not exist or there are no pathways
+    """
+    conn = get_db_connection()
+    matrix = load_comparison(conn, countries)
+    count = len(matrix['country'])
+    if not count:
+        raise ExportError("No pathways to compare")
+
+    if output_format == 'markdown':
+        path = Path(output) if output else VAULT_PATH / "Comparison.md"
+        content = generate_comparison_markdown(matrix).encode('utf-8')
+        if path.exists() and path.read_bytes() == content:
+            print(f"   Unchanged: {path}", file=sys.stderr)
+        elif path.exists() and not overwrite:
+            raise ExportError(f"File exists: {path} (use --overwrite to replace)")
+        else:
+            with VaultWriter() as writer:
+                writer.stage(path, content)
+        destination = str(path)
+    else:
+        columns = list(matrix)
+        with open_data_output(output, compress, overwrite) as out:
+            if output_format == 'json':
+                for row in zip(*matrix.values()):
+                    out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+            else:
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                writer.writerows(zip(*matrix.values()))
+        destination = output if output and output != '-' else 'stdout'
+
+    print(f"✅ Exported comparison of {len(set(matrix['country']))} countries "
+          f"({count} country/pathway types) as {output_format} to {destination}", file=sys.stderr)
+    if destination != 'stdout':
+        # Output path for scripting
+        print(destination)
+    return count
 
 
 def main():
@@ -510,8 +1215,10 @@ def main():
     parser_pathway.add_argument('pathway_type', help='Pathway type')
     parser_pathway.add_argument('--format', default='obsidian', choices=['obsidian', 'json', 'csv'],
                                 help='Output format')
-    parser_pathway.add_argument('--output', help='Output path (default: auto-generate)')
+    parser_pathway.add_argument('--output', help='Output path (default: vault for obsidian, stdout for json/csv)')
+    parser_pathway.add_argument('--gzip', action='store_true', help='gzip json/csv output (implied by .gz)')
     parser_pathway.add_argument('--overwrite', action='store_true', help='Overwrite existing files')
+    parser_pathway.add_argument('--full', action='store_true', help='Re-render even if the inputs are unchanged')
 
     # Country command
     parser_country = subparsers.add_parser('country', help='Export all pathways for a country')
@@ -519,12 +1226,37 @@ def main():
     parser_country.add_argument('--format', default='obsidian', choices=['obsidian', 'json', 'csv'],
                                 help='Output format')
     parser_country.add_argument('--overwrite', action='store_true', help='Overwrite existing files')
+    parser_country.add_argument('--output', help='Output file for json/csv (default: stdout)')
+    parser_country.add_argument('--gzip', action='store_true', help='gzip json/csv output (implied by .gz)')
+    parser_country.add_argument('--full', action='store_true', help='Re-render even if the inputs are unchanged')
 
     # All pathways command
     parser_all = subparsers.add_parser('all-pathways', help='Export all pathways for all countries')
     parser_all.add_argument('--format', default='obsidian', choices=['obsidian', 'json', 'csv'],
                            help='Output format')
     parser_all.add_argument('--overwrite', action='store_true', help='Overwrite existing files')
+    parser_all.add_argument('--output', help='Output file for json/csv (default: stdout)')
+    parser_all.add_argument('--gzip', action='store_true', help='gzip json/csv output (implied by .gz)')
+    parser_all.add_argument('--jobs', type=int, default=1,
+                           help='Countries to export in parallel (default: 1)')
+    parser_all.add_argument('--full', action='store_true', help='Re-render even if the inputs are unchanged')
+
+    # Comparison command
+    parser_comparison = subparsers.add_parser('comparison',
+                                              help='Export a matrix of all countries and pathway types')
+    parser_comparison.add_argument('--format', default='markdown', choices=['markdown', 'json', 'csv'],
+                                   help='Output format')
+    parser_comparison.add_argument('--countries', help='Comma-separated country names (default: all)')
+    parser_comparison.add_argument('--output',
+                                   help='Output path (default: vault Comparison.md for markdown, stdout for json/csv)')
+    parser_comparison.add_argument('--gzip', action='store_true', help='gzip json/csv output (implied by .gz)')
+    parser_comparison.add_argument('--overwrite', action='store_true', help='Overwrite existing files')
+
+    # Watch command
+    parser_watch = subparsers.add_parser('watch', help='Re-export changed pathways as the database changes')
+    parser_watch.add_argument('--overwrite', action='store_true', help='Overwrite existing files')
+    parser_watch.add_argument('--interval', type=float, default=0.5,
+                              help='Seconds between checks for changes (default: 0.5)')
 
     args = parser.parse_args()
 
@@ -533,26 +1265,54 @@ def main():
         sys.exit(1)
 
     # Route to handler
-    if args.command == 'pathway':
-        export_pathway(args.country, args.pathway_type, args.output, args.overwrite)
+    if args.command == 'watch':
+        if args.interval <= 0:
+            parser.error("--interval must be positive")
+        watch_exports(args.overwrite, args.interval)
+    elif args.command == 'comparison':
+        countries = [name.strip() for name in args.countries.split(',')] if args.countries else None
+        try:
+            export_comparison(args.format, countries, args.output, args.gzip, args.overwrite)
+            sys.stdout.flush()
+        except ExportError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head): stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(1)
+    elif args.format in DATA_FORMATS:
+        try:
+            export_data(args.format, getattr(args, 'country', None), getattr(args, 'pathway_type', None),
+                        args.output, args.gzip, args.overwrite)
+            sys.stdout.flush()
+        except ExportError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head): stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(1)
+    elif args.command == 'pathway':
+        export_pathway(args.country, args.pathway_type, args.output, args.overwrite, args.full)
     elif args.command == 'country':
-        export_country(args.country, args.overwrite)
+        try:
+            export_country(args.country, args.overwrite, args.full)
+        except ExportError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
     elif args.command == 'all-pathways':
-        # Get all countries
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM countries ORDER BY name")
-        countries = cursor.fetchall()
-        conn.close()
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
 
-        print(f"📤 Exporting pathways for {len(countries)} countries...\n", file=sys.stderr)
+        results = export_all_countries(args.overwrite, args.jobs, args.full)
+        print_export_summary(results)
 
-        for country_row in countries:
-            try:
-                export_country(country_row['name'], args.overwrite)
-            except SystemExit:
-                # No pathways for this country, skip
-                pass
+        if any(result['status'] == 'error' for result in results):
+            print(f"\n❌ Export finished with errors", file=sys.stderr)
+            sys.exit(1)
 
         print(f"\n✅ Export complete", file=sys.stderr)
     else:
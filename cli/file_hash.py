@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+File Hashing
+
+SHA256 of artifact files, shared by artifact_register.py, add_pathway.py
+and audit_log_page.py.
+
+Files are hashed as they are on disk. Only the compressed copies the blob
+store makes of text artifacts (artifacts.compression set; see
+blob_store.py) are hashed by their uncompressed content, and only when the
+caller asks for it (decompress), since their artifacts.sha256 is that of
+the uncompressed content.
+
+Files are read in 1 MB blocks into one reused buffer. hashlib releases the
+GIL while hashing blocks that large, so sha256_files() hashes several files
+at once on a thread pool.
+
+The cached_* functions keep digests in the file_hashes table, keyed by
+(device, inode) and valid while the file has the recorded size and
+mtime_ns, so a file hashed by one tool is not read again by the next.
+verify=True re-hashes anyway (and refreshes the cache). The cache holds
+digests of the bytes on disk: decompressed digests are never cached.
+
+Usage (from any script in cli/):
+    from file_hash import cached_sha256, cached_sha256_files, sha256_file
+
+    digest = sha256_file(path)  # Always reads the file
+    digest = cached_sha256(path)
+    digests = cached_sha256_files(paths, workers=8)  # {path: digest}
+    digest = sha256_file(stored_path, decompress=True)  # Compressed blob-store copy
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from blob_store import open_artifact
+from db_common import begin_write, get_db_connection
+
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Hashing is mostly disk-bound; more threads than this rarely help
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# (device, inode) pairs per file_hashes lookup
+LOOKUP_BATCH_SIZE = 250
+
+STORE_HASH_SQL = """
+    INSERT OR REPLACE INTO file_hashes (device, inode, file_size_bytes, mtime_ns, sha256, path)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def sha256_file(file_path, decompress: bool = False) -> str:
+    """
+    Compute SHA256 hash of a file.
+
+    Args:
+        decompress: Hash the uncompressed content of a compressed blob-store
+            copy (.gz/.zst, see blob_store.open_artifact) instead of its bytes
+    """
+    sha256 = hashlib.sha256()
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    f = open_artifact(file_path) if decompress else open(file_path, 'rb', buffering=0)
+    with f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            sha256.update(view[:size])
+    return sha256.hexdigest()
+
+
+def sha256_files(paths: list, workers: int = None, decompress: set = frozenset()) -> dict:
+    """
+    Hash files on a thread pool.
+
+    Args:
+        decompress: Paths hashed by their uncompressed content (see sha256_file)
+
+    Returns:
+        {path: hex digest}, in the order of paths
+    """
+    paths = list(paths)
+    workers = max(1, min(workers or DEFAULT_HASH_WORKERS, len(paths)))
+    if workers == 1:
+        return {path: sha256_file(path, path in decompress) for path in paths}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(lambda path: sha256_file(path, path in decompress), paths)))
+
+
+def lookup_hashes(conn: sqlite3.Connection, stats: dict) -> dict:
+    """
+    Find cached digests for stat results that still match.
+
+    Args:
+        stats: {path: os.stat_result}
+
+    Returns:
+        {path: hex digest} for files whose size and mtime match the cache
+    """
+    by_inode = {}
+    for path, stat in stats.items():
+        by_inode.setdefault((stat.st_dev, stat.st_ino), []).append(path)
+
+    found = {}
+    inodes = list(by_inode)
+    for start in range(0, len(inodes), LOOKUP_BATCH_SIZE):
+        batch = inodes[start:start + LOOKUP_BATCH_SIZE]
+        rows = conn.execute(f"""
+            SELECT device, inode, file_size_bytes, mtime_ns, sha256 FROM file_hashes
+            WHERE (device, inode) IN (VALUES {', '.join('(?, ?)' for _ in batch)})
+        """, [value for inode in batch for value in inode])
+
+        for device, inode, size, mtime_ns, digest in rows:
+            for path in by_inode[(device, inode)]:
+                stat = stats[path]
+                if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                    found[path] = digest
+    return found
+
+
+def store_hashes(conn: sqlite3.Connection, rows: list) -> None:
+    """
+    Save digests in the cache (rows of STORE_HASH_SQL parameters).
+
+    Joins the caller's transaction if one is open; otherwise writes in its
+    own. The cache is best effort: a failed write only prints a warning.
+    """
+    if not rows:
+        return
+    if conn.in_transaction:
+        conn.executemany(STORE_HASH_SQL, rows)
+        return
+
+    try:
+        begin_write(conn)
+        conn.executemany(STORE_HASH_SQL, rows)
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"⚠️  Hash cache not updated: {e}", file=sys.stderr)
+
+
+def cached_sha256_files(paths: list, workers: int = None, verify: bool = False,
+                        conn: sqlite3.Connection = None, decompress: set = frozenset()) -> dict:
+    """
+    Hash files, reading only those not in the cache (or all, with verify).
+
+    Args:
+        decompress: Paths hashed by their uncompressed content (always
+            read; see sha256_file)
+
+    Returns:
+        {path: hex digest}, in the order of paths
+    """
+    conn = conn or get_db_connection()
+    paths = list(paths)
+    stats = {path: os.stat(path) for path in paths if path not in decompress}
+
+    cached = lookup_hashes(conn, stats)
+    to_hash = paths if verify else [path for path in paths if path not in cached]
+    hashed = sha256_files(to_hash, workers, decompress) if to_hash else {}
+
+    rows = []
+    for path, digest in hashed.items():
+        if path in decompress:
+            continue
+        if path in cached and cached[path] != digest:
+            print(f"⚠️  Cached hash was stale for {path}", file=sys.stderr)
+        stat = os.stat(path)
+        before = stats[path]
+        if (stat.st_size, stat.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            continue  # Changed while being hashed: don't cache
+        rows.append((stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, digest, str(path)))
+    store_hashes(conn, rows)
+
+    return {path: hashed[path] if path in hashed else cached[path] for path in paths}
+
+
+def cached_sha256(file_path, verify: bool = False, conn: sqlite3.Connection = None,
+                  decompress: bool = False) -> str:
+    """Compute SHA256 hash of a file, using the cache unless verify (or decompress)"""
+    decompressed = {file_path} if decompress else frozenset()
+    return cached_sha256_files([file_path], 1, verify, conn, decompressed)[file_path]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Job Statistics Counters
+
+job_run statistics (pages_visited, sources_found, artifacts_downloaded,
+knowledge_created) are not updated on the job_run row for every action.
+Writers add to one of COUNTER_SHARDS rows per job in job_run_counters
+(chosen by process ID), so parallel agents working on the same job do
+not all rewrite the same row.
+
+Totals are rolled up lazily:
+- readers use the job_run_stats view (job_run + unrolled shards)
+- audit_finish_job.py folds the shards into job_run and deletes them
+
+Usage (from any script in cli/):
+    from job_counters import add_job_counts
+
+    add_job_counts(cursor, job_id, pages_visited=1)
+"""
+
+import os
+import sqlite3
+
+COUNTERS = ('pages_visited', 'sources_found', 'artifacts_downloaded', 'knowledge_created')
+COUNTER_SHARDS = 16
+
+# One shard per process: a long-running writer keeps hitting the same row
+SHARD = os.getpid() % COUNTER_SHARDS
+
+ADD_COUNTS_SQL = f"""
+    INSERT INTO job_run_counters (job_run_id, shard, {', '.join(COUNTERS)})
+    VALUES (?, ?, {', '.join('?' for _ in COUNTERS)})
+    ON CONFLICT (job_run_id, shard) DO UPDATE SET
+        {', '.join(f'{c} = {c} + excluded.{c}' for c in COUNTERS)}
+"""
+
+
+def add_job_counts(cursor: sqlite3.Cursor, job_id: int, **counts) -> None:
+    """
+    Add to a job's statistics (inside the caller's transaction).
+
+    Note: this is an INSERT, so it changes cursor.lastrowid.
+
+    Args:
+        job_id: job_run ID
+        **counts: Increments keyed by counter name, e.g. pages_visited=3
+    """
+    unknown = set(counts) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown counter(s): {', '.join(sorted(unknown))}")
+
+    values = [counts.get(counter, 0) for counter in COUNTERS]
+    if not any(values):
+        return
+    cursor.execute(ADD_COUNTS_SQL, (job_id, SHARD, *values))
+
+
+def rollup_job_counters(cursor: sqlite3.Cursor, job_id: int = None) -> None:
+    """
+    Fold counter shards into job_run and delete them.
+
+    Args:
+        job_id: Job to roll up (default: every job)
+    """
+    where = "WHERE job_run_id = ?" if job_id is not None else ""
+    params = (job_id,) if job_id is not None else ()
+
+    cursor.execute(f"""
+        UPDATE job_run
+        SET {', '.join(f'{c} = job_run.{c} + shards.{c}' for c in COUNTERS)}
+        FROM (
+            SELECT job_run_id, {', '.join(f'SUM({c}) AS {c}' for c in COUNTERS)}
+            FROM job_run_counters
+            {where}
+            GROUP BY job_run_id
+        ) AS shards
+        WHERE job_run.id = shards.job_run_id
+    """, params)
+    cursor.execute(f"DELETE FROM job_run_counters {where}", params)
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Search CLI Tool
+
+Full-text search (SQLite FTS5, bm25 ranking) across pathways, sources,
+legal references and the text of extracted artifacts.
+
+Pathways, sources and legal references are indexed automatically (database
+triggers). Artifact text lives in files (possibly compressed), so it is
+indexed incrementally with --index: only new or changed files are read.
+
+Usage:
+    python cli/search.py "blue card salary threshold"
+    python cli/search.py "minimum income" --country Italy --type digital_nomad
+    python cli/search.py "language requirement" --kind pathways --kind legal
+    python cli/search.py --index
+
+Examples:
+    # Search everything
+    python cli/search.py "Blue Card salary threshold"
+
+    # Only extracted documents about Germany
+    python cli/search.py "salary threshold" --kind artifacts --country Germany
+
+    # Prefix matching (words ending in *)
+    python cli/search.py "renew*" --type digital_nomad
+
+    # FTS5 query syntax (phrases, OR, NOT, NEAR)
+    python cli/search.py --raw '"blue card" AND (salary OR income) NOT student'
+
+    # Index new/changed artifact text, then search
+    python cli/search.py --index "tax regime for new residents"
+
+    # Rebuild the whole index and merge its segments
+    python cli/search.py --rebuild
+"""
+
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from blob_store import read_artifact_text
+from db_common import PROJECT_ROOT, begin_write, get_db_connection
+
+# --kind value -> search_documents.kind
+KINDS = {
+    'pathways': 'pathway',
+    'sources': 'source',
+    'legal': 'legal',
+    'artifacts': 'artifact'
+}
+
+DEFAULT_LIMIT = 20
+SNIPPET_TOKENS = 16
+
+# bm25 has to score every match before the best can be returned. A word
+# matching more documents than this is too common to rank in time (and
+# carries almost no bm25 weight anyway).
+MAX_RANKED_MATCHES = 5000
+INDEX_BATCH_SIZE = 100  # Artifacts read and written per transaction
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*?)\s*#*\s*$')
+
+
+def quote_fts(value: str) -> str:
+    """Quote a string as an FTS5 phrase"""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def query_terms(query: str) -> list:
+    """
+    Turn a plain query into quoted FTS5 terms.
+
+    Every word must match; a trailing * makes a word a prefix.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        if not re.search(r'\w', word):
+            continue
+        terms.append(quote_fts(word) + ('*' if prefix else ''))
+    return terms
+
+
+def build_match(text: str, kinds: list = None, country: str = None,
+                pathway_type: str = None) -> str:
+    """
+    Build an FTS5 MATCH expression searching text in title and body.
+
+    Filters are column filters, so they narrow the match inside the
+    index instead of after ranking. A column phrase also matches longer
+    values (employment in self_employment), so country and pathway_type
+    are then checked exactly with exact_filters().
+    """
+    parts = [f"{{title body}} : ({text})"]
+    if kinds:
+        parts.append(f"kind : ({' OR '.join(quote_fts(kind) for kind in kinds)})")
+    if country:
+        parts.append(f"country : {quote_fts(country)}")
+    if pathway_type:
+        parts.append(f"pathway_type : {quote_fts(pathway_type)}")
+    return ' AND '.join(parts)
+
+
+def exact_filters(country: str = None, pathway_type: str = None) -> tuple:
+    """
+    SQL conditions on search_documents d that make the country and
+    pathway_type filters of build_match() exact.
+
+    Returns:
+        (SQL to append to a WHERE clause, parameters)
+    """
+    sql, params = '', []
+    if country:
+        sql += " AND d.country = ? COLLATE NOCASE"
+        params.append(country)
+    if pathway_type:
+        sql += " AND d.pathway_type = ?"
+        params.append(pathway_type)
+    return sql, params
+
+
+def count_matches(conn: sqlite3.Connection, match: str, cap: int, country: str = None,
+                  pathway_type: str = None) -> int:
+    """Count matching documents, stopping at cap"""
+    exact, params = exact_filters(country, pathway_type)
+    if not exact:
+        return conn.execute("""
+            SELECT COUNT(*) FROM (SELECT 1 FROM search_index WHERE search_index MATCH ? LIMIT ?)
+        """, (match, cap)).fetchone()[0]
+    return conn.execute(f"""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM search_index
+            JOIN search_documents d ON d.id = search_index.rowid
+            WHERE search_index MATCH ?{exact}
+            LIMIT ?
+        )
+    """, (match, *params, cap)).fetchone()[0]
+
+
+def search(conn: sqlite3.Connection, query: str, raw: bool = False, kinds: list = None,
+           country: str = None, pathway_type: str = None, limit: int = DEFAULT_LIMIT) -> tuple:
+    """
+    Search the index and return the best-ranked documents.
+
+    Ranking work is bounded by MAX_RANKED_MATCHES: words that are too
+    common are dropped when the query has rarer ones, and a query that
+    still matches too much returns the newest matches unranked.
+
+    Args:
+        query: Plain words, or FTS5 query syntax with raw=True
+
+    Returns:
+        (rows, notes) - notes explain any change to the query
+
+    Raises:
+        ValueError: If the query has no searchable words
+        sqlite3.OperationalError: If a raw query is invalid
+    """
+    filters = {'kinds': kinds, 'country': country, 'pathway_type': pathway_type}
+    exact = {'country': country, 'pathway_type': pathway_type}
+    cap = MAX_RANKED_MATCHES + 1
+    notes = []
+
+    if raw:
+        text = query.strip()
+    else:
+        terms = query_terms(query)
+        if len(terms) > 1:
+            common = [t for t in terms if count_matches(conn, build_match(t, **filters), cap, **exact) == cap]
+            if common and len(common) < len(terms):
+                terms = [t for t in terms if t not in common]
+                notes.append(f"Ignored very common word(s): {' '.join(common)}")
+        text = ' '.join(terms)
+
+    if not text:
+        raise ValueError("Query has no searchable words")
+
+    match = build_match(text, **filters)
+    if count_matches(conn, match, cap, **exact) == cap:
+        order = "search_index.rowid DESC"
+        notes.append(f"More than {MAX_RANKED_MATCHES} matches; showing the newest unranked. "
+                     "Add more specific words or filters.")
+    else:
+        # FTS5 sorts by rank itself, so snippet() only runs for returned rows
+        order = "search_index.rank"
+
+    exact_sql, exact_params = exact_filters(country, pathway_type)
+    rows = conn.execute(f"""
+        SELECT
+            d.kind, d.ref_id, d.para, d.title, d.country, d.pathway_type,
+            snippet(search_index, 1, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet,
+            search_index.rank AS score
+        FROM search_index
+        JOIN search_documents d ON d.id = search_index.rowid
+        WHERE search_index MATCH ?{exact_sql}
+        ORDER BY {order}
+        LIMIT ?
+    """, (match, *exact_params, limit)).fetchall()
+    return rows, notes
+
+
+def split_paragraphs(text: str, title: str) -> list:
+    """
+    Split markdown/plain text into (title, paragraph) pairs.
+
+    Paragraphs are separated by blank lines. Headings are not indexed as
+    paragraphs; they become part of the title of the paragraphs below them.
+    """
+    paragraphs = []
+    section = None
+    for block in re.split(r'\n\s*\n', text):
+        lines = []
+        for line in block.strip().splitlines():
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                section = heading.group(1)
+            else:
+                lines.append(line.strip())
+        paragraph = ' '.join(line for line in lines if line)
+        if paragraph:
+            paragraphs.append((f"{title} › {section}" if section else title, paragraph))
+    return paragraphs
+
+
+def artifact_text_path(artifact: sqlite3.Row) -> Path:
+    """Text file to index for an artifact (extracted text, or the artifact itself)"""
+    path = artifact['extracted_to_path'] or artifact['file_path']
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def index_artifacts(conn: sqlite3.Connection, rebuild: bool = False) -> dict:
+    """
+    Index new or changed artifact text files.
+
+    A file is re-read only if its path, size or mtime differs from the
+    last time it was indexed. Artifacts whose text disappeared are removed.
+
+    Returns:
+        dict with indexed, removed, unchanged and paragraphs counts
+    """
+    artifacts = conn.execute("""
+        SELECT id, title, file_name, file_path, extracted_to_path, country, pathway_type
+        FROM artifacts
+        WHERE extracted_to_path IS NOT NULL OR artifact_type = 'extracted_text'
+    """).fetchall()
+
+    indexed = {} if rebuild else {
+        row['artifact_id']: (row['text_path'], row['file_size_bytes'], row['mtime_ns'])
+        for row in conn.execute("SELECT * FROM search_indexed_artifacts")
+    }
+
+    stats = {'indexed': 0, 'removed': 0, 'unchanged': 0, 'paragraphs': 0}
+    changed = []
+    seen = set()
+    for artifact in artifacts:
+        path = artifact_text_path(artifact)
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        seen.add(artifact['id'])
+        if indexed.get(artifact['id']) == (str(path), stat.st_size, stat.st_mtime_ns):
+            stats['unchanged'] += 1
+            continue
+        changed.append((artifact, path, stat))
+
+    removed = [artifact_id for artifact_id in indexed if artifact_id not in seen]
+    if not (changed or removed or rebuild):
+        return stats
+
+    # Read files outside the write transaction, one batch at a time
+    for start in range(0, max(len(changed), 1), INDEX_BATCH_SIZE):
+        batch = []
+        for artifact, path, stat in changed[start:start + INDEX_BATCH_SIZE]:
+            try:
+                text = read_artifact_text(path)
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️  Skipping artifact {artifact['id']}: {e}", file=sys.stderr)
+                continue
+            title = artifact['title'] or artifact['file_name'] or path.name
+            batch.append((artifact, path, stat, split_paragraphs(text, title)))
+
+        begin_write(conn)
+        try:
+            if start == 0:
+                if rebuild:
+                    conn.execute("DELETE FROM search_documents WHERE kind = 'artifact'")
+                    conn.execute("DELETE FROM search_indexed_artifacts")
+                for artifact_id in removed:
+                    conn.execute("DELETE FROM search_documents WHERE kind = 'artifact' AND ref_id = ?", (artifact_id,))
+                    conn.execute("DELETE FROM search_indexed_artifacts WHERE artifact_id = ?", (artifact_id,))
+
+            for artifact, path, stat, paragraphs in batch:
+                conn.execute("DELETE FROM search_documents WHERE kind = 'artifact' AND ref_id = ?", (artifact['id'],))
+                conn.executemany("""
+                    INSERT INTO search_documents (kind, ref_id, para, title, body, country, pathway_type)
+                    VALUES ('artifact', ?, ?, ?, ?, ?, ?)
+                """, [
+                    (artifact['id'], number, title, paragraph, artifact['country'], artifact['pathway_type'])
+                    for number, (title, paragraph) in enumerate(paragraphs)
+                ])
+                conn.execute("""
+                    INSERT OR REPLACE INTO search_indexed_artifacts (
+                        artifact_id, text_path, file_size_bytes, mtime_ns, paragraphs, indexed_at
+                    ) VALUES (?, ?, ?, ?, ?, datetime('now'))
+                """, (artifact['id'], str(path), stat.st_size, stat.st_mtime_ns, len(paragraphs)))
+                stats['indexed'] += 1
+                stats['paragraphs'] += len(paragraphs)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    stats['removed'] = len(removed)
+    return stats
+
+
+def rebuild_index(conn: sqlite3.Connection) -> dict:
+    """Re-index everything from scratch and merge the FTS segments"""
+    begin_write(conn)
+    try:
+        conn.execute("DELETE FROM search_documents WHERE kind != 'artifact'")
+        for kind, view in (('pathway', 'search_pathway_text'),
+                           ('source', 'search_source_text'),
+                           ('legal', 'search_legal_text')):
+            conn.execute(f"""
+                INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+                SELECT '{kind}', ref_id, title, body, country, pathway_type FROM {view}
+            """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    stats = index_artifacts(conn, rebuild=True)
+
+    begin_write(conn)
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('rebuild')")
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    conn.commit()
+    return stats
+
+
+def print_results(query: str, rows: list) -> None:
+    """Print search results for humans"""
+    print(f"\n🔎 {len(rows)} result(s) for: {query}\n")
+    for number, row in enumerate(rows, 1):
+        ref = f"{row['kind']} #{row['ref_id']}"
+        if row['kind'] == 'artifact':
+            ref += f" ¶{row['para'] + 1}"
+        context = ' · '.join(value for value in (row['country'], row['pathway_type']) if value)
+        print(f"{number}. [{ref}] {row['title']}" + (f" — {context}" if context else ""))
+        print(f"   {' '.join(row['snippet'].split())}")
+        print()
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Full-text search across pathways, sources, legal references and artifacts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument('query', nargs='?', help='Words to search for')
+    parser.add_argument('--kind', action='append', choices=sorted(KINDS),
+                       help='Only search this kind of record (repeatable; default: all)')
+    parser.add_argument('--country', help='Filter by country name')
+    parser.add_argument('--type', help='Filter by pathway type')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                       help=f'Max results (default: {DEFAULT_LIMIT})')
+    parser.add_argument('--raw', action='store_true', help='Treat the query as FTS5 query syntax')
+    parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    parser.add_argument('--index', action='store_true',
+                       help='Index new/changed artifact text before searching')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the whole search index')
+
+    args = parser.parse_args()
+
+    if not args.query and not (args.index or args.rebuild):
+        parser.error("a query is required (or --index / --rebuild)")
+
+    conn = get_db_connection()
+
+    try:
+        if args.rebuild:
+            stats = rebuild_index(conn)
+            documents = conn.execute("SELECT COUNT(*) FROM search_documents").fetchone()[0]
+            print(f"✅ Search index rebuilt", file=sys.stderr)
+            print(f"   Documents: {documents}", file=sys.stderr)
+            print(f"   Artifacts: {stats['indexed']} ({stats['paragraphs']} paragraphs)", file=sys.stderr)
+        elif args.index:
+            stats = index_artifacts(conn)
+            print(f"✅ Artifact text indexed", file=sys.stderr)
+            print(f"   Indexed: {stats['indexed']} ({stats['paragraphs']} paragraphs)", file=sys.stderr)
+            print(f"   Unchanged: {stats['unchanged']}", file=sys.stderr)
+            print(f"   Removed: {stats['removed']}", file=sys.stderr)
+    except sqlite3.Error as e:
+        print(f"❌ Error indexing: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.query:
+        return
+
+    try:
+        rows, notes = search(
+            conn, args.query, raw=args.raw,
+            kinds=[KINDS[kind] for kind in args.kind] if args.kind else None,
+            country=args.country, pathway_type=args.type, limit=args.limit
+        )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Invalid search query: {e}", file=sys.stderr)
+        if not args.raw:
+            print("   Try quoting special characters, or see --raw", file=sys.stderr)
+        sys.exit(1)
+
+    for note in notes:
+        print(f"⚠️  {note}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps([dict(row) for row in rows], indent=2, ensure_ascii=False))
+    else:
+        print_results(args.query, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Markdown Templates
+
+A small line-based template language for the vault markdown generated by
+cli/export.py. Templates live in config/templates/ and are compiled to a
+Python function the first time they are used in a process.
+
+Syntax:
+    - The first line names the arguments of the render function:
+        % args: pathway, sources, flag
+    - Any other line starting with "%" is a Python statement:
+        % if pathway.official_name:
+        % for idx, source in enumerate(sources, 1):
+        % months = pathway.initial_duration_months
+        % else:
+        % endif / % endfor  (closes the block)
+    - Every other line is output as an f-string, so {expr} and {expr:,}
+      are substituted and literal braces are written {{ and }}.
+
+The rendered lines are joined with newlines (no trailing newline).
+
+Usage (from any script in cli/):
+    from templates import get_template
+
+    render = get_template('pathway.md')
+    markdown = render(pathway=pathway, sources=sources)
+"""
+
+from pathlib import Path
+
+from db_common import PROJECT_ROOT
+
+TEMPLATES_DIR = PROJECT_ROOT / "config" / "templates"
+
+_compiled = {}
+
+
+class TemplateError(Exception):
+    """A template could not be compiled"""
+
+
+def compile_template(text: str, name: str = '<template>'):
+    """
+    Compile template text into a render function.
+
+    Returns:
+        render(*args) -> str
+    """
+    lines = text.splitlines()
+    if not lines or not lines[0].startswith('% args:'):
+        raise TemplateError(f"{name}: first line must be '% args: name, ...'")
+    args = lines[0].split(':', 1)[1].strip()
+
+    code = [f"def render({args}):", "    _out = []", "    _append = _out.append"]
+    depth = 1
+    text_lines = []
+
+    def flush_text():
+        # Consecutive output lines become one f-string (one append)
+        if text_lines:
+            literal = " '\\n' ".join(f"f{line!r}" for line in text_lines)
+            code.append(f"{'    ' * depth}_append({literal})")
+            text_lines.clear()
+
+    for lineno, line in enumerate(lines[1:], 2):
+        if not line.startswith('%'):
+            text_lines.append(line)
+            continue
+
+        flush_text()
+        indent = "    " * depth
+
+        statement = line[1:].strip()
+        keyword = statement.split(maxsplit=1)[0].rstrip(':') if statement else ''
+
+        if keyword in ('endif', 'endfor', 'endwhile'):
+            depth -= 1
+        elif keyword in ('elif', 'else'):
+            code.append(f"{'    ' * (depth - 1)}{statement}")
+        elif statement.endswith(':'):
+            code.append(f"{indent}{statement}")
+            depth += 1
+        elif statement:
+            code.append(f"{indent}{statement}")
+
+        if depth < 1:
+            raise TemplateError(f"{name}:{lineno}: '{statement}' closes a block that is not open")
+
+    flush_text()
+    if depth != 1:
+        raise TemplateError(f"{name}: {depth - 1} block(s) not closed")
+
+    code.append("    return '\\n'.join(_out)")
+
+    try:
+        compiled = compile("\n".join(code), name, 'exec')
+    except SyntaxError as e:
+        raise TemplateError(f"{name}: {e.msg}") from e
+
+    namespace = {}
+    exec(compiled, namespace)
+    return namespace['render']
+
+
+def get_template(name: str, templates_dir: Path = TEMPLATES_DIR):
+    """Get the compiled render function for a template file (compiled once per process)"""
+    path = templates_dir / name
+    render = _compiled.get(path)
+    if render is None:
+        render = compile_template(path.read_text(encoding='utf-8'), str(path))
+        _compiled[path] = render
+    return render
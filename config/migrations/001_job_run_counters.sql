@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migration 1.1: Sharded job_run statistics
+-- ============================================================================
+-- Every logged action used to bump a counter on its job_run row, so all
+-- writers of a job queued up on one row. Writers now add to one of a few
+-- shard rows per job; the shards are folded back into job_run when the job
+-- finishes (cli/job_counters.py). Read totals through job_run_stats.
+
+CREATE TABLE IF NOT EXISTS job_run_counters (
+  job_run_id INTEGER NOT NULL REFERENCES job_run(id),
+  shard INTEGER NOT NULL,
+
+  pages_visited INTEGER NOT NULL DEFAULT 0,
+  sources_found INTEGER NOT NULL DEFAULT 0,
+  artifacts_downloaded INTEGER NOT NULL DEFAULT 0,
+  knowledge_created INTEGER NOT NULL DEFAULT 0,
+
+  PRIMARY KEY (job_run_id, shard)
+) WITHOUT ROWID;
+
+-- job_run plus any shards not yet rolled up
+CREATE VIEW IF NOT EXISTS job_run_stats AS
+SELECT
+  j.id AS job_run_id,
+  j.pages_visited + COALESCE(SUM(c.pages_visited), 0) AS pages_visited,
+  j.sources_found + COALESCE(SUM(c.sources_found), 0) AS sources_found,
+  j.artifacts_downloaded + COALESCE(SUM(c.artifacts_downloaded), 0) AS artifacts_downloaded,
+  j.knowledge_created + COALESCE(SUM(c.knowledge_created), 0) AS knowledge_created
+FROM job_run j
+LEFT JOIN job_run_counters c ON c.job_run_id = j.id
+GROUP BY j.id;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.1', 'Sharded job_run statistics (job_run_counters, job_run_stats view)');
@@ -0,0 +1,207 @@
+-- ============================================================================
+-- Migration 1.2: Full-text search (cli/search.py)
+-- ============================================================================
+-- One FTS5 index over pathways, sources, legal references and the
+-- paragraphs of extracted artifact text. search_documents holds one row
+-- per indexed record (per paragraph for artifacts) and is the external
+-- content table of search_index.
+--
+-- Pathways, sources and legal references are kept in sync by triggers.
+-- Artifact text lives in files, so it is indexed incrementally by
+-- `python cli/search.py --index` (tracked in search_indexed_artifacts).
+
+CREATE TABLE IF NOT EXISTS search_documents (
+  id INTEGER PRIMARY KEY,
+
+  -- What this row indexes
+  kind TEXT NOT NULL CHECK(kind IN ('pathway', 'source', 'legal', 'artifact')),
+  ref_id INTEGER NOT NULL,  -- ID in the kind's table
+  para INTEGER NOT NULL DEFAULT 0,  -- Paragraph number (artifacts only)
+
+  -- Indexed text
+  title TEXT,
+  body TEXT,
+
+  -- Filters
+  country TEXT,
+  pathway_type TEXT,
+
+  UNIQUE(kind, ref_id, para)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+  title, body, kind, country, pathway_type,
+  content = 'search_documents',
+  content_rowid = 'id',
+  tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+-- Rank by title and body only; kind/country/pathway_type are filter columns
+INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 1.0, 0.0, 0.0, 0.0)');
+
+-- Keep the FTS index in sync with search_documents
+CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents
+BEGIN
+  INSERT INTO search_index (rowid, title, body, kind, country, pathway_type)
+  VALUES (NEW.id, NEW.title, NEW.body, NEW.kind, NEW.country, NEW.pathway_type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents
+BEGIN
+  INSERT INTO search_index (search_index, rowid, title, body, kind, country, pathway_type)
+  VALUES ('delete', OLD.id, OLD.title, OLD.body, OLD.kind, OLD.country, OLD.pathway_type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents
+BEGIN
+  INSERT INTO search_index (search_index, rowid, title, body, kind, country, pathway_type)
+  VALUES ('delete', OLD.id, OLD.title, OLD.body, OLD.kind, OLD.country, OLD.pathway_type);
+  INSERT INTO search_index (rowid, title, body, kind, country, pathway_type)
+  VALUES (NEW.id, NEW.title, NEW.body, NEW.kind, NEW.country, NEW.pathway_type);
+END;
+
+-- What each record contributes to the index (one definition per kind)
+CREATE VIEW IF NOT EXISTS search_pathway_text AS
+SELECT
+  p.id AS ref_id,
+  p.name || COALESCE(' (' || p.official_name || ')', '') AS title,
+  COALESCE(p.description, '') || char(10) ||
+  COALESCE(p.legal_basis, '') || char(10) ||
+  COALESCE(p.education_requirement, '') || char(10) ||
+  COALESCE(p.language_requirement, '') || char(10) ||
+  COALESCE(p.age_restrictions, '') || char(10) ||
+  COALESCE(p.required_documents, '') || char(10) ||
+  COALESCE(p.application_process, '') || char(10) ||
+  COALESCE(p.path_to_permanent_residency, '') || char(10) ||
+  COALESCE(p.path_to_citizenship, '') || char(10) ||
+  COALESCE(p.work_rights, '') || char(10) ||
+  COALESCE(p.family_inclusion, '') || char(10) ||
+  COALESCE(p.travel_rights, '') || char(10) ||
+  COALESCE(p.restrictions, '') || char(10) ||
+  COALESCE(p.tax_implications, '') || char(10) ||
+  COALESCE(p.policy_changes_2025, '') AS body,
+  c.name AS country,
+  p.pathway_type
+FROM residency_pathways p
+JOIN countries c ON c.id = p.country_id;
+
+CREATE VIEW IF NOT EXISTS search_source_text AS
+SELECT
+  s.id AS ref_id,
+  s.title,
+  COALESCE(s.description, '') || char(10) || COALESCE(s.notes, '') || char(10) || COALESCE(s.url, '') AS body,
+  c.name AS country,
+  s.pathway_type
+FROM sources s
+LEFT JOIN countries c ON c.id = s.country_id;
+
+CREATE VIEW IF NOT EXISTS search_legal_text AS
+SELECT
+  l.id AS ref_id,
+  l.reference_number || ' - ' || l.title AS title,
+  COALESCE(l.summary, '') AS body,
+  c.name AS country,
+  NULL AS pathway_type
+FROM legal_references l
+JOIN countries c ON c.id = l.country_id;
+
+-- Pathways
+CREATE TRIGGER IF NOT EXISTS search_pathways_ai AFTER INSERT ON residency_pathways
+BEGIN
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'pathway', ref_id, title, body, country, pathway_type
+  FROM search_pathway_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_pathways_au AFTER UPDATE OF
+  country_id, pathway_type, name, official_name, description, legal_basis,
+  education_requirement, language_requirement, age_restrictions, required_documents,
+  application_process, path_to_permanent_residency, path_to_citizenship, work_rights,
+  family_inclusion, travel_rights, restrictions, tax_implications, policy_changes_2025
+ON residency_pathways
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'pathway' AND ref_id = OLD.id;
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'pathway', ref_id, title, body, country, pathway_type
+  FROM search_pathway_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_pathways_ad AFTER DELETE ON residency_pathways
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'pathway' AND ref_id = OLD.id;
+END;
+
+-- Sources
+CREATE TRIGGER IF NOT EXISTS search_sources_ai AFTER INSERT ON sources
+BEGIN
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'source', ref_id, title, body, country, pathway_type
+  FROM search_source_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_sources_au AFTER UPDATE OF
+  url, title, description, notes, country_id, pathway_type
+ON sources
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'source' AND ref_id = OLD.id;
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'source', ref_id, title, body, country, pathway_type
+  FROM search_source_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_sources_ad AFTER DELETE ON sources
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'source' AND ref_id = OLD.id;
+END;
+
+-- Legal references
+CREATE TRIGGER IF NOT EXISTS search_legal_ai AFTER INSERT ON legal_references
+BEGIN
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'legal', ref_id, title, body, country, pathway_type
+  FROM search_legal_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_legal_au AFTER UPDATE OF
+  country_id, reference_number, title, summary
+ON legal_references
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'legal' AND ref_id = OLD.id;
+  INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+  SELECT 'legal', ref_id, title, body, country, pathway_type
+  FROM search_legal_text WHERE ref_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_legal_ad AFTER DELETE ON legal_references
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'legal' AND ref_id = OLD.id;
+END;
+
+-- Artifact text files already indexed (for incremental re-indexing)
+CREATE TABLE IF NOT EXISTS search_indexed_artifacts (
+  artifact_id INTEGER PRIMARY KEY REFERENCES artifacts(id),
+  text_path TEXT NOT NULL,
+  file_size_bytes INTEGER,
+  mtime_ns INTEGER,
+  paragraphs INTEGER,
+  indexed_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS search_artifacts_ad AFTER DELETE ON artifacts
+BEGIN
+  DELETE FROM search_documents WHERE kind = 'artifact' AND ref_id = OLD.id;
+  DELETE FROM search_indexed_artifacts WHERE artifact_id = OLD.id;
+END;
+
+-- Index what already exists
+INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+SELECT 'pathway', ref_id, title, body, country, pathway_type FROM search_pathway_text;
+
+INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+SELECT 'source', ref_id, title, body, country, pathway_type FROM search_source_text;
+
+INSERT INTO search_documents (kind, ref_id, title, body, country, pathway_type)
+SELECT 'legal', ref_id, title, body, country, pathway_type FROM search_legal_text;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.2', 'Full-text search (search_documents, search_index FTS5)');
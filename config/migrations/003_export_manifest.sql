@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migration 1.3: Incremental vault export (cli/export.py)
+-- ============================================================================
+-- One row per markdown file the exporter has written to the vault. A file
+-- is only re-rendered when the hash of its inputs (pathway/source rows and
+-- timestamps) changes, and only rewritten when the rendered bytes differ.
+
+CREATE TABLE IF NOT EXISTS export_manifest (
+  path TEXT PRIMARY KEY,  -- Absolute path of the exported file
+
+  -- What the file was rendered from
+  kind TEXT NOT NULL CHECK(kind IN ('pathway', 'country_index')),
+  ref_id INTEGER NOT NULL,  -- Pathway ID or country ID
+  input_key TEXT NOT NULL,  -- SHA256 of the rendered inputs
+
+  -- The file as written (to notice hand edits and deleted files)
+  content_sha256 TEXT NOT NULL,
+  file_size_bytes INTEGER,
+  mtime_ns INTEGER,
+
+  exported_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.3', 'Incremental vault export (export_manifest)');
@@ -0,0 +1,89 @@
+-- ============================================================================
+-- Migration 1.4: Change log for export watch (cli/export.py watch)
+-- ============================================================================
+-- Triggers record which pathway notes and country READMEs a write affects,
+-- so a resident exporter can re-render just those. pathway_id is NULL when
+-- only the country README is affected. Rows are deleted once exported
+-- (by watch, or by a successful all-pathways export).
+
+CREATE TABLE IF NOT EXISTS export_changes (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  country_id INTEGER NOT NULL,
+  pathway_id INTEGER,
+  changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Pathways
+CREATE TRIGGER IF NOT EXISTS export_pathways_ai AFTER INSERT ON residency_pathways
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id) VALUES (NEW.country_id, NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_pathways_au AFTER UPDATE ON residency_pathways
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id) VALUES (NEW.country_id, NEW.id);
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT OLD.country_id, NULL WHERE OLD.country_id IS NOT NEW.country_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_pathways_ad AFTER DELETE ON residency_pathways
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id) VALUES (OLD.country_id, NULL);
+END;
+
+-- Pathway sources
+CREATE TRIGGER IF NOT EXISTS export_pathway_sources_ai AFTER INSERT ON pathway_sources
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT country_id, id FROM residency_pathways WHERE id = NEW.pathway_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_pathway_sources_au AFTER UPDATE ON pathway_sources
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT country_id, id FROM residency_pathways WHERE id IN (OLD.pathway_id, NEW.pathway_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_pathway_sources_ad AFTER DELETE ON pathway_sources
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT country_id, id FROM residency_pathways WHERE id = OLD.pathway_id;
+END;
+
+-- Sources (country READMEs list a country's sources; pathway notes their linked sources)
+CREATE TRIGGER IF NOT EXISTS export_sources_ai AFTER INSERT ON sources
+WHEN NEW.country_id IS NOT NULL
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id) VALUES (NEW.country_id, NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_sources_au AFTER UPDATE ON sources
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT p.country_id, p.id
+  FROM pathway_sources ps
+  JOIN residency_pathways p ON p.id = ps.pathway_id
+  WHERE ps.source_id = NEW.id;
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT id, NULL FROM countries WHERE id IN (OLD.country_id, NEW.country_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS export_sources_ad AFTER DELETE ON sources
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT p.country_id, p.id
+  FROM pathway_sources ps
+  JOIN residency_pathways p ON p.id = ps.pathway_id
+  WHERE ps.source_id = OLD.id;
+  INSERT INTO export_changes (country_id, pathway_id)
+  SELECT id, NULL FROM countries WHERE id = OLD.country_id;
+END;
+
+-- Countries
+CREATE TRIGGER IF NOT EXISTS export_countries_au AFTER UPDATE ON countries
+BEGIN
+  INSERT INTO export_changes (country_id, pathway_id) VALUES (NEW.id, NULL);
+END;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.4', 'Change log for export watch (export_changes)');
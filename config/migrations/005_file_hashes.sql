@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migration 1.5: Persistent file hash cache (cli/file_hash.py)
+-- ============================================================================
+-- add_pathway.py, audit_log_page.py and artifact_register.py hash the same
+-- artifact files in one workflow. The SHA256 of a file is cached per inode
+-- and reused while the file keeps the recorded size and mtime; --verify
+-- forces a re-hash.
+
+CREATE TABLE IF NOT EXISTS file_hashes (
+  device INTEGER NOT NULL,  -- st_dev
+  inode INTEGER NOT NULL,  -- st_ino
+
+  -- The file as hashed; a different size or mtime means re-hash
+  file_size_bytes INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  sha256 TEXT NOT NULL,
+
+  path TEXT,  -- Where the file was when hashed (informational)
+  hashed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+
+  PRIMARY KEY (device, inode)
+) WITHOUT ROWID;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.5', 'Persistent file hash cache (file_hashes)');
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migration 1.6: Content-addressed artifact store (cli/blob_store.py)
+-- ============================================================================
+-- Artifact bytes are kept once under data/blobs/<sha256[:2]>/<sha256[2:]>.
+-- Every path an artifact was downloaded or registered under is an alias:
+-- a hard link (or reflink) to the blob, recorded here. artifacts.file_path
+-- stays the first path it was registered under.
+
+CREATE TABLE IF NOT EXISTS artifact_paths (
+  path TEXT PRIMARY KEY,  -- Relative to project root
+  artifact_id INTEGER NOT NULL REFERENCES artifacts(id),
+
+  -- How the path shares the blob's bytes; NULL = separate copy
+  link_type TEXT CHECK(link_type IN ('hardlink', 'reflink')),
+
+  added_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_artifact_paths_artifact ON artifact_paths(artifact_id);
+
+-- Artifacts registered before the store: their own path, not yet linked
+INSERT OR IGNORE INTO artifact_paths (path, artifact_id, link_type)
+SELECT file_path, id, NULL FROM artifacts;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.6', 'Content-addressed artifact store (artifact_paths)');
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- Migration 1.7: Artifact extraction claims (cli/artifact_extract.py)
+-- ============================================================================
+-- artifact_extract.py claims pending artifacts in batches before converting
+-- them on its process pool, so concurrent runs never extract the same file.
+-- A claim is released when its batch is written. Claims held by a process
+-- that no longer exists (a crashed run) are released by the next run, and
+-- its artifacts are extracted again.
+
+CREATE TABLE IF NOT EXISTS artifact_extraction_claims (
+  artifact_id INTEGER PRIMARY KEY REFERENCES artifacts(id),
+  pid INTEGER NOT NULL,  -- Process extracting the artifact
+  claimed_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_extraction_claims_pid ON artifact_extraction_claims(pid);
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.7', 'Artifact extraction claims (artifact_extraction_claims)');
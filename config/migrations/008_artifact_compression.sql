@@ -0,0 +1,13 @@
+-- ============================================================================
+-- Migration 1.8: Compressed text artifacts (cli/blob_store.py)
+-- ============================================================================
+-- HTML and extracted text artifacts are stored gzip- or zstd-compressed
+-- (file_path ends in .gz / .zst). file_size_bytes and sha256 stay those of
+-- the uncompressed content, so sizes and deduplication do not depend on the
+-- compressor; the bytes on disk are recorded separately.
+
+ALTER TABLE artifacts ADD COLUMN compression TEXT CHECK(compression IN ('gzip', 'zstd'));
+ALTER TABLE artifacts ADD COLUMN compressed_size_bytes INTEGER;
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.8', 'Compressed text artifacts (artifacts.compression, compressed_size_bytes)');
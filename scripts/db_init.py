@@ -20,6 +20,10 @@ from datetime import datetime
 
 # Project root
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+
+from db_common import apply_migrations, list_migrations
+
 SCHEMA_PATH = PROJECT_ROOT / "config" / "schema.sql"
 DEFAULT_DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
 
@@ -60,6 +64,7 @@ def init_database(db_path: Path, force: bool = False) -> bool:
     # Create database and execute schema
     print(f"📦 Creating database at {db_path}")
     conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")  # Persistent; CLI tools rely on it
     cursor = conn.cursor()
 
     try:
@@ -74,6 +79,12 @@ def init_database(db_path: Path, force: bool = False) -> bool:
         conn.commit()
         print("✅ Seed data inserted successfully")
 
+        # Bring the new database up to the latest migration
+        if list_migrations():
+            print("🔧 Applying migrations...")
+            applied = apply_migrations(conn)
+            print(f"✅ {len(applied)} migration(s) applied")
+
         # Verify
         verify_database(cursor)
 
@@ -131,8 +142,8 @@ def verify_database(cursor: sqlite3.Cursor):
         'countries', 'residency_pathways', 'sources', 'documents', 'pathway_sources',
         'legal_references', 'scraping_jobs', 'companies',
         'job_run', 'tool_call', 'scraper_audit_trail',
-        'artifacts', 'knowledge_artifacts',
-        'schema_version'
+        'artifacts', 'knowledge_artifacts', 'job_run_counters', 'export_manifest', 'export_changes',
+        'file_hashes', 'artifact_paths', 'artifact_extraction_claims', 'schema_version'
     ]
 
     print(f"\n📊 Verification:")
@@ -150,7 +161,7 @@ def verify_database(cursor: sqlite3.Cursor):
     print(f"\n   Countries: {count} / 15")
 
     # Check schema version
-    cursor.execute("SELECT version, description FROM schema_version")
+    cursor.execute("SELECT version, description FROM schema_version ORDER BY rowid DESC LIMIT 1")
     version, desc = cursor.fetchone()
     print(f"   Schema version: {version}")
     print(f"   Description: {desc}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Export Rendering Throughput
+
+Renders the same pathways with the legacy list-of-f-strings renderer
+(sqlite3.Row input) and the compiled pathway template (named tuple input)
+and prints pathways/sec for each.
+
+Usage:
+    python tests/bench_export_render.py
+    python tests/bench_export_render.py --pathways-per-country 12 --seconds 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import export  # noqa: E402
+from export_reference import build_fixture, load_legacy_snapshot, legacy_pathway_markdown  # noqa: E402
+
+
+def throughput(render, items: list, seconds: float) -> float:
+    """Render items repeatedly for about `seconds`; return renders per second"""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for pathway, sources in items:
+            render(pathway, sources)
+        count += len(items)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark pathway markdown rendering',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--pathways-per-country', type=int, default=12, help='Fixture size (max 12)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Time per renderer')
+    args = parser.parse_args()
+
+    conn = build_fixture(pathways_per_country=args.pathways_per_country)
+    countries = [row[0] for row in conn.execute("SELECT name FROM countries ORDER BY id")]
+
+    legacy_items = []
+    template_items = []
+    for country in countries:
+        legacy = load_legacy_snapshot(conn, country)
+        legacy_items += [(p, legacy['pathway_sources'][p['id']]) for p in legacy['pathways']]
+        snapshot = export.load_country_snapshot(conn, country)
+        template_items += [(p, snapshot['pathway_sources'][p.id]) for p in snapshot['pathways']]
+
+    # Compile outside the timed loop (once per process, like an export run)
+    export.generate_pathway_markdown(*template_items[0])
+
+    print(f"📊 Rendering {len(template_items)} pathways for {args.seconds:.1f}s each\n")
+    legacy_rate = throughput(legacy_pathway_markdown, legacy_items, args.seconds)
+    print(f"   Legacy f-string renderer: {legacy_rate:10,.0f} pathways/sec")
+    template_rate = throughput(export.generate_pathway_markdown, template_items, args.seconds)
+    print(f"   Compiled template:        {template_rate:10,.0f} pathways/sec")
+    print(f"\n   Speedup: {template_rate / legacy_rate:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
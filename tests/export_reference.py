@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Reference Data for Export Rendering Tests
+
+- build_fixture(): fills an in-memory database with pathways and sources
+  covering every optional field of the vault markdown
+- legacy_*(): the list-of-f-strings renderers that cli/export.py used
+  before config/templates/, kept to check the templates byte for byte
+  and as the baseline for bench_export_render.py
+
+The legacy renderers print the 🇮🇹 flag for every country.
+"""
+
+import random
+import sqlite3
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCHEMA_PATH = PROJECT_ROOT / "config" / "schema.sql"
+
+PATHWAY_TYPES = ['digital_nomad', 'employment', 'eu_blue_card', 'startup', 'self_employment',
+                 'investment', 'golden_visa', 'student', 'retirement', 'family_reunification',
+                 'citizenship_by_descent', 'other']
+SOURCE_TYPES = ['official_government', 'embassy', 'legal_database', 'licensed_lawyer',
+                'news', 'community', 'other']
+OPTIONAL_TEXT = ['official_name', 'description', 'legal_basis', 'education_requirement',
+                 'language_requirement', 'age_restrictions', 'required_documents',
+                 'application_process', 'path_to_permanent_residency', 'path_to_citizenship',
+                 'work_rights', 'family_inclusion', 'travel_rights', 'restrictions',
+                 'tax_implications', 'policy_changes_2025', 'last_verified_date']
+
+
+def build_fixture(pathways_per_country: int = 6, sources: int = 200, seed: int = 1) -> sqlite3.Connection:
+    """
+    Create an in-memory database with the schema, the seeded countries and
+    random pathways/sources. Each optional field is empty in some pathways
+    and filled (sometimes with several lines) in others.
+    """
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA_PATH.read_text())
+
+    countries = [
+        ('Italy', 'IT', 1, 1, 'Rome', 'Italian', 'EUR'),
+        ('Germany', 'DE', 1, 1, 'Berlin', 'German', 'EUR'),
+        ('Norway', 'NO', 0, 1, 'Oslo', 'Norwegian', 'NOK'),
+        ('Czech Republic', 'CZ', 1, 1, 'Prague', 'Czech', 'CZK'),
+    ]
+    conn.executemany("""
+        INSERT INTO countries (name, code, is_eu_member, is_schengen, capital, official_language, currency)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, countries)
+
+    rnd = random.Random(seed)
+    stamp = lambda: f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 12:{rnd.randint(0, 59):02d}:00"
+    text = lambda field: rnd.choice([f"{field} details", f"{field}: line one\nline two \"quoted\" {{braces}}"])
+
+    pathway_ids = []
+    for country_id in range(1, len(countries) + 1):
+        for pathway_type in rnd.sample(PATHWAY_TYPES, pathways_per_country):
+            values = {
+                'country_id': country_id,
+                'pathway_type': pathway_type,
+                'name': f"{countries[country_id - 1][0]} {pathway_type.replace('_', ' ').title()} / Permit",
+                'min_income_eur': rnd.choice([None, 0, 28000, 1234567]),
+                'min_investment_eur': rnd.choice([None, 250000]),
+                'processing_time_days': rnd.choice([None, 30, 90]),
+                'application_fee_eur': rnd.choice([None, 116, 99.5]),
+                'initial_duration_months': rnd.choice([None, 6, 12, 24, 60]),
+                'renewable': rnd.choice([0, 1]),
+                'max_renewals': rnd.choice([None, 2]),
+                'total_max_duration_months': rnd.choice([None, 120]),
+                'min_years_to_citizenship': rnd.choice([None, 10]),
+                'is_active': rnd.choice([0, 1, 1]),
+                'created_at': stamp(),
+                'updated_at': stamp(),
+            }
+            for field in OPTIONAL_TEXT:
+                values[field] = text(field) if rnd.random() < 0.6 else None
+
+            cursor = conn.execute(
+                f"INSERT INTO residency_pathways ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+                list(values.values())
+            )
+            pathway_ids.append(cursor.lastrowid)
+
+    source_ids = []
+    for n in range(sources):
+        cursor = conn.execute("""
+            INSERT INTO sources (url, title, source_type, credibility, country_id,
+                                 last_verified_date, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (f"https://example.org/{n}", f"Source {n}", rnd.choice(SOURCE_TYPES), rnd.randint(1, 5),
+              rnd.randint(1, len(countries)), rnd.choice([None, '2025-06-01']), stamp(), stamp()))
+        source_ids.append(cursor.lastrowid)
+
+    for pathway_id in pathway_ids:
+        for source_id in rnd.sample(source_ids, rnd.randint(0, 6)):
+            conn.execute("""
+                INSERT INTO pathway_sources (pathway_id, source_id, relevance_score, excerpt, added_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (pathway_id, source_id, rnd.choice([None, 3, 5]), rnd.choice([None, 'Key quote']), stamp()))
+
+    conn.commit()
+    return conn
+
+
+def load_legacy_snapshot(conn: sqlite3.Connection, country: str) -> dict:
+    """The rows the legacy renderers took (sqlite3.Row, as cli/export.py loaded them)"""
+    conn.row_factory = sqlite3.Row
+    try:
+        country_info = conn.execute("SELECT * FROM countries WHERE name = ?", (country,)).fetchone()
+        pathways = conn.execute("""
+            SELECT p.*, c.name as country_name
+            FROM residency_pathways p
+            JOIN countries c ON p.country_id = c.id
+            WHERE p.country_id = ?
+            ORDER BY p.pathway_type
+        """, (country_info['id'],)).fetchall()
+        country_sources = conn.execute("""
+            SELECT DISTINCT s.*
+            FROM sources s
+            WHERE s.country_id = ?
+            ORDER BY s.credibility DESC, s.title
+        """, (country_info['id'],)).fetchall()
+        pathway_sources = {}
+        for pathway in pathways:
+            pathway_sources[pathway['id']] = conn.execute("""
+                SELECT
+                    ps.pathway_id, s.id, s.url, s.title, s.source_type, s.credibility,
+                    ps.excerpt, ps.relevance_score, ps.added_at, s.updated_at
+                FROM pathway_sources ps
+                JOIN sources s ON ps.source_id = s.id
+                WHERE ps.pathway_id = ?
+                ORDER BY s.credibility DESC, ps.relevance_score DESC
+            """, (pathway['id'],)).fetchall()
+    finally:
+        conn.row_factory = None
+
+    return {
+        'country_info': country_info,
+        'pathways': pathways,
+        'pathway_sources': pathway_sources,
+        'country_sources': country_sources,
+    }
+
+
+def legacy_latest(*timestamps) -> str:
+    return max((ts for ts in timestamps if ts), default='N/A')
+
+
+def legacy_pathway_last_updated(pathway: sqlite3.Row, sources: list) -> str:
+    return legacy_latest(
+        pathway['updated_at'],
+        *(source['added_at'] for source in sources),
+        *(source['updated_at'] for source in sources)
+    )
+
+
+def legacy_country_last_updated(country_info: sqlite3.Row, pathways: list, country_sources: list) -> str:
+    return legacy_latest(
+        country_info['updated_at'],
+        *(pathway['updated_at'] for pathway in pathways),
+        *(source['updated_at'] for source in country_sources)
+    )
+
+
+def legacy_pathway_filename(pathway: sqlite3.Row) -> str:
+    return f"{pathway['name'].replace('/', '_').replace(' ', '_')}.md"
+
+
+def legacy_pathway_markdown(pathway: sqlite3.Row, sources: list) -> str:
+    """
+    Generate Obsidian-compatible markdown for a pathway.
+
+    DATABASE IS SOURCE OF TRUTH - this is generated from DB data.
+    """
+
+    # Build markdown
+    md = []
+
+    # Header
+    md.append(f"# {pathway['name']}")
+    md.append("")
+    md.append(f"**Country**: 🇮🇹 {pathway['country_name']}")
+    md.append(f"**Type**: {pathway['pathway_type']}")
+    md.append(f"**Status**: {'✅ Active' if pathway['is_active'] else '❌ Inactive'}")
+    if pathway['official_name']:
+        md.append(f"**Official Name**: {pathway['official_name']}")
+    md.append(f"**Last Updated**: {legacy_pathway_last_updated(pathway, sources)[:10]}")
+    md.append(f"**Generated from Database**: Pathway ID {pathway['id']}")
+    md.append("")
+    md.append("---")
+    md.append("")
+
+    # Overview
+    md.append("## Overview")
+    md.append("")
+    if pathway['description']:
+        md.append(pathway['description'])
+    md.append("")
+
+    if pathway['legal_basis']:
+        md.append(f"**Legal Basis**: {pathway['legal_basis']}")
+        md.append("")
+
+    md.append("---")
+    md.append("")
+
+    # Requirements
+    md.append("## Requirements")
+    md.append("")
+
+    if pathway['min_income_eur']:
+        md.append(f"### Financial")
+        md.append(f"- **Minimum Income**: €{pathway['min_income_eur']:,}/year")
+        md.append("")
+
+    if pathway['min_investment_eur']:
+        md.append(f"### Investment")
+        md.append(f"- **Minimum Investment**: €{pathway['min_investment_eur']:,}")
+        md.append("")
+
+    if pathway['education_requirement']:
+        md.append(f"### Education")
+        md.append(f"- {pathway['education_requirement']}")
+        md.append("")
+
+    if pathway['language_requirement']:
+        md.append(f"### Language")
+        md.append(f"- {pathway['language_requirement']}")
+        md.append("")
+
+    if pathway['age_restrictions']:
+        md.append(f"### Age")
+        md.append(f"- {pathway['age_restrictions']}")
+        md.append("")
+
+    if pathway['required_documents']:
+        md.append(f"### Required Documents")
+        md.append(f"{pathway['required_documents']}")
+        md.append("")
+
+    md.append("---")
+    md.append("")
+
+    # Application Process
+    if pathway['application_process']:
+        md.append("## Application Process")
+        md.append("")
+        md.append(pathway['application_process'])
+        md.append("")
+
+        if pathway['processing_time_days']:
+            md.append(f"**Processing Time**: {pathway['processing_time_days']} days")
+            md.append("")
+
+        if pathway['application_fee_eur']:
+            md.append(f"**Application Fee**: €{pathway['application_fee_eur']}")
+            md.append("")
+
+        md.append("---")
+        md.append("")
+
+    # Duration & Renewal
+    md.append("## Duration & Renewal")
+    md.append("")
+
+    if pathway['initial_duration_months']:
+        md.append(f"- **Initial Duration**: {pathway['initial_duration_months']} months ({pathway['initial_duration_months']//12} year{'s' if pathway['initial_duration_months']//12 != 1 else ''})")
+
+    if pathway['renewable']:
+        md.append(f"- **Renewable**: Yes")
+        if pathway['max_renewals']:
+            md.append(f"- **Max Renewals**: {pathway['max_renewals']}")
+        if pathway['total_max_duration_months']:
+            md.append(f"- **Total Max Duration**: {pathway['total_max_duration_months']} months")
+    else:
+        md.append(f"- **Renewable**: No")
+
+    md.append("")
+
+    if pathway['path_to_permanent_residency']:
+        md.append(f"**Path to Permanent Residency**: {pathway['path_to_permanent_residency']}")
+        md.append("")
+
+    if pathway['path_to_citizenship']:
+        md.append(f"**Path to Citizenship**: {pathway['path_to_citizenship']}")
+        if pathway['min_years_to_citizenship']:
+            md.append(f"- Typically {pathway['min_years_to_citizenship']} years")
+        md.append("")
+
+    md.append("---")
+    md.append("")
+
+    # Rights & Restrictions
+    md.append("## Rights & Restrictions")
+    md.append("")
+
+    if pathway['work_rights']:
+        md.append(f"### Work Rights")
+        md.append(f"{pathway['work_rights']}")
+        md.append("")
+
+    if pathway['family_inclusion']:
+        md.append(f"### Family")
+        md.append(f"{pathway['family_inclusion']}")
+        md.append("")
+
+    if pathway['travel_rights']:
+        md.append(f"### Travel")
+        md.append(f"{pathway['travel_rights']}")
+        md.append("")
+
+    if pathway['restrictions']:
+        md.append(f"### Restrictions")
+        md.append(f"{pathway['restrictions']}")
+        md.append("")
+
+    md.append("---")
+    md.append("")
+
+    # Tax Implications
+    if pathway['tax_implications']:
+        md.append("## Tax Implications")
+        md.append("")
+        md.append(pathway['tax_implications'])
+        md.append("")
+        md.append("---")
+        md.append("")
+
+    # Policy Changes
+    if pathway['policy_changes_2025']:
+        md.append("## 2025 Policy Changes")
+        md.append("")
+        md.append(pathway['policy_changes_2025'])
+        md.append("")
+        md.append("---")
+        md.append("")
+
+    # Sources
+    if sources:
+        md.append("## Sources")
+        md.append("")
+        for idx, source in enumerate(sources, 1):
+            md.append(f"{idx}. **{source['title']}**")
+            md.append(f"   - URL: {source['url']}")
+            md.append(f"   - Type: {source['source_type']}")
+            md.append(f"   - Credibility: {'⭐' * source['credibility']} ({source['credibility']}/5)")
+            if source['relevance_score']:
+                md.append(f"   - Relevance: {source['relevance_score']}/5")
+            if source['excerpt']:
+                md.append(f"   - Excerpt: \"{source['excerpt']}\"")
+            md.append("")
+
+        md.append("---")
+        md.append("")
+
+    # Metadata
+    md.append("## Metadata")
+    md.append("")
+    md.append(f"- **Database ID**: {pathway['id']}")
+    md.append(f"- **Last Verified**: {pathway['last_verified_date'] or 'N/A'}")
+    md.append(f"- **Created**: {pathway['created_at']}")
+    md.append(f"- **Updated**: {pathway['updated_at']}")
+    md.append("")
+
+    # Tags
+    md.append("---")
+    md.append("")
+    md.append(f"**Tags**: #{pathway['country_name'].lower().replace(' ', '-')} #{pathway['pathway_type'].replace('_', '-')} #residency #visa")
+
+    return "\n".join(md)
+
+
+
+
+def legacy_country_index(country: str, pathways: list, country_info: sqlite3.Row, country_sources: list) -> str:
+    """Generate country index/README from database"""
+    md = []
+
+    # Header
+    md.append(f"# {country} - Residency & Citizenship Pathways")
+    md.append("")
+    md.append(f"**EU Member**: {'✅ Yes' if country_info['is_eu_member'] else '❌ No'}")
+    md.append(f"**Schengen**: {'✅ Yes' if country_info['is_schengen'] else '❌ No'}")
+    md.append(f"**Capital**: {country_info['capital']}")
+    md.append(f"**Language**: {country_info['official_language']}")
+    md.append(f"**Currency**: {country_info['currency']}")
+    md.append(f"**Last Updated**: {legacy_country_last_updated(country_info, pathways, country_sources)[:10]}")
+    md.append(f"**Generated from Database**")
+    md.append("")
+    md.append("---")
+    md.append("")
+
+    # Pathways overview
+    md.append(f"## Residency Pathways ({len(pathways)} documented)")
+    md.append("")
+
+    for pathway in pathways:
+        md.append(f"### [{pathway['name']}]({legacy_pathway_filename(pathway)})")
+        md.append(f"- **Type**: {pathway['pathway_type']}")
+        md.append(f"- **Status**: {'✅ Active' if pathway['is_active'] else '❌ Inactive'}")
+        if pathway['min_income_eur']:
+            md.append(f"- **Min Income**: €{pathway['min_income_eur']:,}/year")
+        if pathway['min_investment_eur']:
+            md.append(f"- **Min Investment**: €{pathway['min_investment_eur']:,}")
+        if pathway['initial_duration_months']:
+            md.append(f"- **Duration**: {pathway['initial_duration_months']} months")
+        md.append("")
+
+    md.append("---")
+    md.append("")
+
+    # Quick comparison table
+    md.append("## Quick Comparison")
+    md.append("")
+    md.append("| Pathway | Min Income/Investment | Duration | Renewable |")
+    md.append("|---------|----------------------|----------|-----------|")
+
+    for pathway in pathways:
+        amount = ""
+        if pathway['min_income_eur']:
+            amount = f"€{pathway['min_income_eur']:,}/yr"
+        elif pathway['min_investment_eur']:
+            amount = f"€{pathway['min_investment_eur']:,}"
+
+        duration = f"{pathway['initial_duration_months']} mo" if pathway['initial_duration_months'] else "N/A"
+        renewable = "✅" if pathway['renewable'] else "❌"
+
+        md.append(f"| {pathway['name']} | {amount} | {duration} | {renewable} |")
+
+    md.append("")
+    md.append("---")
+    md.append("")
+
+    # Add sources summary
+    if country_sources:
+        md.append("## All Sources")
+        md.append("")
+
+        # Group by credibility
+        by_credibility = {}
+        for source in country_sources:
+            cred = source['credibility']
+            if cred not in by_credibility:
+                by_credibility[cred] = []
+            by_credibility[cred].append(source)
+
+        for cred in sorted(by_credibility.keys(), reverse=True):
+            md.append(f"### {'⭐' * cred} ({cred}/5) - {len(by_credibility[cred])} source(s)")
+            md.append("")
+            for source in by_credibility[cred]:
+                md.append(f"- **{source['title']}**")
+                md.append(f"  - URL: {source['url']}")
+                md.append(f"  - Type: {source['source_type']}")
+                if source['last_verified_date']:
+                    md.append(f"  - Last Verified: {source['last_verified_date']}")
+                md.append("")
+
+        md.append("---")
+        md.append("")
+
+    md.append(f"**Generated from Database** - Country ID: {country_info['id']}")
+    md.append(f"**Tags**: #{country.lower().replace(' ', '-')} #overview #index")
+
+    return "\n".join(md)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tests for Artifact Extract CLI Tool
+
+Tests that pending HTML artifacts are extracted in batches on a process
+pool, that failures are recorded on the row, that claims left by a dead
+process are taken over (resume after a crash) while live claims are not,
+that extracted text becomes searchable, that sources with the same stem
+get their own markdown, and that --retry-failed tries a failure only once.
+
+Uses a separate test database to avoid polluting production data.
+"""
+
+import subprocess
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+import sys
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+TEST_RAW_DIR = PROJECT_ROOT / "data" / "raw" / "test_extract"
+TEST_EXTRACTED_DIR = PROJECT_ROOT / "data" / "test_extracted"
+TEST_BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
+
+PAGE = """<html><head><title>{title}</title><style>body {{ color: red; }}</style></head>
+<body><nav>Home | Visas | Contact</nav>
+<h1>{title}</h1>
+<p>Applicants need a minimum income of {income} euro per year.</p>
+<p>The permit is valid for one year and can be renewed.</p>
+<script>trackVisitor();</script>
+</body></html>
+"""
+
+
+def run_cli(command: list, timeout: float = None) -> tuple:
+    """Run a CLI command against the test database and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env,
+        timeout=timeout
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created fresh test database: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database and test files"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+    for directory in (TEST_RAW_DIR, TEST_EXTRACTED_DIR, TEST_BLOBS_DIR):
+        if directory.exists():
+            shutil.rmtree(directory)
+    print(f"   ✓ Cleaned up test files")
+
+
+def artifact_rows() -> dict:
+    """Artifact rows by file name"""
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("""
+        SELECT id, file_name, extraction_status, extracted_to_path, extraction_error, word_count
+        FROM artifacts
+    """).fetchall()
+    conn.close()
+    return {row['file_name']: row for row in rows}
+
+
+def test_artifact_extract():
+    """Test batch extraction"""
+    print("🧪 Testing Artifact Extraction\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    TEST_RAW_DIR.mkdir(parents=True, exist_ok=True)
+    for number in range(1, 6):
+        (TEST_RAW_DIR / f"page_{number}.html").write_text(
+            PAGE.format(title=f"Visa Guide {number}", income=20000 + number * 1000))
+    (TEST_RAW_DIR / "broken.html").write_text("<html><body><script>only();</script></body></html>")
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'html',
+        '--dir', str(TEST_RAW_DIR), '--glob', '*.html', '--country', 'Italy'
+    ])
+    if code != 0:
+        print(f"❌ Setup failed: artifact_register.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    # Test 1: Batch extraction
+    print("\n1️⃣  Testing batch extraction (2 processes, batches of 2)...")
+    held = artifact_rows()['page_5.html']['id']
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("INSERT INTO artifact_extraction_claims (artifact_id, pid) VALUES (?, ?)",
+                 (held, os.getpid()))
+    conn.commit()
+    conn.close()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_extract.py', '--jobs', '2', '--batch-size', '2', '--no-index'
+    ])
+    if code != 0:
+        print(f"❌ FAILED: artifact_extract.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    rows = artifact_rows()
+    extracted = [name for name, row in rows.items() if row['extraction_status'] == 'extracted']
+    if sorted(extracted) != [f"page_{n}.html" for n in range(1, 5)] or len(stdout.splitlines()) != 4:
+        print(f"❌ FAILED: Expected pages 1-4 extracted, got {extracted}")
+        print(f"stdout: {stdout}")
+        return False
+
+    row = rows['page_1.html']
+    markdown = (PROJECT_ROOT / row['extracted_to_path']).read_text()
+    if ("minimum income of 21000 euro" not in markdown or "trackVisitor" in markdown
+            or "Home | Visas" in markdown or not row['word_count']):
+        print(f"❌ FAILED: Unexpected markdown for page_1.html:\n{markdown}")
+        return False
+    if (Path(row['extracted_to_path']).parts[:3] != ('data', 'test_extracted', 'test_extract')
+            or Path(row['extracted_to_path']).name != 'page_1.html.md'):
+        print(f"❌ FAILED: Unexpected output path {row['extracted_to_path']}")
+        return False
+    print(f"✅ PASSED: 4 artifacts extracted ({row['word_count']} words in page_1)")
+
+    # Test 2: Failures are recorded, live claims are respected
+    print("\n2️⃣  Testing failures and claims...")
+    broken = rows['broken.html']
+    if broken['extraction_status'] != 'failed' or not broken['extraction_error']:
+        print(f"❌ FAILED: broken.html should have failed, got {dict(broken)}")
+        return False
+    if rows['page_5.html']['extraction_status'] != 'pending':
+        print(f"❌ FAILED: page_5.html was claimed by a live process but got extracted")
+        return False
+    print(f"✅ PASSED: broken.html failed ({broken['extraction_error']}); page_5.html left to its claim")
+
+    # Test 3: Resume after a crash
+    print("\n3️⃣  Testing resume after a crash (claim of a dead process)...")
+    finished = subprocess.Popen(['true'])
+    finished.wait()
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("UPDATE artifact_extraction_claims SET pid = ? WHERE artifact_id = ?",
+                 (finished.pid, held))
+    conn.commit()
+    conn.close()
+
+    stdout, stderr, code = run_cli(['python', 'cli/artifact_extract.py', '--jobs', '1'])
+    if code != 0 or artifact_rows()['page_5.html']['extraction_status'] != 'extracted':
+        print(f"❌ FAILED: page_5.html not extracted after the claim's process died")
+        print(f"stderr: {stderr}")
+        return False
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    claims = conn.execute("SELECT COUNT(*) FROM artifact_extraction_claims").fetchone()[0]
+    conn.close()
+    if claims:
+        print(f"❌ FAILED: {claims} claim(s) left behind")
+        return False
+    print(f"✅ PASSED: Stale claim taken over, no claims left")
+
+    # Test 4: Extracted text is searchable
+    print("\n4️⃣  Testing search over extracted text...")
+    stdout, stderr, code = run_cli(['python', 'cli/search.py', '--json', '--kind', 'artifacts',
+                                    '25000 euro'])
+    results = json.loads(stdout) if code == 0 else None
+    if not results or results[0]['ref_id'] != rows['page_5.html']['id']:
+        print(f"❌ FAILED: Expected page_5.html in the search results, got {results}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Found {results[0]['title']}")
+
+    # Test 5: Sources with the same stem
+    print("\n5️⃣  Testing sources with the same stem...")
+    (TEST_RAW_DIR / "guide.html").write_text(PAGE.format(title="Guide (html)", income=30000))
+    (TEST_RAW_DIR / "guide.htm").write_text(PAGE.format(title="Guide (htm)", income=31000))
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'html',
+        '--dir', str(TEST_RAW_DIR), '--glob', 'guide.*', '--country', 'Italy'
+    ])
+    stdout, stderr, code = run_cli(['python', 'cli/artifact_extract.py', '--jobs', '1', '--no-index'])
+    rows = artifact_rows()
+    outputs = {Path(rows[name]['extracted_to_path'] or '').name for name in ('guide.html', 'guide.htm')}
+    if code != 0 or outputs != {'guide.html.md', 'guide.htm.md'} or "31000 euro" not in (
+            PROJECT_ROOT / rows['guide.htm']['extracted_to_path']).read_text():
+        print(f"❌ FAILED: Expected guide.html.md and guide.htm.md, got {outputs}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: {' and '.join(sorted(outputs))} written")
+
+    # Test 6: A failure is retried once per run
+    print("\n6️⃣  Testing --retry-failed on an artifact that always fails...")
+    try:
+        stdout, stderr, code = run_cli([
+            'python', 'cli/artifact_extract.py', '--jobs', '1', '--batch-size', '1', '--retry-failed', '--no-index'
+        ], timeout=60)
+    except subprocess.TimeoutExpired:
+        print(f"❌ FAILED: --retry-failed did not terminate")
+        return False
+    if code != 0 or "Failed: 1" not in stderr or artifact_rows()['broken.html']['extraction_status'] != 'failed':
+        print(f"❌ FAILED: Expected broken.html tried once and still failed")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: broken.html retried once, still failed")
+
+    cleanup_test_database()
+
+    print("\n✅ All artifact extraction tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  ARTIFACT EXTRACTION - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_artifact_extract()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
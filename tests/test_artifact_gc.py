@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests for Artifact GC CLI Tool
+
+Tests that unregistered files are reported (dry run), kept while recent,
+quarantined or deleted, and that rows whose files are gone are re-pointed
+at a surviving alias or removed, after which their blob is collected.
+
+Only the test directories are scanned (--path), never data/raw itself.
+Uses a separate test database to avoid polluting production data.
+"""
+
+import subprocess
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+import sys
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+TEST_RAW_DIR = PROJECT_ROOT / "data" / "raw" / "test_gc"
+TEST_BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
+TEST_QUARANTINE_DIR = PROJECT_ROOT / "data" / "test_quarantine"
+
+
+def run_cli(command: list) -> tuple:
+    """Run a CLI command against the test database and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created fresh test database: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database and test files"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+    for directory in (TEST_RAW_DIR, TEST_BLOBS_DIR, TEST_QUARANTINE_DIR):
+        if directory.exists():
+            shutil.rmtree(directory)
+    print(f"   ✓ Cleaned up test files")
+
+
+def gc(*args) -> tuple:
+    """Run artifact_gc.py on the test directories; return ([(status, ref, name)], stderr, code)"""
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_gc.py', '--path', str(TEST_RAW_DIR), '--path', str(TEST_BLOBS_DIR), *args
+    ])
+    lines = [line.split("\t")[:3] for line in stdout.splitlines()]
+    return sorted((status, ref, Path(path).name) for status, ref, path in lines), stderr, code
+
+
+def test_artifact_gc():
+    """Test artifact garbage collection"""
+    print("🧪 Testing Artifact GC\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    TEST_RAW_DIR.mkdir(parents=True, exist_ok=True)
+    for name in ['a.pdf', 'b.pdf', 'c.pdf']:
+        (TEST_RAW_DIR / name).write_bytes(f"%PDF-1.4\n%GC {name}\n%%EOF".encode())
+    (TEST_RAW_DIR / 'c_copy.pdf').write_bytes((TEST_RAW_DIR / 'c.pdf').read_bytes())
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'pdf', '--dir', str(TEST_RAW_DIR), '--glob', '*.pdf'
+    ])
+    if code != 0:
+        print(f"❌ Setup failed: artifact_register.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+    ids = {Path(line.split("\t")[1]).name: int(line.split("\t")[0]) for line in stdout.splitlines()}
+    (TEST_RAW_DIR / 'aborted_download.pdf').write_bytes(b"%PDF-1.4\n%never registered\n%%EOF")
+
+    # Test 1: Dry run
+    print("\n1️⃣  Testing dry run...")
+    problems, stderr, code = gc()
+    if problems or "Kept (changed in the last 24 h): 1" not in stderr:
+        print(f"❌ FAILED: A fresh file must be kept by default, got {problems}")
+        print(f"stderr: {stderr}")
+        return False
+
+    problems, stderr, code = gc('--min-age-hours', '0')
+    if problems != [('orphaned', '-', 'aborted_download.pdf')] or not (TEST_RAW_DIR / 'aborted_download.pdf').exists():
+        print(f"❌ FAILED: Expected aborted_download.pdf reported and kept, got {problems}")
+        return False
+    print(f"✅ PASSED: Orphan reported, nothing touched")
+
+    # Test 2: Quarantine and prune rows
+    print("\n2️⃣  Testing --quarantine --prune-rows...")
+    (TEST_RAW_DIR / 'b.pdf').unlink()
+    (TEST_RAW_DIR / 'c.pdf').unlink()
+
+    problems, stderr, code = gc('--quarantine', '--prune-rows', '--min-age-hours', '0')
+    expected = [('dangling', f"alias:{ids['b.pdf']}", 'b.pdf'), ('dangling', f"alias:{ids['c.pdf']}", 'c.pdf'),
+                ('dangling', f"artifact:{ids['b.pdf']}", 'b.pdf'), ('dangling', f"artifact:{ids['c.pdf']}", 'c.pdf'),
+                ('quarantined', '-', 'aborted_download.pdf')]
+    if code != 0 or problems != expected:
+        print(f"❌ FAILED: Expected {expected}, got {problems}")
+        print(f"stderr: {stderr}")
+        return False
+
+    quarantined = list(TEST_QUARANTINE_DIR.glob('*/data/raw/test_gc/aborted_download.pdf'))
+    conn = sqlite3.connect(TEST_DB_PATH)
+    rows = dict(conn.execute("SELECT id, file_path FROM artifacts").fetchall())
+    conn.close()
+    if (len(quarantined) != 1 or ids['b.pdf'] in rows
+            or Path(rows.get(ids['c.pdf'], '')).name != 'c_copy.pdf'):
+        print(f"❌ FAILED: Unexpected state: quarantined {quarantined}, artifacts {rows}")
+        return False
+    print(f"✅ PASSED: Orphan quarantined; b.pdf row removed; c.pdf re-pointed at c_copy.pdf")
+
+    # Test 3: The removed artifact's blob is collected next
+    print("\n3️⃣  Testing --delete of the unreferenced blob...")
+    blobs = sum(1 for path in TEST_BLOBS_DIR.rglob('*') if path.is_file())
+    problems, stderr, code = gc('--delete', '--min-age-hours', '0')
+    remaining = sum(1 for path in TEST_BLOBS_DIR.rglob('*') if path.is_file())
+    if code != 0 or [status for status, _, _ in problems] != ['deleted'] or remaining != blobs - 1:
+        print(f"❌ FAILED: Expected one blob deleted ({blobs} -> {remaining}), got {problems}")
+        print(f"stderr: {stderr}")
+        return False
+
+    problems, stderr, code = gc('--min-age-hours', '0')
+    if problems:
+        print(f"❌ FAILED: Expected nothing left to collect, got {problems}")
+        return False
+    print(f"✅ PASSED: Blob of b.pdf deleted; nothing left to collect")
+
+    cleanup_test_database()
+
+    print("\n✅ All artifact GC tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  ARTIFACT GC - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_artifact_gc()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,15 +2,20 @@
 """
 Tests for Artifact Management CLI Tools
 
-Tests artifact registration workflow.
+Tests artifact registration workflow, blob-store cleanup for files that
+are not registered, and files downloaded compressed.
 Uses a separate test database to avoid polluting production data.
 """
 
 import subprocess
+import gzip
+import hashlib
+import json
 import sqlite3
 import tempfile
 import shutil
 import os
+import stat
 from pathlib import Path
 import sys
 
@@ -18,15 +23,23 @@ import sys
 PROJECT_ROOT = Path(__file__).parent.parent
 TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
 PROD_DB_PATH = PROJECT_ROOT / "data" / "database" / "residency.db"
+TEST_BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
 
 
-def run_cli(command: list) -> tuple:
+def run_cli(command: list, test_mode: bool = False, extra_env: dict = None) -> tuple:
     """Run a CLI command and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    if test_mode:
+        # Use the test database
+        env['TEST_MODE'] = '1'
+    env.update(extra_env or {})
+
     result = subprocess.run(
         command,
         capture_output=True,
         text=True,
-        cwd=PROJECT_ROOT
+        cwd=PROJECT_ROOT,
+        env=env
     )
     return result.stdout.strip(), result.stderr, result.returncode
 
@@ -54,6 +67,10 @@ def cleanup_test_database():
         shutil.rmtree(test_dir)
         print(f"   ✓ Cleaned up test files")
 
+    if TEST_BLOBS_DIR.exists():
+        shutil.rmtree(TEST_BLOBS_DIR)
+        print(f"   ✓ Cleaned up test blobs")
+
 
 def test_artifact_registration():
     """Test artifact registration"""
@@ -81,7 +98,7 @@ def test_artifact_registration():
         '--country', 'Italy',
         '--pathway', 'digital_nomad',
         '--description', 'Test PDF for unit testing'
-    ])
+    ], test_mode=True)
 
     if code != 0:
         print(f"❌ FAILED: artifact_register.py returned code {code}")
@@ -100,7 +117,7 @@ def test_artifact_registration():
         '--path', str(test_pdf_path),
         '--title', 'Duplicate PDF',
         '--country', 'Italy'
-    ])
+    ], test_mode=True)
 
     if code2 != 0:
         print(f"❌ FAILED: artifact_register.py (duplicate) returned code {code2}")
@@ -172,6 +189,325 @@ def test_query_artifacts():
 
     print("✅ PASSED: Artifacts query successful")
     print(f"\nOutput:\n{stdout}")
+
+    print("\n5️⃣  Testing db_query.py artifacts --format jsonl...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/db_query.py',
+        'artifacts',
+        '--country', 'Italy',
+        '--format', 'jsonl'
+    ])
+
+    if code != 0:
+        print(f"❌ FAILED: db_query.py artifacts --format jsonl returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    try:
+        records = [json.loads(line) for line in stdout.splitlines()]
+    except json.JSONDecodeError as e:
+        print(f"❌ FAILED: Output is not JSON lines: {e}")
+        return False
+
+    if any(record['country'] != 'Italy' or 'file_name' not in record for record in records):
+        print(f"❌ FAILED: Unexpected records: {records}")
+        return False
+
+    print(f"✅ PASSED: {len(records)} JSON records")
+    return True
+
+
+def test_directory_registration():
+    """Test registering a directory of artifacts"""
+    print("\n\n🧪 Testing Directory Registration\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    test_dir = PROJECT_ROOT / "data" / "raw" / "test_italy" / "bulk"
+    test_dir.mkdir(parents=True, exist_ok=True)
+    for name in ['a.pdf', 'b.pdf', 'c.pdf']:
+        (test_dir / name).write_bytes(f"%PDF-1.4\n%Bulk {name}\n%%EOF".encode())
+    (test_dir / 'copy_of_a.pdf').write_bytes((test_dir / 'a.pdf').read_bytes())
+    (test_dir / 'notes.txt').write_text("not a pdf")
+
+    print("\n6️⃣  Testing artifact_register.py --dir...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py',
+        '--type', 'pdf',
+        '--dir', str(test_dir),
+        '--glob', '*.pdf',
+        '--country', 'Italy'
+    ], test_mode=True)
+
+    if code != 0:
+        print(f"❌ FAILED: artifact_register.py --dir returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    ids = {}
+    for line in stdout.splitlines():
+        artifact_id, path = line.split("\t")
+        ids[Path(path).name] = int(artifact_id)
+
+    if sorted(ids) != ['a.pdf', 'b.pdf', 'c.pdf', 'copy_of_a.pdf'] or ids['a.pdf'] != ids['copy_of_a.pdf']:
+        print(f"❌ FAILED: Unexpected ID mapping {ids}")
+        return False
+    print(f"✅ PASSED: {len(set(ids.values()))} artifacts for {len(ids)} files")
+    print(f"   stderr output:\n{stderr}")
+
+    # The duplicate shares the first file's bytes (one blob, hard links)
+    a, copy = (test_dir / 'a.pdf').stat(), (test_dir / 'copy_of_a.pdf').stat()
+    if (a.st_ino, a.st_nlink) != (copy.st_ino, 3):
+        print(f"❌ FAILED: copy_of_a.pdf is not linked to the a.pdf blob")
+        return False
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    aliases = conn.execute("SELECT COUNT(*) FROM artifact_paths WHERE artifact_id = ? AND link_type = 'hardlink'",
+                           (ids['a.pdf'],)).fetchone()[0]
+    conn.close()
+    if aliases != 2:
+        print(f"❌ FAILED: Expected 2 aliases for artifact {ids['a.pdf']}, found {aliases}")
+        return False
+    print(f"✅ PASSED: Duplicate deduplicated into one blob with 2 aliases")
+
+    print("\n7️⃣  Testing artifact_register.py --dir again (all known)...")
+    stdout2, stderr2, code2 = run_cli([
+        'python', 'cli/artifact_register.py',
+        '--type', 'pdf',
+        '--dir', str(test_dir),
+        '--glob', '*.pdf'
+    ], test_mode=True)
+
+    ids2 = {Path(line.split("\t")[1]).name: int(line.split("\t")[0]) for line in stdout2.splitlines()}
+    if code2 != 0 or ids2 != ids or "Registered 0 new artifacts" not in stderr2:
+        print(f"❌ FAILED: Expected the same IDs and no new artifacts, got {ids2}")
+        print(f"stderr: {stderr2}")
+        return False
+    print(f"✅ PASSED: Known hashes returned existing IDs")
+
+    print("\n8️⃣  Testing hash cache and --verify...")
+    conn = sqlite3.connect(TEST_DB_PATH)
+    cached = conn.execute("SELECT COUNT(*) FROM file_hashes WHERE path LIKE ?", (f"{test_dir}%",)).fetchone()[0]
+    if cached != 4:
+        print(f"❌ FAILED: Expected 4 cached hashes, found {cached}")
+        return False
+
+    # A stale cache entry is used as is, until --verify re-hashes the file
+    conn.execute("UPDATE file_hashes SET sha256 = ? WHERE path = ?", ('0' * 64, str(test_dir / 'b.pdf')))
+    conn.commit()
+    conn.close()
+
+    stdout3, stderr3, code3 = run_cli([
+        'python', 'cli/artifact_register.py',
+        '--type', 'pdf',
+        '--dir', str(test_dir),
+        '--glob', 'b.pdf',
+        '--verify'
+    ], test_mode=True)
+
+    if code3 != 0 or "Cached hash was stale" not in stderr3 or int(stdout3.split("\t")[0]) != ids['b.pdf']:
+        print(f"❌ FAILED: --verify did not re-hash b.pdf")
+        print(f"stderr: {stderr3}")
+        return False
+    print(f"✅ PASSED: {cached} hashes cached; --verify re-hashed a stale entry")
+
+    print("\n9️⃣  Testing compressed HTML storage...")
+    html = "<html><body>" + "<p>Minimum income: 28,000 EUR per year.</p>\n" * 200 + "</body></html>"
+    (test_dir / 'page.html').write_text(html)
+    (test_dir / 'page_again.html').write_text(html)
+
+    # The page was logged in the audit trail before it was registered
+    conn = sqlite3.connect(TEST_DB_PATH)
+    job_id = conn.execute("INSERT INTO job_run (task_description) VALUES ('Test compression')").lastrowid
+    conn.execute("""
+        INSERT INTO scraper_audit_trail (job_run_id, action_type, artifact_path, status)
+        VALUES (?, 'fetch', ?, 'success')
+    """, (job_id, str((test_dir / 'page.html').relative_to(PROJECT_ROOT))))
+    conn.commit()
+    conn.close()
+
+    stdout4, stderr4, code4 = run_cli([
+        'python', 'cli/artifact_register.py',
+        '--type', 'html',
+        '--dir', str(test_dir),
+        '--glob', '*.html'
+    ], test_mode=True)
+
+    paths = [line.split("\t")[1] for line in stdout4.splitlines()]
+    html_ids = {line.split("\t")[0] for line in stdout4.splitlines()}
+    if code4 != 0 or len(paths) != 2 or len(html_ids) != 1 or not all(path.endswith(('.html.gz', '.html.zst')) for path in paths):
+        print(f"❌ FAILED: Expected compressed paths, got {paths}")
+        print(f"stderr: {stderr4}")
+        return False
+    if (test_dir / 'page.html').exists():
+        print(f"❌ FAILED: Uncompressed page.html left behind")
+        return False
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    row = conn.execute("""
+        SELECT sha256, file_size_bytes, compression, compressed_size_bytes FROM artifacts WHERE file_path = ?
+    """, (paths[0],)).fetchone()
+    trail_path = conn.execute("SELECT artifact_path FROM scraper_audit_trail").fetchone()[0]
+    conn.close()
+    sha256, size, compression, compressed_size = row
+    if trail_path not in paths:
+        print(f"❌ FAILED: Audit trail still points at {trail_path}")
+        return False
+    if (sha256 != hashlib.sha256(html.encode()).hexdigest() or size != len(html)
+            or compressed_size != (PROJECT_ROOT / paths[0]).stat().st_size or compressed_size * 5 > size):
+        print(f"❌ FAILED: Unexpected artifact row {row}")
+        return False
+
+    sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+    from blob_store import read_artifact_text
+    if read_artifact_text(PROJECT_ROOT / paths[1]) != html:
+        print(f"❌ FAILED: Compressed artifact does not read back as the original")
+        return False
+    print(f"✅ PASSED: {size:,} bytes stored as {compressed_size:,} ({compression}), one artifact for 2 files")
+
+    cleanup_test_database()
+    return True
+
+
+def test_failed_link():
+    """Test that a link that cannot be swapped in leaves no temporary file"""
+    print("\n🔟 Testing failed replace_with_link...")
+    sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+    from blob_store import replace_with_link
+
+    test_dir = Path(tempfile.mkdtemp())
+    blob = test_dir / 'blob'
+    blob.write_bytes(b"%PDF-1.4\n%blob\n%%EOF")
+
+    # A directory cannot be replaced by the link; a stale link name is in the way
+    (test_dir / 'visa.pdf').mkdir()
+    (test_dir / 'visa.pdf' / 'keep').write_text("keep")
+    (test_dir / 'stale.pdf').write_bytes(b"stale")
+    (test_dir / f".stale.pdf.{os.getpid()}.blob").write_bytes(b"left over")
+
+    errors = []
+    for name in ('visa.pdf', 'stale.pdf'):
+        try:
+            replace_with_link(blob, test_dir / name, blob.stat())
+        except OSError as e:
+            errors.append(type(e).__name__)
+
+    left = sorted(path.name for path in test_dir.iterdir())
+    shutil.rmtree(test_dir)
+    if len(errors) != 2 or left != ['blob', 'stale.pdf', 'visa.pdf']:
+        print(f"❌ FAILED: Expected 2 errors and no temporary files, got {errors} and {left}")
+        return False
+    print(f"✅ PASSED: {', '.join(errors)} raised, temporary links removed")
+    return True
+
+
+def test_unregistered_store():
+    """Test that files which are not registered are left out of the blob store"""
+    print("\n\n🧪 Testing Rolled Back and Skipped Stores\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    test_dir = PROJECT_ROOT / "data" / "raw" / "test_italy" / "rollback"
+    test_dir.mkdir(parents=True, exist_ok=True)
+    pdf, page = test_dir / 'new.pdf', test_dir / 'page.html'
+    pdf.write_bytes(b"%PDF-1.4\n%Rolled back\n%%EOF")
+    page.write_text("<html><body>" + "<p>Rolled back</p>\n" * 100 + "</body></html>")
+
+    def own_writable_file(path: Path) -> bool:
+        file_stat = path.stat()
+        return file_stat.st_nlink == 1 and bool(file_stat.st_mode & stat.S_IWUSR)
+
+    def blob_files() -> list:
+        return [path for path in TEST_BLOBS_DIR.rglob('*') if path.is_file()] if TEST_BLOBS_DIR.exists() else []
+
+    print("\n1️⃣1️⃣ Testing artifact_register.py while the write lock is held...")
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("BEGIN IMMEDIATE")
+    codes = []
+    for artifact_type, path in (('pdf', pdf), ('html', page)):
+        stdout, stderr, code = run_cli([
+            'python', 'cli/artifact_register.py', '--type', artifact_type, '--path', str(path), '--title', 'Rollback'
+        ], test_mode=True, extra_env={'DB_WRITE_DEADLINE': '0.2'})
+        codes.append(code)
+    conn.rollback()
+    conn.close()
+
+    left = blob_files() + sorted(test_dir.glob('*.gz')) + sorted(test_dir.glob('*.zst'))
+    if codes != [1, 1] or left or not own_writable_file(pdf) or not own_writable_file(page):
+        print(f"❌ FAILED: Expected both registrations to fail and leave no store behind, "
+              f"got codes {codes} and {left}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Blobs and compressed copies removed, files writable again")
+
+    print("\n1️⃣2️⃣ Testing a file changed since it was registered...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'pdf', '--dir', str(test_dir), '--glob', '*.pdf'
+    ], test_mode=True)
+    blobs = blob_files()
+    pdf.unlink()
+    pdf.write_bytes(b"%PDF-1.4\n%Changed\n%%EOF")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'pdf', '--dir', str(test_dir), '--glob', '*.pdf'
+    ], test_mode=True)
+    if (code != 0 or "changed since it was registered" not in stderr or len(blobs) != 1
+            or blob_files() != blobs or not own_writable_file(pdf)):
+        print(f"❌ FAILED: Expected the changed file skipped without being stored, blobs {blob_files()}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Changed file skipped before it was stored")
+
+    cleanup_test_database()
+    return True
+
+
+def test_compressed_downloads():
+    """Test that files downloaded compressed are hashed as they are"""
+    print("\n\n🧪 Testing Compressed Downloads\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    test_dir = PROJECT_ROOT / "data" / "raw" / "test_italy" / "downloads"
+    test_dir.mkdir(parents=True, exist_ok=True)
+    (test_dir / 'permits.csv.gz').write_bytes(gzip.compress(b"country,permit\nItaly,digital_nomad\n", mtime=0))
+    (test_dir / 'broken.gz').write_bytes(b"not gzip data")
+
+    print("\n1️⃣3️⃣ Testing artifact_register.py --dir on .gz downloads...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'zip', '--dir', str(test_dir), '--glob', '*.gz'
+    ], test_mode=True)
+    conn = sqlite3.connect(TEST_DB_PATH)
+    rows = conn.execute("SELECT file_path, sha256, compression FROM artifacts WHERE file_path LIKE ?",
+                        (f"%{test_dir.name}%",)).fetchall()
+    conn.close()
+    expected = sorted((str(path.relative_to(PROJECT_ROOT)), hashlib.sha256(path.read_bytes()).hexdigest(), None)
+                      for path in test_dir.glob('*.gz'))
+    if code != 0 or sorted(rows) != expected:
+        print(f"❌ FAILED: Expected both files registered by their raw bytes, got {rows}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: {len(rows)} .gz downloads hashed as they are (one not even gzip)")
+
+    print("\n1️⃣4️⃣ Testing a compressed copy registered again...")
+    page = test_dir / 'page.html'
+    page.write_text("<html><body>" + "<p>Registered twice</p>\n" * 100 + "</body></html>")
+    first, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'html', '--path', str(page), '--title', 'Page'
+    ], test_mode=True)
+    copy = next(test_dir.glob('page.html.*'))
+    second, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py', '--type', 'html', '--path', str(copy), '--title', 'Page'
+    ], test_mode=True)
+    if code != 0 or first != second or "already registered" not in stderr:
+        print(f"❌ FAILED: Expected {copy.name} to resolve to artifact {first}, got {second}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: {copy.name} hashed decompressed, matched artifact {first}")
+
+    cleanup_test_database()
     return True
 
 
@@ -191,6 +527,22 @@ def main():
     if not test_query_artifacts():
         all_passed = False
 
+    # Test 3: Directory registration
+    if not test_directory_registration():
+        all_passed = False
+
+    # Test 4: Failed link
+    if not test_failed_link():
+        all_passed = False
+
+    # Test 5: Stores undone for files that are not registered
+    if not test_unregistered_store():
+        all_passed = False
+
+    # Test 6: Compressed downloads
+    if not test_compressed_downloads():
+        all_passed = False
+
     print("\n" + "=" * 60)
     if all_passed:
         print("✅ ALL TESTS PASSED")
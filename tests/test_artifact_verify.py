@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for Artifact Verify CLI Tool
+
+Tests that verification passes for untouched artifacts (including an audit
+trail page that was replaced by its compressed copy), reports orphaned,
+missing and modified files, only re-hashes files that changed, and reports
+a file that cannot be stat'ed without stopping.
+
+Uses a separate test database to avoid polluting production data.
+"""
+
+import subprocess
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+import sys
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+TEST_RAW_DIR = PROJECT_ROOT / "data" / "raw" / "test_verify"
+TEST_BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
+
+
+def run_cli(command: list) -> tuple:
+    """Run a CLI command against the test database and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created fresh test database: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database and test files"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+    for directory in (TEST_RAW_DIR, TEST_BLOBS_DIR):
+        if directory.exists():
+            shutil.rmtree(directory)
+    print(f"   ✓ Cleaned up test files")
+
+
+def verify() -> tuple:
+    """Run artifact_verify.py --json for the test files; return (problems, stats, returncode)"""
+    stdout, stderr, code = run_cli(['python', 'cli/artifact_verify.py', '--json', '--jobs', '4'])
+    report = json.loads(stdout)
+    problems = [(p['status'], p['ref'].split(':')[0], Path(p['path']).name) for p in report['problems']
+                if p['path'].startswith(str(TEST_RAW_DIR.relative_to(PROJECT_ROOT)))]
+    return sorted(problems), report['stats'], code
+
+
+def test_artifact_verify():
+    """Test artifact verification"""
+    print("🧪 Testing Artifact Verification\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    TEST_RAW_DIR.mkdir(parents=True, exist_ok=True)
+    for name in ['a.pdf', 'b.pdf']:
+        (TEST_RAW_DIR / name).write_bytes(f"%PDF-1.4\n%Verify {name}\n%%EOF".encode())
+    (TEST_RAW_DIR / 'page.html').write_text("<html><body><p>Residence permit</p></body></html>")
+
+    job_id, stderr, code = run_cli(['python', 'cli/audit_start_job.py', '--task', 'Verify test'])
+    trail_id, stderr, code2 = run_cli([
+        'python', 'cli/audit_log_page.py', '--job-id', job_id, '--action', 'fetch',
+        '--url', 'https://example.org/page', '--artifact-path', str(TEST_RAW_DIR / 'page.html')
+    ])
+    for artifact_type, pattern in (('pdf', '*.pdf'), ('html', '*.html')):
+        stdout, stderr, code3 = run_cli([
+            'python', 'cli/artifact_register.py', '--type', artifact_type,
+            '--dir', str(TEST_RAW_DIR), '--glob', pattern
+        ])
+        if code3 != 0:
+            break
+    if code or code2 or code3:
+        print(f"❌ Setup failed")
+        print(f"stderr: {stderr}")
+        return False
+    (TEST_RAW_DIR / 'notes.txt').write_text("never registered")
+
+    # Test 1: Intact files; only the unregistered file is reported
+    print("\n1️⃣  Testing intact artifacts and orphans...")
+    problems, stats, code = verify()
+    if problems != [('orphaned', '-', 'notes.txt')] or code != 1:
+        print(f"❌ FAILED: Expected only notes.txt orphaned, got {problems} (code {code})")
+        return False
+    print(f"✅ PASSED: {stats['checked']} references verified, notes.txt orphaned")
+
+    # The trail row (an absolute path) was re-pointed when page.html was compressed;
+    # rows recorded before that are resolved to the compressed copy
+    conn = sqlite3.connect(TEST_DB_PATH)
+    trail_path = conn.execute("SELECT artifact_path FROM scraper_audit_trail WHERE id = ?",
+                              (int(trail_id),)).fetchone()[0]
+    conn.execute("UPDATE scraper_audit_trail SET artifact_path = ? WHERE id = ?",
+                 (str(TEST_RAW_DIR / 'page.html'), int(trail_id)))
+    conn.commit()
+    conn.close()
+    problems, stats, code = verify()
+    if not trail_path.startswith(str(TEST_RAW_DIR / 'page.html.')) or problems != [('orphaned', '-', 'notes.txt')]:
+        print(f"❌ FAILED: Expected the trail re-pointed ({trail_path}) and the old path resolved, got {problems}")
+        return False
+    print(f"   Audit trail page.html re-pointed at {Path(trail_path).name}, and resolved when it was not")
+
+    # Test 2: Missing and modified files
+    print("\n2️⃣  Testing missing and modified files...")
+    (TEST_RAW_DIR / 'notes.txt').unlink()
+    (TEST_RAW_DIR / 'a.pdf').unlink()
+    b = TEST_RAW_DIR / 'b.pdf'
+    content = b.read_bytes()
+    b.unlink()  # The blob is read-only; a new download replaces the link
+    b.write_bytes(content.replace(b'Verify', b'Tamper'))
+
+    problems, stats, code = verify()
+    expected = [('missing', 'artifact', 'a.pdf'), ('modified', 'artifact', 'b.pdf')]
+    if problems != expected or code != 1:
+        print(f"❌ FAILED: Expected {expected}, got {problems}")
+        return False
+    print(f"✅ PASSED: a.pdf missing, b.pdf modified (same size, detected by hash)")
+
+    # Test 3: Unchanged files are not read again (except the compressed page,
+    # whose decompressed digest is not cached)
+    print("\n3️⃣  Testing hash cache on a second run...")
+    problems2, stats2, code = verify()
+    if problems2 != expected or stats2['hashed'] != 1 or not stats2['cached']:
+        print(f"❌ FAILED: Second run hashed {stats2['hashed']} file(s), cached {stats2['cached']}")
+        return False
+    print(f"✅ PASSED: Second run used {stats2['cached']} cached digest(s), hashed only the compressed page")
+
+    # Test 4: A file that cannot be stat'ed is an error, not a crash
+    print("\n4️⃣  Testing an unreadable file (symlink loop)...")
+    loop = TEST_RAW_DIR / 'loop.pdf'
+    loop.symlink_to(loop.name)
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("INSERT INTO artifacts (artifact_type, file_path, file_name, sha256) VALUES ('pdf', ?, ?, ?)",
+                 (str(loop.relative_to(PROJECT_ROOT)), loop.name, '0' * 64))
+    conn.commit()
+    conn.close()
+
+    problems, stats, code = verify()
+    if problems != sorted(expected + [('error', '-', 'loop.pdf')]) or code != 1:
+        print(f"❌ FAILED: Expected loop.pdf reported as an error, got {problems}")
+        return False
+    print(f"✅ PASSED: loop.pdf reported as an error; the other files still verified")
+
+    cleanup_test_database()
+
+    print("\n✅ All artifact verification tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  ARTIFACT VERIFICATION - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_artifact_verify()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
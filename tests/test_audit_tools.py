@@ -13,9 +13,11 @@ Uses a separate test database to avoid polluting production data.
 
 import subprocess
 import sqlite3
+import json
 import tempfile
 import shutil
 import os
+import time
 from pathlib import Path
 import sys
 
@@ -218,6 +220,14 @@ def test_audit_workflow():
         print(f"❌ FAILED: Expected 1 marked source, found {source_count}")
         return False
 
+    # Check counters were rolled up into job_run when the job finished
+    cursor.execute("SELECT COUNT(*) FROM job_run_counters WHERE job_run_id = ?", (job_id,))
+    shard_count = cursor.fetchone()[0]
+    if shard_count != 0 or (job[7], job[8]) != (2, 1):
+        print(f"❌ FAILED: Expected rolled-up stats 2/1 and no shards, found {job[7]}/{job[8]}, {shard_count} shards")
+        return False
+    print(f"   ✓ Counters rolled up into job_run")
+
     # Check source record was created
     if source_id:
         cursor.execute("SELECT * FROM sources WHERE id = ?", (source_id,))
@@ -241,6 +251,17 @@ def test_query_audit_trail():
     print("\n\n🧪 Testing Audit Trail Query\n")
     print("=" * 60)
 
+    setup_test_database()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/audit_start_job.py',
+        '--task', 'Test audit trail query'
+    ])
+    if code != 0:
+        print(f"❌ FAILED: audit_start_job.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
     print("\n7️⃣  Testing db_query.py audit-trail...")
     stdout, stderr, code = run_cli([
         'python', 'cli/db_query.py',
@@ -252,8 +273,432 @@ def test_query_audit_trail():
         print(f"stderr: {stderr}")
         return False
 
+    if 'Test audit trail query' not in stdout:
+        print(f"❌ FAILED: Job missing from the job listing")
+        print(f"\nOutput:\n{stdout}")
+        return False
+
     print("✅ PASSED: Audit trail query successful")
     print(f"\nOutput:\n{stdout}")
+
+    cleanup_test_database()
+    return True
+
+
+def test_audit_trail_pages():
+    """Test keyset pagination of the job listing and of a job's audit trail"""
+    print("\n\n🧪 Testing Audit Trail Pagination\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    job_ids = []
+    for number in range(1, 4):
+        stdout, stderr, code = run_cli([
+            'python', 'cli/audit_start_job.py',
+            '--task', f'Test pagination {number}'
+        ])
+        job_ids.append(int(stdout))
+
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+    subprocess.run(
+        ['python', 'cli/audit_log_page.py', '--job-id', str(job_ids[0]), '--batch', '-'],
+        input="".join(json.dumps({'action_type': 'fetch', 'url': f'https://example.com/{i}'}) + "\n"
+                      for i in range(5)),
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+
+    def page(*args) -> tuple:
+        """IDs on one jsonl page and the next-page hint (stderr)"""
+        stdout, stderr, code = run_cli(['python', 'cli/db_query.py', 'audit-trail', '--format', 'jsonl', *args])
+        ids = [json.loads(line)['id'] for line in stdout.splitlines()]
+        hint = next((line for line in stderr.splitlines() if line.startswith('Next page:')), None)
+        return ids, hint
+
+    print("\n7️⃣a Testing audit-trail --job-id pages...")
+    pages = [page('--job-id', str(job_ids[0]), '--limit', '2')]
+    while pages[-1][1] and len(pages) < 5:
+        pages.append(page('--job-id', str(job_ids[0]), *pages[-1][1].split()[2:]))
+    ids = [trail_id for trail_ids, _ in pages for trail_id in trail_ids]
+    if len(pages) != 3 or len(ids) != 5 or ids != sorted(set(ids)):
+        print(f"❌ FAILED: Expected 5 trail IDs on 3 pages, got {[trail_ids for trail_ids, _ in pages]}")
+        return False
+    print(f"✅ PASSED: Trail paged as {[trail_ids for trail_ids, _ in pages]}")
+
+    print("\n7️⃣b Testing the job listing pages (newest first)...")
+    first, hint = page('--limit', '2')
+    second, last_hint = page(*hint.split()[2:]) if hint else (None, None)
+    if first != job_ids[:0:-1] or second != job_ids[:1] or last_hint:
+        print(f"❌ FAILED: Expected {job_ids[:0:-1]} then {job_ids[:1]}, got {first} then {second}")
+        return False
+    print(f"✅ PASSED: Jobs paged as {first}, {second}")
+
+    cleanup_test_database()
+
+    print("\n✅ All audit trail pagination tests PASSED!")
+    return True
+
+
+def test_audit_daemon():
+    """Test logging through the audit daemon and thin client"""
+    print("\n\n🧪 Testing Audit Daemon\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/audit_start_job.py',
+        '--task', 'Test daemon logging'
+    ])
+    if code != 0:
+        print(f"❌ FAILED: audit_start_job.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+    job_id = int(stdout)
+
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+    socket_path = TEST_DB_PATH.with_suffix('.sock')
+    daemon = subprocess.Popen(
+        ['python', 'cli/audit_daemon.py', '--socket', str(socket_path)],
+        stderr=subprocess.PIPE,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+
+    try:
+        # Wait for the daemon to start listening
+        for _ in range(50):
+            if socket_path.exists():
+                break
+            time.sleep(0.1)
+
+        print("\n8️⃣  Testing audit_log_client.py (via daemon)...")
+        trail_ids = []
+        for i in range(3):
+            stdout, stderr, code = run_cli([
+                'python', 'cli/audit_log_client.py',
+                '--job-id', str(job_id),
+                '--action', 'fetch',
+                '--url', f'https://example.com/{i}',
+                '--socket', str(socket_path),
+                '--no-fallback'
+            ])
+            if code != 0:
+                print(f"❌ FAILED: audit_log_client.py returned code {code}")
+                print(f"stderr: {stderr}")
+                return False
+            trail_ids.append(int(stdout))
+
+        if len(set(trail_ids)) != 3:
+            print(f"❌ FAILED: Expected 3 distinct trail IDs, got {trail_ids}")
+            return False
+        print(f"✅ PASSED: Logged via daemon with trail IDs {trail_ids}")
+
+        print("\n9️⃣  Testing unknown job via daemon...")
+        stdout, stderr, code = run_cli([
+            'python', 'cli/audit_log_client.py',
+            '--job-id', '99999',
+            '--action', 'fetch',
+            '--socket', str(socket_path),
+            '--no-fallback'
+        ])
+        if code == 0:
+            print(f"❌ FAILED: Expected failure for unknown job, got trail ID {stdout}")
+            return False
+        print(f"✅ PASSED: Unknown job rejected")
+
+    finally:
+        daemon.terminate()
+        daemon.wait(timeout=10)
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    pages = conn.execute("SELECT pages_visited FROM job_run_stats WHERE job_run_id = ?", (job_id,)).fetchone()[0]
+    conn.close()
+    if pages != 3:
+        print(f"❌ FAILED: Expected pages_visited = 3, found {pages}")
+        return False
+    print(f"   ✓ pages_visited: {pages}")
+
+    cleanup_test_database()
+
+    print("\n✅ All audit daemon tests PASSED!")
+    return True
+
+
+def test_audit_batch():
+    """Test NDJSON batch logging"""
+    print("\n\n🧪 Testing Audit Batch Logging\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/audit_start_job.py',
+        '--task', 'Test batch logging'
+    ])
+    job_id = int(stdout)
+
+    print("\n🔟 Testing audit_log_page.py --batch...")
+    lines = [
+        json.dumps({'action_type': 'search', 'search_query': 'Italy visa'}),
+        json.dumps({'action_type': 'navigate', 'url': 'https://example.com/a'}),
+        json.dumps({'job_id': job_id, 'action_type': 'fetch', 'url': 'https://example.com/b', 'status': 'error'}),
+    ]
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+    result = subprocess.run(
+        ['python', 'cli/audit_log_page.py', '--job-id', str(job_id), '--batch', '-'],
+        input="\n".join(lines) + "\n",
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+
+    if result.returncode != 0:
+        print(f"❌ FAILED: --batch returned code {result.returncode}")
+        print(f"stderr: {result.stderr}")
+        return False
+
+    trail_ids = [int(line) for line in result.stdout.split()]
+    if len(trail_ids) != 3 or trail_ids != sorted(trail_ids):
+        print(f"❌ FAILED: Expected 3 trail IDs in input order, got {trail_ids}")
+        return False
+    print(f"✅ PASSED: Batch logged with trail IDs {trail_ids}")
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    pages = conn.execute("SELECT pages_visited FROM job_run_stats WHERE job_run_id = ?", (job_id,)).fetchone()[0]
+    url = conn.execute("SELECT url FROM scraper_audit_trail WHERE id = ?", (trail_ids[2],)).fetchone()[0]
+    conn.close()
+    if pages != 3 or url != 'https://example.com/b':
+        print(f"❌ FAILED: Expected pages_visited = 3 and matching URL, found {pages} / {url}")
+        return False
+    print(f"   ✓ pages_visited: {pages}")
+
+    print("\n1️⃣1️⃣ Testing invalid batch is rejected...")
+    result = subprocess.run(
+        ['python', 'cli/audit_log_page.py', '--job-id', str(job_id), '--batch', '-'],
+        input=json.dumps({'action_type': 'bogus'}) + "\n",
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    if result.returncode == 0:
+        print(f"❌ FAILED: Invalid action_type was accepted")
+        return False
+    print(f"✅ PASSED: Invalid batch rejected")
+
+    cleanup_test_database()
+
+    print("\n✅ All audit batch tests PASSED!")
+    return True
+
+
+def test_concurrent_writers():
+    """Test parallel writers wait for the write lock instead of failing"""
+    print("\n\n🧪 Testing Concurrent Writers\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/audit_start_job.py',
+        '--task', 'Test concurrent writers'
+    ])
+    job_id = int(stdout)
+
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    print("\n1️⃣2️⃣ Testing 12 parallel audit_log_page.py writers...")
+    processes = [
+        subprocess.Popen(
+            ['python', 'cli/audit_log_page.py', '--job-id', str(job_id),
+             '--action', 'navigate', '--url', f"https://example.com/{i}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=PROJECT_ROOT,
+            env=env
+        )
+        for i in range(12)
+    ]
+    failed = [p.communicate()[1] for p in processes if p.wait() != 0]
+    if failed:
+        print(f"❌ FAILED: {len(failed)} writer(s) failed")
+        print(f"stderr: {failed[0]}")
+        return False
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    pages = conn.execute("SELECT pages_visited FROM job_run_stats WHERE job_run_id = ?", (job_id,)).fetchone()[0]
+    conn.close()
+    if pages != 12:
+        print(f"❌ FAILED: Expected pages_visited = 12, found {pages}")
+        return False
+    print(f"✅ PASSED: All writers succeeded (pages_visited: {pages})")
+
+    print("\n1️⃣3️⃣ Testing write lock deadline...")
+    blocker = sqlite3.connect(TEST_DB_PATH, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    env['DB_WRITE_DEADLINE'] = '0.5'
+    result = subprocess.run(
+        ['python', 'cli/audit_log_page.py', '--job-id', str(job_id), '--action', 'search'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    blocker.execute("ROLLBACK")
+    blocker.close()
+    if result.returncode == 0 or 'write lock' not in result.stderr:
+        print(f"❌ FAILED: Expected a write lock timeout, got code {result.returncode}")
+        print(f"stderr: {result.stderr}")
+        return False
+    print(f"✅ PASSED: Writer gave up at the deadline")
+
+    cleanup_test_database()
+
+    print("\n✅ All concurrent writer tests PASSED!")
+    return True
+
+
+def test_add_pathway_manifest():
+    """Test adding many pathway bundles from a manifest"""
+    print("\n\n🧪 Testing Pathway Manifest\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    stdout, stderr, code = run_cli([
+        'python', 'cli/audit_start_job.py',
+        '--task', 'Test pathway manifest'
+    ])
+    job_id = int(stdout)
+
+    artifact_dir = PROJECT_ROOT / "data" / "raw" / "test_manifest"
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    (artifact_dir / "consulate.md").write_text("# Italy\n\nDigital nomad and elective residence visas.\n")
+    (artifact_dir / "duplicate.md").write_text("# Italy\n\nDigital nomad visa (again).\n")
+
+    source = {
+        'country': 'Italy',
+        'source_url': 'https://example.org/italy/visas',
+        'source_title': 'Italian Consulate',
+        'source_type': 'official_government',
+        'credibility': 5,
+        'artifact_path': 'data/raw/test_manifest/consulate.md'
+    }
+    manifest = {'job_id': job_id, 'pathways': [
+        {**source, 'pathway_type': 'digital_nomad', 'name': 'Digital Nomad Visa', 'min_income': 24789},
+        {**source, 'pathway_type': 'retirement', 'name': 'Elective Residence Visa', 'renewable': True},
+        {**source, 'country': 'Atlantis', 'pathway_type': 'work', 'name': 'Work Permit'},
+        {**source, 'pathway_type': 'digital_nomad', 'name': 'Digital Nomad Visa',
+         'artifact_path': 'data/raw/test_manifest/duplicate.md'},
+    ]}
+    manifest_path = artifact_dir / "pathways.json"
+    manifest_path.write_text(json.dumps(manifest))
+
+    # A page logged before the pathways were added
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("""
+        INSERT INTO scraper_audit_trail (job_run_id, action_type, url, artifact_path, status)
+        VALUES (?, 'fetch', 'https://example.org/italy/visas', 'data/raw/test_manifest/consulate.md', 'success')
+    """, (job_id,))
+    conn.commit()
+    conn.close()
+
+    print("\n1️⃣4️⃣ Testing add_pathway.py --manifest (commits of 2)...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/add_pathway.py', '--manifest', str(manifest_path), '--commit-every', '2'
+    ])
+    pathway_ids = [int(line) for line in stdout.split()]
+    if code != 1 or len(pathway_ids) != 2 or pathway_ids != sorted(pathway_ids):
+        print(f"❌ FAILED: Expected 2 pathway IDs and exit code 1, got {pathway_ids} (code {code})")
+        print(f"stderr: {stderr}")
+        return False
+    if "#3: Country 'Atlantis' not found" not in stderr or "#4: UNIQUE constraint failed" not in stderr:
+        print(f"❌ FAILED: Expected entries 3 and 4 reported")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Added pathways {pathway_ids}; invalid and duplicate entries reported")
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    counts = tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                   for table in ('residency_pathways', 'sources', 'pathway_sources', 'artifacts'))
+    stats = conn.execute("""
+        SELECT pages_visited, sources_found, artifacts_downloaded FROM job_run_stats WHERE job_run_id = ?
+    """, (job_id,)).fetchone()
+    conn.close()
+    # The duplicate entry's savepoint is rolled back: no extra trail row or counts
+    if counts != (2, 1, 2, 1) or stats != (2, 1, 1):
+        print(f"❌ FAILED: Expected rows (2, 1, 2, 1) and stats (2, 1, 1), found {counts} and {stats}")
+        return False
+    print(f"   ✓ One source and one artifact shared by both pathways")
+    print(f"   ✓ pages_visited/sources_found/artifacts_downloaded: {stats}")
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    file_path, compression = conn.execute("SELECT file_path, compression FROM artifacts").fetchone()
+    trail_paths = {path for (path,) in conn.execute("SELECT artifact_path FROM scraper_audit_trail")}
+    conn.close()
+    if (not compression or (artifact_dir / "consulate.md").exists() or not (PROJECT_ROOT / file_path).exists()
+            or trail_paths != {file_path}):
+        print(f"❌ FAILED: Expected consulate.md stored compressed and the audit trail at {file_path}, "
+              f"found {trail_paths}")
+        return False
+    print(f"   ✓ Stored as {file_path} ({compression}); audit trail points at it")
+
+    # The rolled back entry's artifact is not left in the blob store
+    left = sorted(path.name for path in artifact_dir.glob('duplicate.md.*'))
+    if left or not (artifact_dir / "duplicate.md").exists() or (artifact_dir / "duplicate.md").stat().st_nlink != 1:
+        print(f"❌ FAILED: Expected duplicate.md left as it was, found {left}")
+        return False
+    print(f"   ✓ Rolled back entry's artifact left unstored")
+
+    print("\n1️⃣5️⃣ Testing add_pathway.py with a compressed artifact's original path...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/add_pathway.py', '--job-id', str(job_id), '--country', 'Italy', '--type', 'student',
+        '--name', 'Study Visa', '--source-url', 'https://example.org/italy/visas',
+        '--source-title', 'Italian Consulate', '--source-type', 'official_government', '--credibility', '5',
+        '--artifact-path', 'data/raw/test_manifest/consulate.md'
+    ])
+    conn = sqlite3.connect(TEST_DB_PATH)
+    artifacts = conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+    trail_paths = {path for (path,) in conn.execute("SELECT artifact_path FROM scraper_audit_trail")}
+    conn.close()
+    if code != 0 or artifacts != 1 or trail_paths != {file_path}:
+        print(f"❌ FAILED: Expected the stored artifact reused, found {artifacts} artifacts and {trail_paths}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: consulate.md resolved to {Path(file_path).name}")
+
+    print("\n1️⃣6️⃣ Testing add_pathway.py rolling back with a new artifact...")
+    (artifact_dir / "embassy.md").write_text("# Atlantis\n\nWork permits.\n")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/add_pathway.py', '--job-id', str(job_id), '--country', 'Atlantis', '--type', 'work',
+        '--name', 'Work Permit', '--source-url', 'https://example.org/atlantis',
+        '--source-title', 'Atlantis Embassy', '--source-type', 'embassy', '--credibility', '4',
+        '--artifact-path', 'data/raw/test_manifest/embassy.md'
+    ])
+    left = sorted(path.name for path in artifact_dir.glob('embassy.md.*'))
+    if code != 1 or "Country 'Atlantis' not found" not in stderr or left:
+        print(f"❌ FAILED: Expected the transaction rolled back and no compressed copy, found {left}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Rolled back; embassy.md left as it was")
+
+    shutil.rmtree(artifact_dir)
+    blobs_dir = PROJECT_ROOT / "data" / "test_blobs"
+    if blobs_dir.exists():
+        shutil.rmtree(blobs_dir)
+    cleanup_test_database()
+
+    print("\n✅ All pathway manifest tests PASSED!")
     return True
 
 
@@ -273,6 +718,25 @@ def main():
     if not test_query_audit_trail():
         all_passed = False
 
+    if not test_audit_trail_pages():
+        all_passed = False
+
+    # Test 3: Audit daemon
+    if not test_audit_daemon():
+        all_passed = False
+
+    # Test 4: Batch logging
+    if not test_audit_batch():
+        all_passed = False
+
+    # Test 5: Concurrent writers
+    if not test_concurrent_writers():
+        all_passed = False
+
+    # Test 6: Pathway manifest
+    if not test_add_pathway_manifest():
+        all_passed = False
+
     print("\n" + "=" * 60)
     if all_passed:
         print("✅ ALL TESTS PASSED")
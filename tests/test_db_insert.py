@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for Database Insert CLI Tool (bulk import)
+
+Tests that a mixed JSONL batch is imported with links resolved by URL and
+name, that malformed and non-object lines are reported per line without
+aborting the import, and that a chunk rejected by the database is retried
+row by row so only the bad rows are lost.
+
+Uses a separate test database to avoid polluting production data.
+"""
+
+import subprocess
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+import sys
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+
+
+def run_cli(command: list) -> tuple:
+    """Run a CLI command against the test database and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created fresh test database: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+
+def bulk(directory: Path, name: str, lines: list) -> tuple:
+    """Write lines (dicts are JSON-encoded) to a JSONL file and bulk import it"""
+    path = directory / name
+    path.write_text("".join((json.dumps(line) if isinstance(line, dict) else line) + "\n" for line in lines))
+    return run_cli(['python', 'cli/db_insert.py', 'bulk', str(path)])
+
+
+def count(table: str) -> int:
+    """Number of rows in a table of the test database"""
+    conn = sqlite3.connect(TEST_DB_PATH)
+    rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def test_bulk_insert():
+    """Test bulk import"""
+    print("🧪 Testing Bulk Import\n")
+    print("=" * 60)
+
+    setup_test_database()
+    directory = Path(tempfile.mkdtemp())
+
+    # Test 1: Good batch; the link refers to records from the same file
+    print("\n1️⃣  Testing a good batch...")
+    stdout, stderr, code = bulk(directory, 'good.jsonl', [
+        {'kind': 'link', 'country': 'Italy', 'pathway_type': 'digital_nomad',
+         'pathway_name': 'Digital Nomad Visa', 'source_url': 'https://example.org/it', 'relevance_score': 4},
+        {'kind': 'source', 'url': 'https://example.org/it', 'title': 'Italy portal',
+         'source_type': 'official_government', 'credibility': 5, 'country': 'Italy'},
+        {'kind': 'source', 'url': 'https://example.org/dk', 'title': 'Denmark portal',
+         'source_type': 'embassy', 'credibility': 4, 'is_active': 'yes'},
+        {'kind': 'pathway', 'country': 'Italy', 'pathway_type': 'digital_nomad',
+         'name': 'Digital Nomad Visa', 'min_income_eur': 28000, 'renewable': 'true'},
+    ])
+    if code != 0 or (count('sources'), count('residency_pathways'), count('pathway_sources')) != (2, 1, 1):
+        print(f"❌ FAILED: bulk import returned code {code}")
+        print(f"stdout: {stdout}")
+        return False
+    print(f"✅ PASSED: 2 sources, 1 pathway and 1 link inserted")
+
+    # Test 2: Malformed and non-object lines are per-line errors
+    print("\n2️⃣  Testing malformed and non-object lines...")
+    stdout, stderr, code = bulk(directory, 'mixed.jsonl', [
+        '{"kind": "source", "url": "https://example.org/nl"',
+        '[1, 2]',
+        '"x"',
+        '3',
+        {'kind': 'source', 'url': 'https://example.org/nl', 'title': 'Netherlands portal',
+         'source_type': 'official_government', 'credibility': 5},
+        {'kind': 'visa'},
+    ])
+    expected = ["line 1: Invalid JSON", "line 2: Expected a JSON object, got list",
+                "line 3: Expected a JSON object, got str", "line 4: Expected a JSON object, got int",
+                "line 6: Unknown kind: visa"]
+    missing = [message for message in expected if message not in stdout]
+    if code != 1 or missing or 'Traceback' in stderr or count('sources') != 3:
+        print(f"❌ FAILED: Expected per-line errors and 1 source inserted, missing {missing}")
+        print(f"stdout: {stdout}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: 5 bad lines reported, the valid source was inserted")
+
+    # Test 3: A chunk the database rejects is retried row by row
+    print("\n3️⃣  Testing row-by-row fallback...")
+    stdout, stderr, code = bulk(directory, 'fallback.jsonl', [
+        {'kind': 'source', 'url': 'https://example.org/gr', 'title': 'Greece portal',
+         'source_type': 'official_government', 'credibility': 5},
+        {'kind': 'source', 'url': 'https://example.org/it', 'title': 'Italy portal (again)',
+         'source_type': 'official_government', 'credibility': 5},
+        {'kind': 'source', 'url': 'https://example.org/se', 'title': 'Sweden portal',
+         'source_type': 'official_government', 'credibility': 9},
+        {'kind': 'source', 'url': 'https://example.org/pt', 'title': 'Portugal portal',
+         'source_type': 'news', 'credibility': 3},
+    ])
+    if (code != 1 or "source: 2 inserted" not in stdout or "line 2: UNIQUE constraint failed" not in stdout
+            or "line 3: CHECK constraint failed" not in stdout or count('sources') != 5):
+        print(f"❌ FAILED: Expected 2 sources inserted and 2 rejected")
+        print(f"stdout: {stdout}")
+        return False
+    print(f"✅ PASSED: Duplicate URL and invalid credibility rejected, the other 2 inserted")
+
+    for path in directory.iterdir():
+        path.unlink()
+    directory.rmdir()
+    cleanup_test_database()
+
+    print("\n✅ All bulk import tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  DATABASE INSERT - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_bulk_insert()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
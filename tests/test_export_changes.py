@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Tests for the Export Change Log and Vault Export
+
+Tests that the export_changes triggers (config/migrations/004) map writes
+to pathways, sources and pathway_sources onto the pathway notes and
+country indexes that `export.py watch` re-renders (in-memory database).
+
+Also runs export.py against a test database and vault (data/test_vault):
+all-pathways with a worker pool, a worker whose database is gone,
+incremental exports that only re-render and rewrite what changed, and
+json/csv datasets on stdout and in (gzipped) files. VaultWriter is tested
+on a temporary directory: all files or none, and stale staging removed.
+Last, country exports and watch (without --overwrite) are checked to
+replace notes that were exported unchanged and prune the changes they
+have covered, keeping hand-edited notes and their changes.
+"""
+
+import subprocess
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import db_common  # noqa: E402
+import export  # noqa: E402
+from export_reference import build_fixture  # noqa: E402
+
+MIGRATION_PATH = PROJECT_ROOT / "config" / "migrations" / "004_export_changes.sql"
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+TEST_VAULT_DIR = PROJECT_ROOT / "data" / "test_vault"
+COUNTRIES = ['Italy', 'Spain', 'Portugal']
+
+
+def run_cli(command: list, stdin: str = None) -> tuple:
+    """Run a CLI command against the test database and return (stdout, stderr, returncode)"""
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database with two pathways and a source per country"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+
+    records = []
+    for country in COUNTRIES:
+        url = f"https://example.org/{country.lower()}"
+        records.append({'kind': 'source', 'url': url, 'title': f"{country} portal",
+                        'source_type': 'official_government', 'credibility': 5, 'country': country})
+        for pathway_type, name in (('digital_nomad', 'Digital Nomad Visa'), ('retirement', 'Retirement Visa')):
+            records.append({'kind': 'pathway', 'country': country, 'pathway_type': pathway_type,
+                            'name': f"{country} {name}", 'min_income_eur': 30000})
+            records.append({'kind': 'link', 'country': country, 'pathway_type': pathway_type,
+                            'pathway_name': f"{country} {name}", 'source_url': url})
+
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as f:
+        f.write("".join(json.dumps(record) + "\n" for record in records))
+        f.flush()
+        stdout, stderr, code = run_cli(['python', 'cli/db_insert.py', 'bulk', f.name])
+    if code != 0:
+        print(f"   ❌ Failed to insert test pathways", file=sys.stderr)
+        print(stdout, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created test database with {len(COUNTRIES) * 2} pathways: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database and test vault"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+    if TEST_VAULT_DIR.exists():
+        shutil.rmtree(TEST_VAULT_DIR)
+        print(f"   ✓ Cleaned up test vault")
+
+
+def vault_files() -> dict:
+    """Every file in the test vault (hidden staging directories included), by relative path"""
+    if not TEST_VAULT_DIR.exists():
+        return {}
+    return {str(path.relative_to(TEST_VAULT_DIR)): path.read_bytes()
+            for path in sorted(TEST_VAULT_DIR.rglob('*')) if path.is_file()}
+
+
+def check_changes(conn, after_id: int, expected: dict, label: str) -> int:
+    """Compare read_export_changes() with expected; return the last id (or None on failure)"""
+    last_id, changed = export.read_export_changes(conn, after_id)
+    if changed != expected:
+        print(f"❌ FAILED: {label}: expected {expected}, got {changed}")
+        return None
+    print(f"✅ PASSED: {label}")
+    return last_id
+
+
+def test_export_changes():
+    """Test the change log triggers and read_export_changes()"""
+    print("🧪 Testing Export Change Log\n")
+    print("=" * 60)
+
+    conn = build_fixture()
+    conn.executescript(MIGRATION_PATH.read_text())
+
+    pathway_id, country_id = conn.execute(
+        "SELECT id, country_id FROM residency_pathways ORDER BY id LIMIT 1").fetchone()
+    country = conn.execute("SELECT name FROM countries WHERE id = ?", (country_id,)).fetchone()[0]
+
+    # Test 1: Pathway update
+    print("\n1️⃣  Testing pathway update...")
+    conn.execute("UPDATE residency_pathways SET description = 'Changed' WHERE id = ?", (pathway_id,))
+    last_id = check_changes(conn, 0, {country: {pathway_id}}, "Pathway note and country index")
+    if last_id is None:
+        return False
+
+    # Test 2: Source update reaches every linked pathway and the source's country
+    print("\n2️⃣  Testing source update...")
+    source_id, source_country_id = conn.execute("""
+        SELECT s.id, s.country_id FROM sources s
+        WHERE s.country_id IS NOT NULL
+          AND (SELECT COUNT(*) FROM pathway_sources WHERE source_id = s.id) > 1
+        ORDER BY s.id LIMIT 1
+    """).fetchone()
+    expected = {}
+    for name in conn.execute("SELECT name FROM countries WHERE id = ?", (source_country_id,)):
+        expected[name[0]] = set()
+    for pid, name in conn.execute("""
+        SELECT p.id, c.name FROM pathway_sources ps
+        JOIN residency_pathways p ON p.id = ps.pathway_id
+        JOIN countries c ON c.id = p.country_id
+        WHERE ps.source_id = ?
+    """, (source_id,)):
+        expected.setdefault(name, set()).add(pid)
+
+    conn.execute("UPDATE sources SET title = 'Renamed' WHERE id = ?", (source_id,))
+    last_id = check_changes(conn, last_id, expected, f"Source {source_id} linked pathways")
+    if last_id is None:
+        return False
+
+    # Test 3: Linking a source
+    print("\n3️⃣  Testing pathway_sources insert...")
+    conn.execute("DELETE FROM pathway_sources WHERE pathway_id = ? AND source_id = ?", (pathway_id, source_id))
+    conn.execute("INSERT INTO pathway_sources (pathway_id, source_id) VALUES (?, ?)", (pathway_id, source_id))
+    last_id = check_changes(conn, last_id, {country: {pathway_id}}, "Linked pathway")
+    if last_id is None:
+        return False
+
+    # Test 4: Nothing new
+    print("\n4️⃣  Testing no changes...")
+    if check_changes(conn, last_id, {}, "No changes after the last id") is None:
+        return False
+
+    print("\n✅ All export change log tests PASSED!")
+    return True
+
+
+def test_parallel_export():
+    """Test all-pathways with a pool of worker processes"""
+    print("\n\n🧪 Testing Parallel Export\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    # Test 5: Workers export the same files as a single process
+    print("\n5️⃣  Testing all-pathways --jobs 4 against --jobs 1...")
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'all-pathways', '--overwrite', '--jobs', '4'])
+    parallel = vault_files()
+    if code != 0 or "Countries exported: 3, skipped: 12, failed: 0" not in stderr:
+        print(f"❌ FAILED: all-pathways --jobs 4 returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    shutil.rmtree(TEST_VAULT_DIR)
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'all-pathways', '--overwrite', '--jobs', '1'])
+    expected = {f"Countries/{country}/{name}" for country in COUNTRIES
+                for name in ('README.md', f"{country}_Digital_Nomad_Visa.md", f"{country}_Retirement_Visa.md")}
+    if code != 0 or set(parallel) != expected or vault_files() != parallel:
+        print(f"❌ FAILED: Expected the same {len(expected)} files from both runs, got {sorted(parallel)}")
+        return False
+    print(f"✅ PASSED: {len(parallel)} identical files; countries without pathways skipped")
+
+    # Test 6: A worker that exits (database gone) fails only its country
+    print("\n6️⃣  Testing a worker whose database is gone...")
+    db_common.close_db_connections()
+    saved_path = db_common.DB_PATH
+    db_common.DB_PATH = TEST_DB_PATH.with_name("missing.db")
+    try:
+        result = export.export_country_job('Italy', overwrite=True)
+    except SystemExit:
+        result = None
+    finally:
+        db_common.DB_PATH = saved_path
+        db_common.close_db_connections()
+    if not result or result['status'] != 'error' or 'Database not found' not in result['stderr']:
+        print(f"❌ FAILED: Expected an error result, got {result}")
+        return False
+    print(f"✅ PASSED: Italy failed ({result['message']}) without stopping the run")
+
+    cleanup_test_database()
+
+    print("\n✅ All parallel export tests PASSED!")
+    return True
+
+
+def test_incremental_export():
+    """Test that exports only render and write files whose inputs changed"""
+    print("\n\n🧪 Testing Incremental Export\n")
+    print("=" * 60)
+
+    setup_test_database()
+    italy = TEST_VAULT_DIR / "Countries" / "Italy"
+    nomad, retirement = italy / "Italy_Digital_Nomad_Visa.md", italy / "Italy_Retirement_Visa.md"
+
+    def export_italy(*args) -> tuple:
+        stdout, stderr, code = run_cli(['python', 'cli/export.py', 'country', 'Italy', *args])
+        return stderr, {path.name: path.stat().st_mtime_ns for path in italy.iterdir()}
+
+    # Test 7: Nothing changed, nothing written
+    print("\n7️⃣  Testing a repeated export...")
+    stderr, first = export_italy('--overwrite')
+    if "3 files /" not in stderr or len(first) != 3:
+        print(f"❌ FAILED: Expected 3 files written, got {sorted(first)}")
+        print(f"stderr: {stderr}")
+        return False
+    stderr, second = export_italy('--overwrite')
+    if "0 files / 0 bytes written, 3 files" not in stderr or second != first:
+        print(f"❌ FAILED: Expected no writes on the second export")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Second export wrote nothing")
+
+    # Test 8: Only the changed pathway is re-rendered
+    print("\n8️⃣  Testing a changed pathway...")
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("UPDATE residency_pathways SET min_income_eur = 45000 WHERE name = 'Italy Digital Nomad Visa'")
+    conn.commit()
+    conn.close()
+    stderr, third = export_italy('--overwrite')
+    if (third[nomad.name] == first[nomad.name] or third[retirement.name] != first[retirement.name]
+            or "€45,000/year" not in nomad.read_text()):
+        print(f"❌ FAILED: Expected only {nomad.name} rewritten")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: {nomad.name} rewritten, {retirement.name} untouched")
+
+    # Test 9: A hand-edited file is noticed (size/mtime differ from the manifest)
+    print("\n9️⃣  Testing a hand-edited file...")
+    exported = retirement.read_bytes()
+    retirement.write_bytes(exported + b"\nHand edit\n")
+    stderr, _ = export_italy()
+    kept = retirement.read_bytes() != exported and "File exists" in stderr
+    stderr, _ = export_italy('--overwrite')
+    if not kept or retirement.read_bytes() != exported:
+        print(f"❌ FAILED: Expected the edit kept without --overwrite and replaced with it")
+        print(f"stderr: {stderr}")
+        return False
+
+    conn = sqlite3.connect(TEST_DB_PATH)
+    rows = conn.execute("SELECT COUNT(*) FROM export_manifest").fetchone()[0]
+    conn.close()
+    if rows != 3:
+        print(f"❌ FAILED: Expected 3 export_manifest rows, found {rows}")
+        return False
+    print(f"✅ PASSED: Edit kept without --overwrite, re-exported with it")
+
+    cleanup_test_database()
+
+    print("\n✅ All incremental export tests PASSED!")
+    return True
+
+
+def test_dataset_export():
+    """Test json and csv dataset exports"""
+    print("\n\n🧪 Testing Dataset Export\n")
+    print("=" * 60)
+
+    setup_test_database()
+    output = TEST_VAULT_DIR / "pathways.jsonl.gz"
+
+    # Test 10: json to a gzipped file, csv to stdout
+    print("\n🔟 Testing --format json (gzip) and --format csv...")
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'all-pathways', '--format', 'json',
+                                    '--output', str(output)])
+    documents = [json.loads(line) for line in gzip.open(output, 'rt')] if code == 0 else []
+    urls = {tuple(source['url'] for source in document['sources']) for document in documents}
+    if len(documents) != 6 or stdout != str(output) or len(urls) != 3 or {len(url) for url in urls} != {1}:
+        print(f"❌ FAILED: Expected 6 documents with their source, got {len(documents)}")
+        print(f"stderr: {stderr}")
+        return False
+
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'country', 'Italy', '--format', 'csv'])
+    rows = list(csv.DictReader(io.StringIO(stdout)))
+    names = sorted(row['name'] for row in rows)
+    if (code != 0 or names != ['Italy Digital Nomad Visa', 'Italy Retirement Visa']
+            or {row['source_count'] for row in rows} != {'1'}):
+        print(f"❌ FAILED: Expected 2 Italy rows with 1 source each")
+        print(f"stdout: {stdout}")
+        return False
+    print(f"✅ PASSED: {len(documents)} json documents, {len(rows)} csv rows")
+
+    # Test 11: Errors
+    print("\n1️⃣1️⃣ Testing unknown country and existing output...")
+    _, stderr_country, code_country = run_cli(['python', 'cli/export.py', 'country', 'Atlantis', '--format', 'json'])
+    _, stderr_exists, code_exists = run_cli(['python', 'cli/export.py', 'all-pathways', '--format', 'json',
+                                             '--output', str(output)])
+    if (code_country != 1 or "Country not found: Atlantis" not in stderr_country
+            or code_exists != 1 or "use --overwrite" not in stderr_exists):
+        print(f"❌ FAILED: Expected both exports rejected")
+        print(f"stderr: {stderr_country}{stderr_exists}")
+        return False
+    print(f"✅ PASSED: Unknown country and existing output rejected")
+
+    cleanup_test_database()
+
+    print("\n✅ All dataset export tests PASSED!")
+    return True
+
+
+def test_vault_writer():
+    """Test that staged vault files appear all at once, or not at all"""
+    print("\n\n🧪 Testing Atomic Vault Writes\n")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        note, index = root / "Countries" / "Italy" / "Visa.md", root / "Countries" / "Italy" / "README.md"
+        note.parent.mkdir(parents=True)
+        note.write_text("previous\n")
+
+        # Test 12: An error while staging leaves the vault as it was
+        print("\n1️⃣2️⃣ Testing an interrupted export...")
+        try:
+            with export.VaultWriter(root) as writer:
+                writer.stage(note, b"new\n")
+                writer.stage(index, b"# Italy\n")
+                raise RuntimeError("render failed")
+        except RuntimeError:
+            pass
+        left = sorted(path.name for path in root.rglob('*') if path.is_file())
+        if note.read_text() != "previous\n" or index.exists() or left != ['Visa.md']:
+            print(f"❌ FAILED: Expected only the previous note, found {left}")
+            return False
+        print(f"✅ PASSED: Nothing written, nothing staged left behind")
+
+        # Test 13: Success moves every file into place; stale staging is removed
+        print("\n1️⃣3️⃣ Testing a completed export and stale staging...")
+        finished = subprocess.Popen(['true'])
+        finished.wait()
+        stale = root / f".export-{finished.pid}-killed"
+        live = root / f".export-{os.getpid()}-running"
+        stale.mkdir()
+        live.mkdir()
+
+        with export.VaultWriter(root) as writer:
+            stat = writer.stage(note, b"new\n")
+            writer.stage(index, b"# Italy\n")
+            if note.read_text() != "previous\n":
+                print(f"❌ FAILED: Note changed before commit")
+                return False
+
+        staging = sorted(path.name for path in root.glob('.export-*'))
+        if (note.read_text() != "new\n" or index.read_text() != "# Italy\n"
+                or note.stat().st_mtime_ns != stat.st_mtime_ns or staging != [live.name]):
+            print(f"❌ FAILED: Expected both files in place and only {live.name} left, found {staging}")
+            return False
+        print(f"✅ PASSED: {writer.files_written} files renamed into place; "
+              f"staging of the dead process removed, of the live one kept")
+
+    print("\n✅ All atomic vault write tests PASSED!")
+    return True
+
+
+def pending_changes() -> dict:
+    """Number of export_changes rows per (country, pathway name) in the test database"""
+    conn = sqlite3.connect(TEST_DB_PATH)
+    rows = conn.execute("""
+        SELECT c.name, p.name, COUNT(*)
+        FROM export_changes e
+        JOIN countries c ON e.country_id = c.id
+        LEFT JOIN residency_pathways p ON e.pathway_id = p.id
+        GROUP BY c.name, p.name
+    """).fetchall()
+    conn.close()
+    return {(country, pathway): count for country, pathway, count in rows}
+
+
+def test_change_pruning():
+    """Test that vault exports delete the changes they have covered"""
+    print("\n\n🧪 Testing Change Log Pruning\n")
+    print("=" * 60)
+
+    setup_test_database()
+    before = pending_changes()
+
+    # Test 14: A pathway export keeps its changes (the country index is not re-rendered)
+    print("\n1️⃣4️⃣ Testing a pathway export...")
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'pathway', 'Spain', 'digital_nomad'])
+    after = pending_changes()
+    if code != 0 or ('Spain', 'Spain Digital Nomad Visa') not in before or after != before:
+        print(f"❌ FAILED: Expected every change kept, got {after}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: {sum(after.values())} changes kept")
+
+    # Test 15: A country export prunes the country; a skipped file keeps them
+    print("\n1️⃣5️⃣ Testing a country export...")
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'country', 'Italy'])
+    after = pending_changes()
+    if code != 0 or any(country == 'Italy' for country, _ in after) or not any(
+            country == 'Portugal' for country, _ in after):
+        print(f"❌ FAILED: Expected Italy's changes pruned and Portugal's kept, got {after}")
+        print(f"stderr: {stderr}")
+        return False
+
+    retirement = TEST_VAULT_DIR / "Countries" / "Italy" / "Italy_Retirement_Visa.md"
+    retirement.write_text(retirement.read_text() + "\nHand edit\n")
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute("UPDATE residency_pathways SET min_income_eur = 45000 WHERE name = 'Italy Retirement Visa'")
+    conn.commit()
+    conn.close()
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'country', 'Italy'])
+    kept = pending_changes().get(('Italy', 'Italy Retirement Visa'))
+    stdout, stderr, code = run_cli(['python', 'cli/export.py', 'country', 'Italy', '--overwrite'])
+    if not kept or any(country == 'Italy' for country, _ in pending_changes()):
+        print(f"❌ FAILED: Expected the change kept while the file is hand-edited and pruned with --overwrite")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Italy pruned; a skipped file kept its change until it was written")
+
+    # Test 16: watch (no --overwrite) replaces exported notes, keeps hand-edited ones
+    print("\n1️⃣6️⃣ Testing pending changes without --overwrite...")
+    nomad = TEST_VAULT_DIR / "Countries" / "Italy" / "Italy_Digital_Nomad_Visa.md"
+    retirement.write_text(retirement.read_text() + "\nHand edit\n")
+    conn = sqlite3.connect(TEST_DB_PATH)
+    after_id = conn.execute("SELECT MAX(id) FROM export_changes").fetchone()[0]
+    conn.execute("UPDATE residency_pathways SET min_income_eur = 50000 WHERE country_id = "
+                 "(SELECT id FROM countries WHERE name = 'Italy')")
+    conn.commit()
+    conn.close()
+    stdout, stderr, code = run_cli([
+        'python', '-c',
+        "import sys; sys.path.insert(0, 'cli'); import db_common, export; "
+        f"export.export_pending_changes(db_common.get_db_connection(), {after_id})"
+    ])
+    after = pending_changes()
+    if (code != 0 or "€50,000/year" not in nomad.read_text() or "Hand edit" not in retirement.read_text()
+            or ('Italy', 'Italy Digital Nomad Visa') in after
+            or not after.get(('Italy', 'Italy Retirement Visa'))
+            or not any(country == 'Portugal' for country, _ in after)):
+        print(f"❌ FAILED: Expected the exported note rewritten and its change pruned, "
+              f"the hand-edited one kept with its change, got {after}")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Exported note updated, hand-edited note and its change kept")
+
+    cleanup_test_database()
+
+    print("\n✅ All change log pruning tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  EXPORT CHANGE LOG - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_export_changes()
+
+    if not test_parallel_export():
+        all_passed = False
+
+    if not test_incremental_export():
+        all_passed = False
+
+    if not test_dataset_export():
+        all_passed = False
+
+    if not test_vault_writer():
+        all_passed = False
+
+    if not test_change_pruning():
+        all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Tests for Export Rendering
+
+Tests that the compiled templates (config/templates/) render pathway and
+country markdown byte for byte like the previous list-of-f-strings
+renderers (tests/export_reference.py), apart from the country flag, which
+now comes from the country code. Also checks that the comparison matrix
+covers every pathway of each country, that a country snapshot takes a
+fixed number of queries and is not affected by a concurrent writer, and
+that the json/csv datasets carry the same pathways and sources.
+
+Uses an in-memory database (copied to a temporary file for the concurrent
+writer test).
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "cli"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import export  # noqa: E402
+from export_reference import (  # noqa: E402
+    build_fixture, load_legacy_snapshot, legacy_pathway_markdown, legacy_country_index
+)
+from templates import TemplateError, compile_template  # noqa: E402
+
+COUNTRIES = {'Italy': '🇮🇹', 'Germany': '🇩🇪', 'Norway': '🇳🇴', 'Czech Republic': '🇨🇿'}
+
+
+def test_export_render():
+    """Test template rendering against the legacy renderers"""
+    print("🧪 Testing Export Rendering\n")
+    print("=" * 60)
+
+    conn = build_fixture()
+
+    # Test 1: Pathway markdown
+    print("\n1️⃣  Testing pathway markdown...")
+    rendered = 0
+    for country, flag in COUNTRIES.items():
+        legacy = load_legacy_snapshot(conn, country)
+        snapshot = export.load_country_snapshot(conn, country)
+
+        for old, new in zip(legacy['pathways'], snapshot['pathways']):
+            expected = legacy_pathway_markdown(old, legacy['pathway_sources'][old['id']])
+            expected = expected.replace("**Country**: 🇮🇹", f"**Country**: {flag}", 1)
+            actual = export.generate_pathway_markdown(new, snapshot['pathway_sources'][new.id])
+
+            if actual != expected:
+                print(f"❌ FAILED: Pathway {new.id} ({country}) differs")
+                show_difference(expected, actual)
+                return False
+            rendered += 1
+
+    print(f"✅ PASSED: {rendered} pathways identical")
+
+    # Test 2: Country index
+    print("\n2️⃣  Testing country index...")
+    for country in COUNTRIES:
+        legacy = load_legacy_snapshot(conn, country)
+        snapshot = export.load_country_snapshot(conn, country)
+
+        expected = legacy_country_index(country, legacy['pathways'], legacy['country_info'],
+                                        legacy['country_sources'])
+        actual = export.generate_country_index(country, snapshot['pathways'], snapshot['country_info'],
+                                               snapshot['country_sources'])
+        if actual != expected:
+            print(f"❌ FAILED: {country} index differs")
+            show_difference(expected, actual)
+            return False
+
+    print(f"✅ PASSED: {len(COUNTRIES)} country indexes identical")
+
+    # Test 3: Flags
+    print("\n3️⃣  Testing country flags...")
+    if export.country_flag('IT') != '🇮🇹' or export.country_flag('jp') != '🇯🇵':
+        print(f"❌ FAILED: Unexpected flags {export.country_flag('IT')} {export.country_flag('jp')}")
+        return False
+    print(f"✅ PASSED: Flags from table and from regional indicators")
+
+    # Test 4: Template errors
+    print("\n4️⃣  Testing template errors...")
+    for text in ["no args line", "% args: x\n% if x:\n{x}", "% args: x\n% endif"]:
+        try:
+            compile_template(text, 'broken.md')
+        except TemplateError as e:
+            print(f"   ✓ {e}")
+        else:
+            print(f"❌ FAILED: Compiled invalid template {text!r}")
+            return False
+    print(f"✅ PASSED: Invalid templates rejected")
+
+    # Test 5: Comparison matrix
+    print("\n5️⃣  Testing comparison matrix...")
+    matrix = export.load_comparison(conn, list(COUNTRIES))
+    cells = {(c, t): i for i, (c, t) in enumerate(zip(matrix['country'], matrix['pathway_type']))}
+    for country in COUNTRIES:
+        snapshot = export.load_country_snapshot(conn, country)
+        for pathway in snapshot['pathways']:
+            i = cells[(country, pathway.pathway_type)]
+            sources = snapshot['pathway_sources'][pathway.id]
+            if (pathway.min_income_eur and matrix['min_income_eur'][i] > pathway.min_income_eur
+                    or matrix['source_count'][i] < len(sources)):
+                print(f"❌ FAILED: {country} / {pathway.pathway_type} does not cover pathway {pathway.id}")
+                return False
+
+    markdown = export.generate_comparison_markdown(matrix)
+    if f"## {matrix['pathway_type'][0]}" not in markdown or "| Italy |" not in markdown:
+        print(f"❌ FAILED: Comparison markdown is missing sections")
+        return False
+    print(f"✅ PASSED: {len(cells)} country/pathway type rows")
+
+    # Test 6: Country snapshot
+    print("\n6️⃣  Testing country snapshot (queries, concurrent writer)...")
+    with tempfile.TemporaryDirectory() as directory:
+        if not check_snapshot(conn, Path(directory) / "snapshot.db"):
+            return False
+
+    # Test 7: Datasets
+    print("\n7️⃣  Testing json documents and csv rows...")
+    if not check_datasets(conn):
+        return False
+
+    print("\n✅ All export rendering tests PASSED!")
+    return True
+
+
+def check_datasets(conn: sqlite3.Connection) -> bool:
+    """Compare the json/csv datasets with the country snapshots"""
+    conn.row_factory = sqlite3.Row
+    try:
+        where, params = export.pathway_filter()
+        documents = list(export.iter_pathway_documents(conn, where, params))
+        rows = {row['id']: row for row in export.iter_pathway_rows(conn, where, params)}
+        where, params = export.pathway_filter('Norway')
+        norway = [document['id'] for document in export.iter_pathway_documents(conn, where, params)]
+    finally:
+        conn.row_factory = None
+
+    expected = {}
+    for country in COUNTRIES:
+        snapshot = export.load_country_snapshot(conn, country)
+        for pathway in snapshot['pathways']:
+            expected[pathway.id] = (country, snapshot['pathway_sources'][pathway.id])
+
+    if [document['id'] for document in documents] != sorted(expected) or set(rows) != set(expected):
+        print(f"❌ FAILED: Expected pathways {sorted(expected)}")
+        return False
+    for document in documents:
+        country, sources = expected[document['id']]
+        row = rows[document['id']]
+        credibility = [source['credibility'] for source in document['sources']]
+        # Equal credibility and relevance may come in either order
+        if (document['country'] != country
+                or sorted(source['source_id'] for source in document['sources']) != sorted(s.id for s in sources)
+                or credibility != sorted(credibility, reverse=True)
+                or row['source_count'] != len(sources)
+                or row['max_credibility'] != max((source.credibility for source in sources), default=None)):
+            print(f"❌ FAILED: Pathway {document['id']} dataset differs from its snapshot")
+            return False
+    if sorted(norway) != sorted(pid for pid, (country, _) in expected.items() if country == 'Norway'):
+        print(f"❌ FAILED: Country filter returned {norway}")
+        return False
+
+    linked = sum(len(document['sources']) for document in documents)
+    print(f"✅ PASSED: {len(documents)} documents with {linked} nested sources; csv counts match")
+    return True
+
+
+def check_snapshot(fixture: sqlite3.Connection, db_path: Path) -> bool:
+    """
+    Load Italy's snapshot while another connection renames its sources
+    between the snapshot's queries; the snapshot must not see the rename.
+    """
+    conn = sqlite3.connect(db_path)
+    fixture.backup(conn)
+    conn.execute("PRAGMA journal_mode = WAL")
+    writer = sqlite3.connect(db_path)
+
+    before = export.load_country_snapshot(conn, 'Italy')
+    statements = []
+
+    def interleave(sql: str) -> None:
+        statements.append(sql)
+        if 'FROM residency_pathways' in sql:
+            writer.execute("UPDATE sources SET title = 'Renamed' WHERE country_id = ?",
+                           (before['country_info'].id,))
+            writer.commit()
+
+    conn.set_trace_callback(interleave)
+    during = export.load_country_snapshot(conn, 'Italy')
+    conn.set_trace_callback(None)
+    after = export.load_country_snapshot(conn, 'Italy')
+
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    titles = lambda snapshot: sorted(source.title for source in snapshot['country_sources'])
+    writer.close()
+    conn.close()
+
+    if len(selects) != 4 or len(before['pathways']) < 2:
+        print(f"❌ FAILED: Expected 4 queries for {len(before['pathways'])} pathways, ran {len(selects)}")
+        return False
+    if titles(during) != titles(before) or set(titles(after)) != {'Renamed'}:
+        print(f"❌ FAILED: Snapshot saw a write made while it was loading")
+        return False
+    print(f"✅ PASSED: {len(before['pathways'])} pathways in {len(selects)} queries; "
+          f"concurrent rename not seen until the next snapshot")
+    return True
+
+
+def show_difference(expected: str, actual: str) -> None:
+    """Print the first differing line"""
+    for lineno, (a, b) in enumerate(zip(expected.split("\n"), actual.split("\n")), 1):
+        if a != b:
+            print(f"   line {lineno}:\n   expected: {a!r}\n   actual:   {b!r}")
+            return
+    print(f"   lengths differ: expected {len(expected)}, actual {len(actual)}")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  EXPORT RENDERING - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_export_render()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
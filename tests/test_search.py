@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Tests for Search CLI Tool
+
+Tests that pathways are searchable as soon as they are inserted, that
+filters narrow results, and that artifact text is indexed incrementally.
+
+Uses a separate test database to avoid polluting production data.
+"""
+
+import subprocess
+import json
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_DB_PATH = PROJECT_ROOT / "data" / "database" / "test_residency.db"
+TEST_TEXT_DIR = PROJECT_ROOT / "data" / "raw" / "test_search"
+TEST_BLOBS_DIR = PROJECT_ROOT / "data" / "test_blobs"
+
+
+def run_cli(command: list) -> tuple:
+    """
+    Run a CLI command and return (stdout, stderr, returncode)
+    """
+    # Set environment to use test database
+    env = os.environ.copy()
+    env['TEST_MODE'] = '1'
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    return result.stdout.strip(), result.stderr, result.returncode
+
+
+def setup_test_database():
+    """Create a fresh test database"""
+    result = subprocess.run(
+        ['python', 'scripts/db_init.py', '--db-path', str(TEST_DB_PATH), '--force'],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        print(f"   ❌ Failed to create test database", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(1)
+    print(f"   ✓ Created fresh test database: {TEST_DB_PATH}")
+
+
+def cleanup_test_database():
+    """Remove test database and test files"""
+    for path in TEST_DB_PATH.parent.glob(TEST_DB_PATH.name + '*'):
+        path.unlink()
+    print(f"   ✓ Cleaned up test database")
+
+    if TEST_TEXT_DIR.exists():
+        shutil.rmtree(TEST_TEXT_DIR)
+        print(f"   ✓ Cleaned up test files")
+
+    if TEST_BLOBS_DIR.exists():
+        shutil.rmtree(TEST_BLOBS_DIR)
+
+
+def search(*args) -> list:
+    """Run search.py --json and return the results"""
+    stdout, stderr, code = run_cli(['python', 'cli/search.py', '--json', *args])
+    if code != 0:
+        print(f"stderr: {stderr}")
+        return None
+    return json.loads(stdout)
+
+
+def test_search():
+    """Test full-text search"""
+    print("🧪 Testing Search\n")
+    print("=" * 60)
+
+    setup_test_database()
+
+    # Test 1: Pathways are indexed on insert
+    print("\n1️⃣  Testing pathway search...")
+    stdout, stderr, code = run_cli([
+        'python', 'cli/db_insert.py', 'pathway',
+        '--country', 'Germany',
+        '--type', 'eu_blue_card',
+        '--name', 'EU Blue Card',
+        '--description', 'Residence permit for graduates above the salary threshold'
+    ])
+    if code != 0:
+        print(f"❌ FAILED: db_insert.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    results = search('blue card salary')
+    if not results or results[0]['kind'] != 'pathway' or results[0]['country'] != 'Germany':
+        print(f"❌ FAILED: Expected the Blue Card pathway, got {results}")
+        return False
+    print(f"✅ PASSED: Found pathway #{results[0]['ref_id']}")
+    print(f"   Snippet: {results[0]['snippet']}")
+
+    # Test 2: Filters
+    print("\n2️⃣  Testing country and kind filters...")
+    if search('salary', '--country', 'Italy') != [] or search('salary', '--kind', 'sources') != []:
+        print(f"❌ FAILED: Filters did not exclude the German pathway")
+        return False
+    if len(search('salary', '--type', 'eu_blue_card')) != 1:
+        print(f"❌ FAILED: --type eu_blue_card did not match")
+        return False
+
+    # Filters are exact: employment is not self_employment, Republic is not Czech Republic
+    for country, pathway_type, name in (('Germany', 'employment', 'Work Visa'),
+                                        ('Germany', 'self_employment', 'Freelance Visa'),
+                                        ('Czech Republic', 'self_employment', 'Zivno Visa')):
+        stdout, stderr, code = run_cli([
+            'python', 'cli/db_insert.py', 'pathway', '--country', country, '--type', pathway_type,
+            '--name', name, '--description', 'Permit for freelancers with local clients'
+        ])
+        if code != 0:
+            print(f"❌ FAILED: db_insert.py returned code {code}")
+            print(f"stderr: {stderr}")
+            return False
+    employment = search('freelancers', '--type', 'employment', '--kind', 'pathways')
+    if [row['pathway_type'] for row in employment or []] != ['employment']:
+        print(f"❌ FAILED: --type employment should only match employment, got {employment}")
+        return False
+    if search('freelancers', '--country', 'Republic') != [] or len(search('freelancers', '--country', 'czech republic')) != 1:
+        print(f"❌ FAILED: --country should match whole country names only")
+        return False
+    print(f"✅ PASSED: Filters applied, exactly")
+
+    # Test 3: Artifact text is indexed incrementally
+    print("\n3️⃣  Testing artifact indexing...")
+    text_path = TEST_TEXT_DIR / "blue_card.md"
+    text_path.parent.mkdir(parents=True, exist_ok=True)
+    text_path.write_text(
+        "# EU Blue Card\n\n"
+        "The minimum gross salary is EUR 45,300 per year.\n\n"
+        "## Shortage occupations\n\n"
+        "A reduced threshold of EUR 41,041 applies to shortage occupations.\n"
+    )
+    stdout, stderr, code = run_cli([
+        'python', 'cli/artifact_register.py',
+        '--type', 'extracted_text',
+        '--path', str(text_path),
+        '--title', 'Blue Card requirements',
+        '--country', 'Germany'
+    ])
+    if code != 0:
+        print(f"❌ FAILED: artifact_register.py returned code {code}")
+        print(f"stderr: {stderr}")
+        return False
+
+    results = search('--index', 'shortage occupations', '--kind', 'artifacts')
+    if not results or results[0]['title'] != 'Blue Card requirements › Shortage occupations':
+        print(f"❌ FAILED: Expected the shortage occupations paragraph, got {results}")
+        return False
+    print(f"✅ PASSED: Found artifact paragraph ({results[0]['title']})")
+
+    stdout, stderr, code = run_cli(['python', 'cli/search.py', '--index'])
+    if code != 0 or 'Unchanged: 1' not in stderr:
+        print(f"❌ FAILED: Unchanged file was re-indexed")
+        print(f"stderr: {stderr}")
+        return False
+    print(f"✅ PASSED: Unchanged file skipped on re-index")
+
+    # Test 4: Invalid raw query is reported, not a traceback
+    print("\n4️⃣  Testing invalid raw query...")
+    stdout, stderr, code = run_cli(['python', 'cli/search.py', '--raw', 'blue AND ('])
+    if code == 0 or 'Invalid search query' not in stderr:
+        print(f"❌ FAILED: Expected an invalid query error, got code {code}")
+        return False
+    print(f"✅ PASSED: Invalid query rejected")
+
+    cleanup_test_database()
+
+    print("\n✅ All search tests PASSED!")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("  SEARCH - TEST SUITE")
+    print("=" * 60)
+
+    all_passed = test_search()
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("❌ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()